@@ -12,22 +12,11 @@ Usage:
 """
 
 import sqlite3
-import os
 import argparse
 from datetime import datetime
 
-DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'redhood.db')
-
-SCHEMA = """
-CREATE TABLE IF NOT EXISTS twitter_accounts (
-    id          INTEGER PRIMARY KEY AUTOINCREMENT,
-    handle      TEXT    NOT NULL UNIQUE,
-    added_at    TEXT    NOT NULL,
-    active      INTEGER NOT NULL DEFAULT 1,
-    category    TEXT,
-    notes       TEXT
-);
-"""
+from db import DB_PATH, connection
+from models import init_schema
 
 DEFAULT_ACCOUNTS = [
     ('unusual_whales',  'market',  'Options flow and dark pool alerts'),
@@ -38,36 +27,33 @@ DEFAULT_ACCOUNTS = [
 ]
 
 
-def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
 def init_db():
-    """Create schema and seed default accounts if not already present."""
-    conn = get_connection()
-    conn.execute(SCHEMA)
-    conn.commit()
-
-    now = datetime.utcnow().isoformat()
-    for handle, category, notes in DEFAULT_ACCOUNTS:
-        conn.execute(
-            """INSERT OR IGNORE INTO twitter_accounts (handle, added_at, category, notes)
-               VALUES (?, ?, ?, ?)""",
-            (handle, now, category, notes)
-        )
-    conn.commit()
-    conn.close()
+    """
+    Create schema and seed default accounts on first initialisation.
+
+    Cheap when the database is already at the current schema version: no
+    DDL runs and nothing is re-seeded, so removed defaults stay removed.
+    The twitter_accounts DDL lives in models.SCHEMA.
+    """
+    if not init_schema(DB_PATH):
+        return
+
+    with connection() as conn:
+        if conn.execute("SELECT COUNT(*) FROM twitter_accounts").fetchone()[0] == 0:
+            now = datetime.utcnow().isoformat()
+            conn.executemany(
+                """INSERT OR IGNORE INTO twitter_accounts (handle, added_at, category, notes)
+                   VALUES (?, ?, ?, ?)""",
+                [(handle, now, category, notes) for handle, category, notes in DEFAULT_ACCOUNTS]
+            )
     print(f"Database initialised: {DB_PATH}")
 
 
 def list_accounts():
-    conn = get_connection()
-    rows = conn.execute(
-        "SELECT id, handle, active, category, notes, added_at FROM twitter_accounts ORDER BY id"
-    ).fetchall()
-    conn.close()
+    with connection() as conn:
+        rows = conn.execute(
+            "SELECT id, handle, active, category, notes, added_at FROM twitter_accounts ORDER BY id"
+        ).fetchall()
 
     print(f"\n{'ID':<4} {'Handle':<22} {'Active':<8} {'Category':<12} {'Notes'}")
     print("-" * 80)
@@ -79,26 +65,21 @@ def list_accounts():
 
 def add_account(handle: str, category: str = None, notes: str = None):
     handle = handle.lstrip('@')
-    conn = get_connection()
     try:
-        conn.execute(
-            "INSERT INTO twitter_accounts (handle, added_at, category, notes) VALUES (?, ?, ?, ?)",
-            (handle, datetime.utcnow().isoformat(), category, notes)
-        )
-        conn.commit()
+        with connection() as conn:
+            conn.execute(
+                "INSERT INTO twitter_accounts (handle, added_at, category, notes) VALUES (?, ?, ?, ?)",
+                (handle, datetime.utcnow().isoformat(), category, notes)
+            )
         print(f"Added @{handle}")
     except sqlite3.IntegrityError:
         print(f"@{handle} already exists")
-    finally:
-        conn.close()
 
 
 def remove_account(handle: str):
     handle = handle.lstrip('@')
-    conn = get_connection()
-    cursor = conn.execute("DELETE FROM twitter_accounts WHERE handle = ?", (handle,))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.execute("DELETE FROM twitter_accounts WHERE handle = ?", (handle,))
     if cursor.rowcount:
         print(f"Removed @{handle}")
     else:
@@ -107,30 +88,36 @@ def remove_account(handle: str):
 
 def toggle_account(handle: str):
     handle = handle.lstrip('@')
-    conn = get_connection()
-    cursor = conn.execute(
-        "UPDATE twitter_accounts SET active = 1 - active WHERE handle = ?", (handle,)
-    )
-    conn.commit()
-    if cursor.rowcount:
-        row = conn.execute("SELECT active FROM twitter_accounts WHERE handle = ?", (handle,)).fetchone()
+    with connection() as conn:
+        cursor = conn.execute(
+            "UPDATE twitter_accounts SET active = 1 - active WHERE handle = ?", (handle,)
+        )
+        row = conn.execute(
+            "SELECT active FROM twitter_accounts WHERE handle = ?", (handle,)
+        ).fetchone() if cursor.rowcount else None
+    if row:
         status = 'active' if row['active'] else 'inactive'
         print(f"@{handle} is now {status}")
     else:
         print(f"@{handle} not found")
-    conn.close()
 
 
 def get_active_handles() -> list:
     """Return list of active handles for use by the aggregator."""
-    conn = get_connection()
-    rows = conn.execute(
-        "SELECT handle FROM twitter_accounts WHERE active = 1 ORDER BY id"
-    ).fetchall()
-    conn.close()
+    with connection() as conn:
+        rows = conn.execute(
+            "SELECT handle FROM twitter_accounts WHERE active = 1 ORDER BY id"
+        ).fetchall()
     return [r['handle'] for r in rows]
 
 
+def get_account_categories() -> dict:
+    """Return handle -> category for every tracked account (None if unset)."""
+    with connection() as conn:
+        rows = conn.execute("SELECT handle, category FROM twitter_accounts").fetchall()
+    return {r['handle']: r['category'] for r in rows}
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='RedHood Twitter Accounts DB')
     parser.add_argument('--list',   action='store_true',  help='List all accounts')
@@ -0,0 +1,483 @@
+"""
+RedHood Insights - Read API
+============================
+Read-only HTTP API over runs, narratives and feeds, so dashboards stop
+scraping docs/latest.html or opening redhood.db directly.
+
+    GET /runs                      newest first, cursor-paginated; filter: category
+    GET /runs/{id}                 one run with its narratives
+    GET /narratives                filters: run_id, thread_id, min_risk, since, until
+    GET /narratives/{id}           one narrative with its supporting feeds (incl. archived)
+    GET /feeds                     filters: run_id, source, author, since, until
+    GET /stream/narratives         server-sent events, one per new narrative
+    GET /alerts                    fast-path alerts, newest first, cursor-paginated
+    GET /stream/alerts             server-sent events, one per new alert (fast_path.py)
+
+Lists return ``{"items": [...], "next_cursor": ...}``; pass next_cursor
+back as ``?cursor=`` for the following page. ``since``/``until`` are UTC
+epoch seconds and map onto index range scans. Cursors are keyset positions,
+so paging stays O(limit) however deep it goes and never skips or repeats
+rows when a run lands mid-scroll.
+
+JSON responses carry an ETag. Everything served is written by a run's
+single persist transaction or moved by retention.py, so the newest run id
+plus the archived row count (and newest alert id) act as the database generation: a repeat request in the same generation is answered from an
+in-process cache, and If-None-Match turns it into a bodyless 304.
+
+Usage:
+    python api.py                          # http://127.0.0.1:8000
+    python api.py --host 0.0.0.0 --port 8080
+    uvicorn api:app --workers 2
+
+Dependencies:
+    pip install fastapi uvicorn --break-system-packages
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from db import connection
+from retention import all_feeds
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+RESPONSE_CACHE_SIZE = 256     # distinct URLs kept per generation
+SSE_POLL_SECONDS = 2.0        # how often the stream checks for new narratives
+SSE_HEARTBEAT_SECONDS = 15.0  # comment line so proxies keep the stream open
+ALERT_POLL_SECONDS = 0.5      # alerts are latency-critical; the query is an id range probe
+
+app = FastAPI(title='RedHood Insights API', version='1.0')
+
+
+# ============================================================================
+# CURSORS AND CACHING
+# ============================================================================
+
+def _encode_cursor(*key) -> str:
+    raw = json.dumps(key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: Optional[str], arity: int) -> Optional[List]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail='Malformed cursor')
+    if not isinstance(key, list) or len(key) != arity:
+        raise HTTPException(status_code=400, detail='Malformed cursor')
+    return key
+
+
+def _generation(conn) -> str:
+    """Newest run id, archived row count and newest alert id; changes whenever served rows do."""
+    return conn.execute(
+        """SELECT (SELECT COALESCE(MAX(id), 0) FROM runs) || '.' ||
+                  (SELECT COALESCE(SUM(row_count), 0) FROM feed_archives) || '.' ||
+                  (SELECT COALESCE(MAX(id), 0) FROM alerts)"""
+    ).fetchone()[0]
+
+
+class ResponseCache:
+    """LRU of rendered JSON bodies, valid for one database generation."""
+
+    def __init__(self, size: int = RESPONSE_CACHE_SIZE):
+        self.size = size
+        self._entries: 'OrderedDict[str, Tuple[str, str, bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, generation: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key: str, generation: str, etag: str, body: bytes):
+        with self._lock:
+            self._entries[key] = (generation, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+_cache = ResponseCache()
+
+
+async def _json_response(request: Request, build: Callable[[Any], Any]) -> Response:
+    """
+    Serve build(conn) as JSON with an ETag, using the generation cache.
+
+    The query runs in a worker thread so the event loop (and any open
+    event streams) never waits on SQLite.
+    """
+    key = str(request.url.path) + '?' + str(request.url.query)
+
+    def load() -> Tuple[str, bytes]:
+        with connection() as conn:
+            generation = _generation(conn)
+            cached = _cache.get(key, generation)
+            if cached:
+                return cached
+            body = json.dumps(build(conn), separators=(',', ':')).encode('utf-8')
+            etag = f'"{generation}-{hashlib.sha1(body).hexdigest()[:16]}"'
+            _cache.put(key, generation, etag, body)
+            return etag, body
+
+    etag, body = await asyncio.to_thread(load)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag in request.headers.get('if-none-match', ''):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type='application/json', headers=headers)
+
+
+# ============================================================================
+# ROW SHAPING
+# ============================================================================
+
+RUN_COLUMNS = """id, run_at, hours_back, feeds_collected, narratives_extracted,
+                 json_path, html_path, input_tokens, output_tokens,
+                 cache_creation_input_tokens, cache_read_input_tokens,
+                 api_latency_ms, batch_id, run_at_epoch, category"""
+
+NARRATIVE_COLUMNS = """n.rowid AS seq, n.id, n.run_id, n.title, n.entropy_risk,
+                       n.hypothesis, n.rationale, n.catalysts, n.created_at,
+                       n.created_epoch, n.thread_id"""
+
+FEED_COLUMNS = """id, run_id, source, author, content, clean_text, published_at,
+                  url, nitter_instance, published_epoch"""
+
+ALERT_COLUMNS = """id, feed_id, author, headline, url, rules, score, title, entropy_risk,
+                   hypothesis, rationale, catalysts, model, published_epoch,
+                   detected_epoch, alerted_epoch, detect_to_alert_ms, created_at"""
+
+
+def _alert_dicts(rows: List) -> List[Dict[str, Any]]:
+    alerts = [dict(r) for r in rows]
+    for alert in alerts:
+        alert['rules'] = json.loads(alert['rules'])
+        alert['catalysts'] = json.loads(alert['catalysts'] or '[]')
+    return alerts
+
+
+def _narrative_dicts(conn, rows: List) -> List[Dict[str, Any]]:
+    """Shape narrative rows like Narrative.to_dict(), with supporting feed ids."""
+    ids = [r['id'] for r in rows]
+    supporting: Dict[str, List[str]] = {i: [] for i in ids}
+    if ids:
+        placeholders = ','.join('?' * len(ids))
+        for narrative_id, feed_id in conn.execute(
+            f"SELECT narrative_id, feed_id FROM narrative_feeds WHERE narrative_id IN ({placeholders})",
+            ids
+        ):
+            supporting[narrative_id].append(feed_id)
+    return [{
+        'id': r['id'],
+        'run_id': r['run_id'],
+        'date': r['created_at'],
+        'created_epoch': r['created_epoch'],
+        'title': r['title'],
+        'entropy_risk': r['entropy_risk'],
+        'hypothesis': r['hypothesis'],
+        'rationale': r['rationale'],
+        'catalysts': json.loads(r['catalysts'] or '[]'),
+        'supporting_feeds': supporting[r['id']],
+        'thread_id': r['thread_id'],
+    } for r in rows]
+
+
+def _page(items: List[Dict], limit: int, cursor_of: Callable[[Dict], tuple]) -> Dict[str, Any]:
+    """Trim the limit+1 probe row and derive next_cursor from the last item."""
+    more = len(items) > limit
+    items = items[:limit]
+    return {
+        'items': items,
+        'next_cursor': _encode_cursor(*cursor_of(items[-1])) if more and items else None,
+    }
+
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+@app.get('/runs')
+async def list_runs(request: Request,
+                    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                    cursor: Optional[str] = None, category: Optional[str] = None):
+    after = _decode_cursor(cursor, 1)
+
+    def build(conn):
+        rows = conn.execute(
+            f"""SELECT {RUN_COLUMNS} FROM runs
+                WHERE (? IS NULL OR id < ?) AND (? IS NULL OR category = ?)
+                ORDER BY id DESC LIMIT ?""",
+            (after and after[0], after and after[0], category, category, limit + 1)
+        ).fetchall()
+        return _page([dict(r) for r in rows], limit, lambda r: (r['id'],))
+
+    return await _json_response(request, build)
+
+
+@app.get('/runs/{run_id}')
+async def get_run(request: Request, run_id: int):
+    def build(conn):
+        row = conn.execute(f"SELECT {RUN_COLUMNS} FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise HTTPException(status_code=404, detail=f'Run {run_id} not found')
+        narratives = conn.execute(
+            f"""SELECT {NARRATIVE_COLUMNS} FROM narratives n
+                WHERE n.run_id = ? ORDER BY n.entropy_risk DESC, n.id""",
+            (run_id,)
+        ).fetchall()
+        return {**dict(row), 'narratives': _narrative_dicts(conn, narratives)}
+
+    return await _json_response(request, build)
+
+
+@app.get('/narratives')
+async def list_narratives(request: Request,
+                          limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                          cursor: Optional[str] = None,
+                          run_id: Optional[int] = None,
+                          thread_id: Optional[int] = None,
+                          min_risk: Optional[int] = Query(None, ge=1, le=10),
+                          since: Optional[int] = None,
+                          until: Optional[int] = None):
+    after = _decode_cursor(cursor, 2)
+
+    def build(conn):
+        where, params = [], []
+        if after:
+            where.append("(n.created_epoch, n.id) < (?, ?)")
+            params += after
+        if since is not None:
+            where.append("n.created_epoch >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("n.created_epoch < ?")
+            params.append(until)
+        if run_id is not None:
+            where.append("n.run_id = ?")
+            params.append(run_id)
+        if thread_id is not None:
+            where.append("n.thread_id = ?")
+            params.append(thread_id)
+        if min_risk is not None:
+            where.append("n.entropy_risk >= ?")
+            params.append(min_risk)
+        clause = f"WHERE {' AND '.join(where)}" if where else ''
+        rows = conn.execute(
+            f"""SELECT {NARRATIVE_COLUMNS} FROM narratives n {clause}
+                ORDER BY n.created_epoch DESC, n.id DESC LIMIT ?""",
+            params + [limit + 1]
+        ).fetchall()
+        return _page(_narrative_dicts(conn, rows), limit,
+                     lambda n: (n['created_epoch'], n['id']))
+
+    return await _json_response(request, build)
+
+
+@app.get('/narratives/{narrative_id}')
+async def get_narrative(request: Request, narrative_id: str):
+    def build(conn):
+        row = conn.execute(
+            f"SELECT {NARRATIVE_COLUMNS} FROM narratives n WHERE n.id = ?", (narrative_id,)
+        ).fetchone()
+        if row is None:
+            raise HTTPException(status_code=404, detail=f'Narrative {narrative_id} not found')
+        narrative = _narrative_dicts(conn, [row])[0]
+        # Supporting feeds predate the narrative by at most its run's window,
+        # which bounds the archives (retention.py) that need attaching.
+        since = conn.execute(
+            """SELECT n.created_epoch - CAST(r.hours_back * 3600 AS INTEGER) - 3600
+               FROM narratives n JOIN runs r ON r.id = n.run_id WHERE n.id = ?""",
+            (narrative_id,)
+        ).fetchone()[0]
+        with all_feeds(conn, since=since) as feeds_view:
+            feeds = conn.execute(
+                f"""SELECT {FEED_COLUMNS} FROM {feeds_view}
+                    WHERE id IN (SELECT feed_id FROM narrative_feeds WHERE narrative_id = ?)
+                    ORDER BY published_epoch DESC""",
+                (narrative_id,)
+            ).fetchall()
+        return {**narrative, 'feeds': [dict(f) for f in feeds]}
+
+    return await _json_response(request, build)
+
+
+@app.get('/feeds')
+async def list_feeds(request: Request,
+                     limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                     cursor: Optional[str] = None,
+                     run_id: Optional[int] = None,
+                     source: Optional[str] = None,
+                     author: Optional[str] = None,
+                     since: Optional[int] = None,
+                     until: Optional[int] = None):
+    after = _decode_cursor(cursor, 2)
+
+    def build(conn):
+        where, params = [], []
+        if after:
+            where.append("(published_epoch, id) < (?, ?)")
+            params += after
+        if since is not None:
+            where.append("published_epoch >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("published_epoch < ?")
+            params.append(until)
+        for column, value in (('run_id', run_id), ('source', source), ('author', author)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        clause = f"WHERE {' AND '.join(where)}" if where else ''
+        rows = conn.execute(
+            f"""SELECT {FEED_COLUMNS} FROM feeds {clause}
+                ORDER BY published_epoch DESC, id DESC LIMIT ?""",
+            params + [limit + 1]
+        ).fetchall()
+        return _page([dict(r) for r in rows], limit,
+                     lambda f: (f['published_epoch'], f['id']))
+
+    return await _json_response(request, build)
+
+
+@app.get('/alerts')
+async def list_alerts(request: Request,
+                      limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                      cursor: Optional[str] = None,
+                      author: Optional[str] = None):
+    after = _decode_cursor(cursor, 1)
+
+    def build(conn):
+        rows = conn.execute(
+            f"""SELECT {ALERT_COLUMNS} FROM alerts
+                WHERE (? IS NULL OR id < ?) AND (? IS NULL OR author = ?)
+                ORDER BY id DESC LIMIT ?""",
+            (after and after[0], after and after[0], author, author, limit + 1)
+        ).fetchall()
+        return _page(_alert_dicts(rows), limit, lambda a: (a['id'],))
+
+    return await _json_response(request, build)
+
+
+# ============================================================================
+# SERVER-SENT EVENTS
+# ============================================================================
+
+def _narratives_after(seq: int, limit: int = 100) -> List[Dict[str, Any]]:
+    with connection() as conn:
+        rows = conn.execute(
+            f"""SELECT {NARRATIVE_COLUMNS} FROM narratives n
+                WHERE n.rowid > ? ORDER BY n.rowid LIMIT ?""",
+            (seq, limit)
+        ).fetchall()
+        narratives = _narrative_dicts(conn, rows)
+    for narrative, row in zip(narratives, rows):
+        narrative['seq'] = row['seq']
+    return narratives
+
+
+def _latest_seq() -> int:
+    with connection() as conn:
+        return conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM narratives").fetchone()[0]
+
+
+@app.get('/stream/narratives')
+async def stream_narratives(request: Request, since: Optional[int] = None):
+    """
+    Push each narrative as its run is persisted.
+
+    Starts from now, from ``?since=<seq>``, or — on reconnect — from the
+    Last-Event-ID the browser's EventSource sends automatically, so no
+    narrative is missed across a dropped connection.
+    """
+    last_event_id = request.headers.get('last-event-id')
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    async def events():
+        seq = since if since is not None else await asyncio.to_thread(_latest_seq)
+        last_sent = time.monotonic()
+        yield 'retry: 5000\n\n'
+        while not await request.is_disconnected():
+            for narrative in await asyncio.to_thread(_narratives_after, seq):
+                seq = narrative['seq']
+                yield f"id: {seq}\nevent: narrative\ndata: {json.dumps(narrative)}\n\n"
+                last_sent = time.monotonic()
+            if time.monotonic() - last_sent >= SSE_HEARTBEAT_SECONDS:
+                yield ': keepalive\n\n'
+                last_sent = time.monotonic()
+            await asyncio.sleep(SSE_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache',
+                                      'X-Accel-Buffering': 'no'})
+
+
+def _alerts_after(seq: int, limit: int = 100) -> List[Dict[str, Any]]:
+    with connection() as conn:
+        rows = conn.execute(
+            f"SELECT {ALERT_COLUMNS} FROM alerts WHERE id > ? ORDER BY id LIMIT ?",
+            (seq, limit)
+        ).fetchall()
+    return _alert_dicts(rows)
+
+
+def _latest_alert_id() -> int:
+    with connection() as conn:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM alerts").fetchone()[0]
+
+
+@app.get('/stream/alerts')
+async def stream_alerts(request: Request, since: Optional[int] = None):
+    """Push each fast-path alert as it is written; resumes like /stream/narratives."""
+    last_event_id = request.headers.get('last-event-id')
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    async def events():
+        seq = since if since is not None else await asyncio.to_thread(_latest_alert_id)
+        last_sent = time.monotonic()
+        yield 'retry: 2000\n\n'
+        while not await request.is_disconnected():
+            for alert in await asyncio.to_thread(_alerts_after, seq):
+                seq = alert['id']
+                yield f"id: {seq}\nevent: alert\ndata: {json.dumps(alert)}\n\n"
+                last_sent = time.monotonic()
+            if time.monotonic() - last_sent >= SSE_HEARTBEAT_SECONDS:
+                yield ': keepalive\n\n'
+                last_sent = time.monotonic()
+            await asyncio.sleep(ALERT_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache',
+                                      'X-Accel-Buffering': 'no'})
+
+
+if __name__ == '__main__':
+    import argparse
+    import uvicorn
+    from models import init_schema
+
+    parser = argparse.ArgumentParser(description='RedHood Insights read API')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address')
+    parser.add_argument('--port', type=int, default=8000, help='Bind port')
+    args = parser.parse_args()
+
+    init_schema()
+    print(f"🌐 RedHood API on http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+RedHood Insights - Offline Benchmark Suite
+===========================================
+Reproducible, network-free benchmarks for the full pipeline.
+
+Everything external is replaced by local fakes:
+    - a stub HTTP server serving Nitter RSS, Substack RSS, Yahoo chart
+      JSON and the GitHub Contents API on 127.0.0.1
+    - a fake Anthropic client with configurable latency
+
+Benchmarks (each run at several synthetic feed counts):
+    scrape    Nitter + Substack RSS fetch/parse via the stub server
+    prompt    token-budget packing + prompt formatting
+    extract   packing + fake Claude call + parsing, end to end
+    parse     Claude JSON response -> Narrative objects
+    persist   runs/feeds/narratives insert into a scratch SQLite DB
+    render    RedHood Reads HTML report
+    publish   GitHub Pages publish against the stub Contents API
+
+Nothing touches redhood.db: REDHOOD_DB_PATH is pointed at a scratch
+database before any RedHood module is imported, so every component that
+defaults to db.DB_PATH (accounts, polling, metrics, rollups, vector index,
+risk) uses it too.
+
+Each result records items/s and peak traced memory, and is compared with
+bench_baseline.json. Regressions beyond --tolerance make the exit code 1.
+
+Usage:
+    python bench.py                              # default sizes, compare to baseline
+    python bench.py --sizes 10,1000,100000       # custom synthetic sizes
+    python bench.py --only prompt,parse          # subset of benchmarks
+    python bench.py --api-latency 0.5            # fake Claude latency (s)
+    python bench.py --save-baseline              # record current numbers
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+import zlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+# Before the imports below: modules bind db.DB_PATH as their default at import
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), f"redhood_bench_{os.getpid()}.db")
+os.environ['REDHOOD_DB_PATH'] = SCRATCH_DB
+
+import db
+import redhood_aggregator as R
+from models import init_schema
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+DEFAULT_SIZES = [10, 1000, 10000]
+SEED = 1729
+
+_WORDS = ('fed powell cpi inflation opec oil brent yields curve treasury qqq spy nvda '
+          'earnings guidance credit spreads hy volatility vix gold bitcoin etf flows '
+          'china stimulus tariffs jobs payrolls pivot cut hike liquidity repo').split()
+_TICKERS = ['$QQQ', '$SPY', '$NVDA', '$TLT', '$USO', '$GLD', '$HYG', '$BTC']
+
+
+# ============================================================================
+# SYNTHETIC DATA
+# ============================================================================
+
+def _sentence(rng: random.Random, words: int) -> str:
+    body = ' '.join(rng.choice(_WORDS) for _ in range(words))
+    return f"{body.capitalize()} {rng.choice(_TICKERS)}."
+
+
+def make_feeds(n: int, seed: int = SEED) -> List[R.FeedItem]:
+    """n synthetic FeedItems: ~80% short tweets, ~20% long Substack posts."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    feeds = []
+    for i in range(n):
+        ts = now - timedelta(seconds=i * 7)
+        if rng.random() < 0.8:
+            html = f"<p>{_sentence(rng, rng.randint(8, 30))}</p>"
+            feeds.append(R.FeedItem('twitter', f"@acct{i % 50}", html, ts,
+                                    url=f"https://x.com/acct{i % 50}/status/{i}",
+                                    metadata={'nitter_instance': 'stub'}))
+        else:
+            paras = ''.join(f"<p>{_sentence(rng, rng.randint(20, 60))}</p>"
+                            for _ in range(rng.randint(5, 25)))
+            html = f"{paras}<p>Subscribe now</p><figure><img src='x.png'></figure>"
+            feeds.append(R.FeedItem('rss', f"Substack {i % 7}", html, ts,
+                                    url=f"https://sub{i % 7}.substack.com/p/{i}"))
+    return feeds
+
+
+def make_rss_xml(title: str, items: int, seed: int, base_url: str) -> bytes:
+    """RSS 2.0 document, newest item first, one item per minute."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)  # format_datetime(usegmt=True) needs an aware UTC value
+    entries = []
+    for i in range(items):
+        pub = format_datetime(now - timedelta(minutes=i), usegmt=True)
+        desc = f"<p>{_sentence(rng, rng.randint(10, 40))}</p>".replace('<', '&lt;').replace('>', '&gt;')
+        entries.append(
+            f"<item><title>Item {i}</title><link>{base_url}/status/{i}</link>"
+            f"<pubDate>{pub}</pubDate><description>{desc}</description></item>"
+        )
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f'<title>{title}</title><link>{base_url}</link>{"".join(entries)}'
+            f'</channel></rss>').encode('utf-8')
+
+
+def make_response_text(n_feeds: int, n_narratives: int = 3, seed: int = SEED) -> str:
+    rng = random.Random(seed)
+    return json.dumps({'narratives': [{
+        'title': f"Synthetic narrative {k} {rng.choice(_WORDS)}",
+        'entropy_risk': rng.randint(1, 10),
+        'hypothesis': f"Long {rng.choice(_TICKERS)[1:]} calls, short {rng.choice(_TICKERS)[1:]}",
+        'rationale': _sentence(rng, 30),
+        'catalysts': [_sentence(rng, 4) for _ in range(3)],
+        'supporting_feed_indices': sorted(rng.sample(range(1, n_feeds + 1), min(5, n_feeds))),
+    } for k in range(n_narratives)]})
+
+
+# ============================================================================
+# LOCAL FAKES
+# ============================================================================
+
+class StubServer:
+    """Threaded HTTP server standing in for Nitter, Substack, Yahoo and GitHub."""
+
+    def __init__(self, items_per_feed: int = 20):
+        self.items_per_feed = items_per_feed
+        self._cache: Dict[str, bytes] = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code: int, body: bytes, ctype: str):
+                self.send_response(code)
+                self.send_header('Content-Type', ctype)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path.startswith('/v8/finance/chart/'):
+                    body = json.dumps({'chart': {'result': [{'meta': {
+                        'regularMarketPrice': 101.5, 'previousClose': 100.0}}]}}).encode()
+                    self._send(200, body, 'application/json')
+                elif path.startswith('/repos/'):
+                    self._send(404, b'{"message": "Not Found"}', 'application/json')
+                elif path.endswith('/rss') or path.startswith('/feed/'):
+                    self._send(200, stub.feed_body(path), 'application/rss+xml')
+                else:
+                    self._send(404, b'', 'text/plain')
+
+            def do_PUT(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self.rfile.read(length)
+                self._send(201, b'{"content": {"sha": "stub"}}', 'application/json')
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.host = f"127.0.0.1:{self.server.server_address[1]}"
+        self.url = f"http://{self.host}"
+
+    def feed_body(self, path: str) -> bytes:
+        if path not in self._cache:
+            self._cache[path] = make_rss_xml(path.strip('/'), self.items_per_feed,
+                                             seed=zlib.crc32(path.encode()), base_url=self.url + path)
+        return self._cache[path]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeAnthropic:
+    """Minimal stand-in for anthropic.Anthropic with configurable latency."""
+
+    def __init__(self, latency_s: float = 0.0, response_text: str = None):
+        outer = self
+        self.latency_s = latency_s
+        self.response_text = response_text or make_response_text(50)
+
+        class _Messages:
+            def create(self, **kwargs):
+                time.sleep(outer.latency_s)
+                usage = types.SimpleNamespace(input_tokens=1000, output_tokens=600,
+                                              cache_creation_input_tokens=0,
+                                              cache_read_input_tokens=1200)
+                return types.SimpleNamespace(
+                    content=[types.SimpleNamespace(type='text', text=outer.response_text)],
+                    usage=usage, stop_reason='end_turn')
+
+            def count_tokens(self, **kwargs):
+                text = kwargs['messages'][0]['content']
+                return types.SimpleNamespace(input_tokens=len(text) // 4)
+
+        self.messages = _Messages()
+
+
+# ============================================================================
+# BENCHMARK HARNESS
+# ============================================================================
+
+def measure(fn: Callable[[], int], repeat: int = 3) -> Dict[str, float]:
+    """
+    Run fn (returning the number of items processed) and report the best
+    wall time of ``repeat`` runs plus the peak traced memory of one run.
+    """
+    best = float('inf')
+    items = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        items = fn()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'items': items,
+        'seconds': round(best, 6),
+        'items_per_s': round(items / best, 1) if best > 0 else float('inf'),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+class Bench:
+    """Builds the benchmark closures for one synthetic size."""
+
+    def __init__(self, size: int, workdir: str, server: StubServer, api_latency: float):
+        self.size = size
+        self.workdir = workdir
+        self.server = server
+        self.feeds = make_feeds(size)
+        self.extractor = R.NarrativeExtractor('bench')
+        self.extractor.client = FakeAnthropic(api_latency, make_response_text(min(size, 50)))
+        self.narratives = self.extractor._parse_claude_response(
+            make_response_text(min(size, 50)), self.feeds[:50])
+
+    def scrape(self) -> int:
+        # Nitter caps at 20 entries per account, so size maps to accounts
+        accounts = [f"acct{i}" for i in range(max(1, min(self.size // 20, 200)))]
+        scraper = R.NitterScraper([self.server.host], scheme='http')
+        items = scraper.fetch(accounts, hours_back=24)
+        feeds = [f"{self.server.url}/feed/{i}" for i in range(max(1, min(self.size // 200, 20)))]
+        items += R.RSSFeedScraper.fetch(feeds, hours_back=24)
+        return len(items)
+
+    def prompt(self) -> int:
+        packed = self.extractor.packer.pack(self.feeds, max_feeds=R.Config.MAX_FEEDS_TO_PROCESS)
+        text = self.extractor._format_feeds_for_prompt(packed)
+        self.extractor._build_extraction_request(text)
+        return len(self.feeds)
+
+    def extract(self) -> int:
+        narratives = self.extractor.extract_narratives(self.feeds,
+                                                       max_feeds=R.Config.MAX_FEEDS_TO_PROCESS)
+        return len(narratives)
+
+    def parse(self) -> int:
+        text = make_response_text(min(self.size, 50))
+        return len(self.extractor._parse_claude_response(text, self.feeds[:50]))
+
+    def persist(self) -> int:
+        db_path = os.path.join(self.workdir, f"bench_{self.size}.db")
+        db.close_all()  # pooled handles would otherwise outlive the deleted file
+        for path in (db_path, db_path + '-wal', db_path + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        init_schema(db_path)
+        R.DB_PATH = db_path
+        agg = R.RedHoodAggregator.__new__(R.RedHoodAggregator)
+        agg._persist_to_db(24, self.feeds, self.narratives, 'bench.json', 'bench.html')
+        return len(self.feeds)
+
+    def render(self) -> int:
+        agg = R.RedHoodAggregator.__new__(R.RedHoodAggregator)
+        results = {'feeds': [f.to_dict() for f in self.feeds]}
+        path = os.path.join(self.workdir, f"bench_{self.size}.html")
+        agg._save_html_report(results, self.narratives, path,
+                              datetime.now().strftime('%Y%m%d_%H%M%S'), 24,
+                              ticker_html=agg._fetch_ticker_prices())
+        return len(self.feeds)
+
+    def publish(self) -> int:
+        path = os.path.join(self.workdir, f"bench_{self.size}.html")
+        if not os.path.exists(path):
+            self.render()
+
+        class StubPublisher(R.GitHubPagesPublisher):
+            API_URL = self.server.url
+
+        StubPublisher('bench-token').publish(path)
+        return 1
+
+
+BENCHMARKS = ['scrape', 'prompt', 'extract', 'parse', 'persist', 'render', 'publish']
+
+
+def run_suite(sizes: List[int], only: List[str], api_latency: float,
+              repeat: int) -> Dict[str, Dict[str, Dict]]:
+    results: Dict[str, Dict[str, Dict]] = {name: {} for name in only}
+    workdir = tempfile.mkdtemp(prefix='redhood_bench_')
+    original_db, original_yahoo = R.DB_PATH, R.Config.YAHOO_CHART_URL
+    devnull = open(os.devnull, 'w')
+    init_schema(SCRATCH_DB)
+    try:
+        with StubServer() as server:
+            R.Config.YAHOO_CHART_URL = f"{server.url}/v8/finance/chart/"
+            for size in sizes:
+                bench = Bench(size, workdir, server, api_latency)
+                for name in only:
+                    stdout, sys.stdout = sys.stdout, devnull  # pipeline prints a lot
+                    try:
+                        results[name][str(size)] = measure(getattr(bench, name), repeat)
+                    finally:
+                        sys.stdout = stdout
+                    r = results[name][str(size)]
+                    print(f"  {name:<8} n={size:<7} {r['items_per_s']:>12,.1f} items/s "
+                          f"{r['seconds'] * 1000:>10.2f} ms {r['peak_kb']:>10,.1f} KB peak")
+    finally:
+        R.DB_PATH, R.Config.YAHOO_CHART_URL = original_db, original_yahoo
+        devnull.close()
+        db.close_all()
+        shutil.rmtree(workdir, ignore_errors=True)
+        for path in (SCRATCH_DB, SCRATCH_DB + '-wal', SCRATCH_DB + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return human-readable regressions vs. the stored baseline."""
+    regressions = []
+    print(f"\n{'Benchmark':<10} {'Size':>7} {'items/s Δ':>11} {'peak KB Δ':>11}")
+    print("-" * 42)
+    for name, by_size in results.items():
+        for size, r in by_size.items():
+            base = baseline.get(name, {}).get(size)
+            if not base:
+                continue
+            speed = (r['items_per_s'] - base['items_per_s']) / base['items_per_s'] * 100
+            mem = ((r['peak_kb'] - base['peak_kb']) / base['peak_kb'] * 100
+                   if base['peak_kb'] else 0.0)
+            flag = ''
+            if speed < -tolerance * 100 or mem > tolerance * 100:
+                flag = '  ⚠️  regression'
+                regressions.append(f"{name} n={size}: items/s {speed:+.1f}%, peak {mem:+.1f}%")
+            print(f"{name:<10} {size:>7} {speed:>+10.1f}% {mem:>+10.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RedHood offline benchmark suite')
+    parser.add_argument('--sizes', type=str, default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated synthetic feed counts (10 to 100000)')
+    parser.add_argument('--only', type=str, default=','.join(BENCHMARKS),
+                        help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--api-latency', type=float, default=0.0,
+                        help='Fake Claude API latency in seconds (extract benchmark)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per benchmark')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed fractional regression vs. baseline (default 0.2)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f'Write results to {os.path.basename(BASELINE_PATH)}')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    only = [b.strip() for b in args.only.split(',') if b.strip() in BENCHMARKS]
+
+    print("=" * 60)
+    print("⏱️  REDHOOD INSIGHTS - Offline Benchmarks")
+    print("=" * 60)
+    results = run_suite(sizes, only, args.api_latency, args.repeat)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline saved to: {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("\nNo baseline yet — run with --save-baseline to record one.")
+        return 0
+    with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print("\n✅ Within tolerance of baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
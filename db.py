@@ -0,0 +1,168 @@
+"""
+RedHood Insights - Database Access Layer
+=========================================
+Single home for the SQLite path and connection handling, shared by the
+aggregator, accounts CLI, metrics, threading and any reader processes.
+
+Connections come from a small per-database pool:
+    - WAL journal mode, so readers never block the writer and vice versa
+      (persistent in the file header; redhood.db is therefore not tracked
+      in git and is created by models.init_schema / accounts_db.init_db)
+    - busy_timeout, so a writer waits for a lock instead of failing with
+      "database is locked"
+    - a per-connection prepared-statement cache, reused across checkouts
+    - sqlite3.Row rows (index and name access)
+
+Usage:
+    from db import connection, transaction
+
+    with connection() as conn:              # reads / simple writes
+        conn.execute("SELECT ...")
+
+    with transaction() as conn:             # multi-statement writes
+        conn.execute("INSERT ...")          # BEGIN IMMEDIATE ... COMMIT
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+# REDHOOD_DB_PATH points every module's default database elsewhere (e.g. the
+# benchmark's scratch file); read once, when db is first imported
+DB_PATH = (os.getenv('REDHOOD_DB_PATH')
+           or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'redhood.db'))
+
+POOL_SIZE = 8                 # max open connections per database file
+BUSY_TIMEOUT_MS = 10000       # how long a writer waits for the lock
+STATEMENT_CACHE_SIZE = 256    # prepared statements kept per connection
+
+
+class ConnectionPool:
+    """Thread-safe LIFO pool of SQLite connections to one database file."""
+
+    def __init__(self, db_path: str, size: int = POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,     # the pool hands each conn to one thread at a time
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode = WAL")   # persistent per file; cheap if already set
+        conn.execute("PRAGMA synchronous = NORMAL")  # durable enough under WAL, far fewer fsyncs
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        # Pool exhausted: wait for a connection to come back
+        try:
+            return self._idle.get(timeout=BUSY_TIMEOUT_MS / 1000)
+        except queue.Empty:
+            raise RuntimeError(
+                f"SQLite pool for {self.db_path} exhausted: all {self.size} connections "
+                f"stayed checked out for {BUSY_TIMEOUT_MS / 1000:g}s (a caller holding one "
+                f"connection while opening another, or more threads than POOL_SIZE)"
+            ) from None
+
+    def release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def discard(self, conn: sqlite3.Connection):
+        """Drop a connection that may be unusable."""
+        try:
+            conn.close()
+        finally:
+            with self._lock:
+                self._created -= 1
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(conn)
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str = DB_PATH) -> ConnectionPool:
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(key)
+        return _pools[key]
+
+
+@contextmanager
+def connection(db_path: str = DB_PATH) -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a pooled connection.
+
+    Commits on normal exit and rolls back if the block raises, so callers
+    only need explicit commit() for intermediate checkpoints.
+    """
+    pool = get_pool(db_path)
+    conn = pool.acquire()
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    except BaseException:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            pool.discard(conn)   # broken connection; don't hand it out again
+        else:
+            pool.release(conn)
+        raise
+    else:
+        pool.release(conn)
+
+
+@contextmanager
+def transaction(db_path: str = DB_PATH) -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a pooled connection inside BEGIN IMMEDIATE ... COMMIT.
+
+    Taking the write lock up front avoids the deferred-transaction upgrade
+    that fails immediately with SQLITE_BUSY under concurrent writers.
+    """
+    with connection(db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+
+
+def close_all():
+    """Close every pooled connection (e.g. before deleting a scratch DB)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
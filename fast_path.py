@@ -0,0 +1,315 @@
+"""
+RedHood Insights - Breaking-Headline Fast Path
+===============================================
+A market-moving squawk shouldn't wait for the batch cycle (all sources,
+one large Claude call, render, publish). This loop polls a few
+high-priority accounts every POLL_INTERVAL_S, scores each new item with
+local keyword/entity rules, and for urgent ones makes one small-model
+call that turns the headline into an alert narrative.
+
+    poll (Nitter, streaming RSS)  →  rules  →  TRIAGE_MODEL  →  alerts table
+                                                             →  webhook (REDHOOD_ALERT_WEBHOOK)
+                                                             →  GET /stream/alerts (api.py)
+
+Every alert stores when its rules fired and when it was written, so
+detection-to-alert latency is measurable (``--stats``). If the analysis
+call fails the alert is still written from the headline alone — speed
+beats polish here.
+
+Usage:
+    python fast_path.py                              # poll REDHOOD_FAST_PATH_ACCOUNTS forever
+    python fast_path.py --accounts FirstSquawk,DeItaone --interval 10
+    python fast_path.py --once                       # single poll (cron / testing)
+    python fast_path.py --stats                      # alert latency p50/p95
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import response_parser
+from db import DB_PATH, connection, transaction
+from governor import get_governor
+from models import to_epoch
+from redhood_aggregator import Config, FeedItem, NarrativeExtractor, NitterScraper
+
+FAST_PATH_ACCOUNTS = [a.strip().lstrip('@') for a in
+                      os.getenv('REDHOOD_FAST_PATH_ACCOUNTS', 'FirstSquawk').split(',') if a.strip()]
+POLL_INTERVAL_S = float(os.getenv('REDHOOD_FAST_PATH_INTERVAL', '15'))
+LOOKBACK_MINUTES = 10            # items older than this are never alerted
+ALERT_WEBHOOK = os.getenv('REDHOOD_ALERT_WEBHOOK', '')
+WEBHOOK_TIMEOUT_S = 5
+ALERT_MAX_TOKENS = 500
+URGENT_SCORE = 3                 # summed rule weight that makes an item urgent
+SEEN_CACHE_SIZE = 5000           # alert keys already scored
+
+# (name, weight, pattern) — matched case-insensitively against clean text
+_RULE_PATTERNS = [
+    ('flash',         3, r'\b(breaking|urgent|flash|just in)\b|^\s*\*'),   # squawks lead with '*'
+    ('central_bank',  3, r'\b(fed|fomc|powell|ecb|lagarde|boj|ueda|boe|pboc|snb)\b.*'
+                         r'\b(hikes?|cuts?|rates?|bps|emergency|intervene|intervention|qe|qt)\b'),
+    ('macro_print',   2, r'\b(cpi|ppi|pce|nfp|nonfarm|payrolls|gdp|unemployment rate|ism|retail sales)\b'),
+    ('vs_estimate',   1, r'\b(vs\.?|est\.?|expected|consensus|prior)\b'),
+    ('geopolitical',  3, r'\b(attack(ed|s)?|missiles?|invad\w*|invasion|war|ceasefire|sanctions?|'
+                         r'embargo|nuclear)\b'),
+    ('market_stress', 3, r'\b(halt(ed|s)?|circuit breaker|bankrupt\w*|default(s|ed)?|downgrad\w*|'
+                         r'bailout|liquidat\w*)\b'),
+    ('deal',          2, r'\b(acquir\w*|merger|takeover|buyout|tariffs?)\b'),
+    ('ticker',        1, r'\$[a-z]{1,5}\b'),
+    ('big_number',    1, r'[-+]?\d+(\.\d+)?\s?(%|bps|bp)\b'),
+]
+RULES: List[Tuple[str, int, re.Pattern]] = [(name, weight, re.compile(pattern, re.I))
+                                            for name, weight, pattern in _RULE_PATTERNS]
+
+
+def alert_key(item: FeedItem) -> str:
+    """
+    Dedupe key for an item.
+
+    FeedItem.id is author + epoch second, and squawk accounts often post
+    two headlines in the same second, so the id is suffixed with a hash of
+    the tweet's status path (the same on every Nitter mirror) or, without
+    a URL, of the text.
+    """
+    basis = urlsplit(item.url).path if item.url else item.clean_text
+    return f"{item.id}_{hashlib.sha1(basis.encode('utf-8')).hexdigest()[:12]}"
+
+
+def score_item(text: str) -> Tuple[int, List[str]]:
+    """Summed weight and names of the rules an item's text matches."""
+    matched = [(name, weight) for name, weight, pattern in RULES if pattern.search(text)]
+    return sum(w for _, w in matched), [name for name, _ in matched]
+
+
+class FastPath:
+    """Polls priority accounts and turns urgent items into alerts."""
+
+    ALERT_SYSTEM_PROMPT = """You are a macro trading desk's headline analyst. A breaking item just crossed from a news squawk account. Within seconds, turn it into one actionable alert.
+
+Score "entropy_risk" 1-10 for how much uncertainty and volatility the headline injects (1 = already priced, 10 = regime shift). Be specific with the trade (instrument and direction). If the headline is not actually market-moving, say so in the rationale and keep entropy_risk low.
+
+OUTPUT FORMAT (strict JSON):
+{
+  "title": "Alert title (5-8 words)",
+  "entropy_risk": 1-10,
+  "hypothesis": "Specific immediate trade idea",
+  "rationale": "Why, in 1-2 sentences",
+  "catalysts": ["What to watch next"]
+}
+
+Return ONLY valid JSON."""
+
+    def __init__(self, accounts: List[str] = None, api_key: str = None,
+                 webhook: str = ALERT_WEBHOOK, db_path: str = DB_PATH):
+        self.accounts = accounts or FAST_PATH_ACCOUNTS
+        self.scraper = NitterScraper(Config.NITTER_INSTANCES)
+        api_key = api_key if api_key is not None else Config.ANTHROPIC_API_KEY
+        self.extractor = NarrativeExtractor(api_key) if api_key else None
+        self.model = Config.TRIAGE_MODEL
+        self.webhook = webhook
+        self.db_path = db_path
+        self._seen: 'OrderedDict[str, None]' = OrderedDict()
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='redhood-alert')
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+
+    def poll_once(self) -> List[Dict[str, Any]]:
+        """One poll of every account; returns the alerts written."""
+        items = self.scraper.fetch(self.accounts, hours_back=LOOKBACK_MINUTES / 60)
+        fresh = [item for item in items if alert_key(item) not in self._seen]
+        for item in fresh:
+            self._seen[alert_key(item)] = None
+        while len(self._seen) > SEEN_CACHE_SIZE:
+            self._seen.popitem(last=False)
+
+        urgent = []
+        for item in fresh:
+            score, rules = score_item(item.clean_text)
+            if score >= URGENT_SCORE:
+                urgent.append((item, score, rules, time.time()))
+        if not urgent:
+            return []
+
+        alerted = self._already_alerted([alert_key(item) for item, *_ in urgent])
+        urgent = [u for u in urgent if alert_key(u[0]) not in alerted]
+        # Context for the model: the account's other recent posts
+        by_author: Dict[str, List[FeedItem]] = {}
+        for item in items:
+            by_author.setdefault(item.author, []).append(item)
+        futures = [self._pool.submit(self.alert, item, score, rules, detected,
+                                     by_author.get(item.author, []))
+                   for item, score, rules, detected in urgent]
+        return [f.result() for f in futures]
+
+    def run(self, interval: float = POLL_INTERVAL_S):
+        """Poll forever, every ``interval`` seconds."""
+        print(f"⚡ Fast path on {', '.join('@' + a for a in self.accounts)} "
+              f"every {interval:g}s (model: {self.model if self.extractor else 'rules only'})")
+        while True:
+            started = time.monotonic()
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"⚠️  Fast-path poll failed: {e}")
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def _already_alerted(self, keys: List[str]) -> set:
+        placeholders = ','.join('?' * len(keys))
+        with connection(self.db_path) as conn:
+            return {r[0] for r in conn.execute(
+                f"SELECT feed_id FROM alerts WHERE feed_id IN ({placeholders})", keys)}
+
+    # ------------------------------------------------------------------
+    # Alerting
+    # ------------------------------------------------------------------
+
+    def alert(self, item: FeedItem, score: int, rules: List[str], detected: float,
+              context: List[FeedItem] = None) -> Dict[str, Any]:
+        """Analyze an urgent item and publish the alert to every sink."""
+        analysis = self._analyze(item, rules, context or [])
+        alerted = time.time()
+        alert = {
+            'feed_id': alert_key(item),
+            'author': item.author,
+            'headline': item.clean_text,
+            'url': item.url,
+            'rules': rules,
+            'score': score,
+            'title': (analysis or {}).get('title') or item.clean_text[:120],
+            'entropy_risk': (analysis or {}).get('entropy_risk'),
+            'hypothesis': (analysis or {}).get('hypothesis'),
+            'rationale': (analysis or {}).get('rationale'),
+            'catalysts': (analysis or {}).get('catalysts', []),
+            'model': self.model if analysis else None,
+            'published_epoch': to_epoch(item.timestamp),
+            'detected_epoch': detected,
+            'alerted_epoch': alerted,
+            'detect_to_alert_ms': round((alerted - detected) * 1000, 1),
+            'created_at': datetime.utcnow().isoformat(),
+        }
+        alert['id'] = self._store(alert)
+        if alert['id'] is None:
+            return alert            # another poller got there first
+        if self.webhook:
+            threading.Thread(target=self._post_webhook, args=(alert,), daemon=True).start()
+        print(f"🚨 {item.author} [{', '.join(rules)}] {alert['title']} "
+              f"— detect→alert {alert['detect_to_alert_ms']:.0f} ms, "
+              f"publish→alert {alerted - alert['published_epoch']:.0f} s")
+        return alert
+
+    def _analyze(self, item: FeedItem, rules: List[str],
+                 context: List[FeedItem]) -> Optional[Dict[str, Any]]:
+        """One small-model call; None means fall back to a rules-only alert."""
+        if self.extractor is None:
+            return None
+        recent = "\n".join(f"- {c.timestamp:%H:%M} {c.clean_text}"
+                           for c in context if c is not item)[:2000]
+        try:
+            response = get_governor().create(
+                self.extractor.client,
+                model=self.model,
+                max_tokens=ALERT_MAX_TOKENS,
+                system=self.ALERT_SYSTEM_PROMPT,
+                messages=[{"role": "user", "content":
+                           f"HEADLINE ({item.author}, {item.timestamp:%Y-%m-%d %H:%M} UTC):\n"
+                           f"{item.clean_text}\n\nMatched rules: {', '.join(rules)}\n\n"
+                           f"Recent posts from the same account:\n{recent or '(none)'}"}],
+            )
+        except Exception as e:
+            print(f"⚠️  Alert analysis failed ({e}); alerting from the headline")
+            return None
+        data, _ = response_parser.payload_from_response(response)
+        valid, errors = response_parser.valid_narratives([data] if isinstance(data, dict) else data)
+        if not valid:
+            print(f"⚠️  Unusable alert analysis ({'; '.join(errors)[:200]}); alerting from the headline")
+            return None
+        return valid[0]
+
+    def _store(self, alert: Dict[str, Any]) -> Optional[int]:
+        with transaction(self.db_path) as conn:
+            cursor = conn.execute(
+                """INSERT OR IGNORE INTO alerts
+                   (feed_id, author, headline, url, rules, score, title, entropy_risk,
+                    hypothesis, rationale, catalysts, model, published_epoch,
+                    detected_epoch, alerted_epoch, detect_to_alert_ms, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (alert['feed_id'], alert['author'], alert['headline'], alert['url'],
+                 json.dumps(alert['rules']), alert['score'], alert['title'],
+                 alert['entropy_risk'], alert['hypothesis'], alert['rationale'],
+                 json.dumps(alert['catalysts']), alert['model'], alert['published_epoch'],
+                 alert['detected_epoch'], alert['alerted_epoch'],
+                 alert['detect_to_alert_ms'], alert['created_at'])
+            )
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def _post_webhook(self, alert: Dict[str, Any]):
+        request = urllib.request.Request(
+            self.webhook, data=json.dumps(alert).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}, method='POST')
+        try:
+            urllib.request.urlopen(request, timeout=WEBHOOK_TIMEOUT_S).close()
+        except Exception as e:
+            print(f"⚠️  Alert webhook failed: {e}")
+
+
+def show_stats(db_path: str = DB_PATH, last: int = 200):
+    """Latency percentiles over the most recent alerts."""
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            """SELECT detect_to_alert_ms, alerted_epoch - published_epoch AS publish_to_alert_s,
+                      model IS NOT NULL AS analyzed
+               FROM alerts ORDER BY id DESC LIMIT ?""",
+            (last,)
+        ).fetchall()
+    if not rows:
+        print("No alerts yet.")
+        return
+
+    def pct(values: List[float], p: float) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    detect = [r['detect_to_alert_ms'] for r in rows]
+    publish = [r['publish_to_alert_s'] for r in rows]
+    analyzed = sum(r['analyzed'] for r in rows)
+    print(f"\n{len(rows)} alert(s), {analyzed} analyzed by the model")
+    print(f"  detect → alert   p50 {pct(detect, 0.5):8.0f} ms   p95 {pct(detect, 0.95):8.0f} ms")
+    print(f"  publish → alert  p50 {pct(publish, 0.5):8.1f} s    p95 {pct(publish, 0.95):8.1f} s\n")
+
+
+if __name__ == '__main__':
+    import argparse
+    from models import init_schema
+
+    parser = argparse.ArgumentParser(description='RedHood breaking-headline fast path')
+    parser.add_argument('--accounts', help='Comma-separated handles (default REDHOOD_FAST_PATH_ACCOUNTS)')
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL_S, help='Seconds between polls')
+    parser.add_argument('--once', action='store_true', help='Poll once and exit')
+    parser.add_argument('--no-analysis', action='store_true', help='Rules-only alerts, no Claude call')
+    parser.add_argument('--stats', action='store_true', help='Show alert latency percentiles')
+    args = parser.parse_args()
+
+    init_schema()
+    if args.stats:
+        show_stats()
+    else:
+        accounts = [a.strip().lstrip('@') for a in args.accounts.split(',')] if args.accounts else None
+        fast_path = FastPath(accounts, api_key='' if args.no_analysis else None)
+        if args.once:
+            fast_path.poll_once()
+        else:
+            try:
+                fast_path.run(args.interval)
+            except KeyboardInterrupt:
+                print("\n⚡ Fast path stopped")
@@ -0,0 +1,192 @@
+"""
+RedHood Insights - Streaming RSS Reader
+========================================
+Incremental RSS 2.0 / Atom parsing for the scrapers.
+
+``feedparser.parse`` downloads the whole document and builds every entry
+before the scrapers keep the first 10-20 and drop the ones older than the
+cutoff. Feeds are newest-first, so this reader streams the response into
+an ``XMLPullParser`` and stops — closing the connection — as soon as an
+entry falls behind the cutoff or the entry limit is reached. Only the
+fields FeedItem uses (title, link, summary, published) are decoded, and
+each entry's element tree is discarded once read.
+
+Malformed or unrecognised documents fall back to feedparser.
+
+Usage:
+    feed = fast_rss.fetch(url, cutoff=datetime.utcnow() - timedelta(hours=1), limit=20)
+    for entry in feed.entries:
+        entry['title'], entry['link'], entry['summary'], entry['published']
+"""
+
+import xml.etree.ElementTree as ET
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+CHUNK_SIZE = 16 * 1024
+TIMEOUT_S = 20
+USER_AGENT = 'Mozilla/5.0 (compatible; RedHoodInsights/1.0; +https://tazeemc.github.io/Redhood-Systems/)'
+
+_ATOM = '{http://www.w3.org/2005/Atom}'
+_CONTENT_ENCODED = '{http://purl.org/rss/1.0/modules/content/}encoded'
+_DC_DATE = '{http://purl.org/dc/elements/1.1/}date'
+
+ENTRY_TAGS = {'item', _ATOM + 'entry'}
+DATE_TAGS = {'pubDate', _DC_DATE, _ATOM + 'published'}
+SUMMARY_TAGS = {'description', _ATOM + 'summary'}
+CONTENT_TAGS = {_CONTENT_ENCODED, _ATOM + 'content'}
+
+
+class ParsedFeed:
+    """Feed title plus the entries newer than the cutoff, newest first."""
+
+    def __init__(self, title: Optional[str], entries: List[Dict], fallback: bool = False,
+                 bytes_read: int = 0):
+        self.title = title
+        self.entries = entries          # dicts: title, link, summary, published (naive UTC)
+        self.fallback = fallback        # True if feedparser had to parse it
+        self.bytes_read = bytes_read
+
+    def __repr__(self):
+        return f"ParsedFeed({self.title!r}, {len(self.entries)} entries, fallback={self.fallback})"
+
+
+def parse_date(text: Optional[str]) -> Optional[datetime]:
+    """RFC 822 (RSS) or ISO-8601 (Atom) date as naive UTC."""
+    from email.utils import parsedate_to_datetime   # ~8 ms at import; cached after
+
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        value = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            value = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0)   # second precision, as feedparser gives
+
+
+def fetch(url: str, cutoff: datetime, limit: int, streaming: bool = True) -> ParsedFeed:
+    """
+    Entries of ``url`` published at or after ``cutoff`` (naive UTC), at most ``limit``.
+
+    Network errors propagate; a document the streaming parser cannot handle
+    is re-fetched through feedparser. ``streaming=False`` goes straight to
+    feedparser.
+    """
+    if streaming:
+        try:
+            return _stream(url, cutoff, limit)
+        except (ET.ParseError, ValueError, zlib.error):
+            pass
+    return _feedparser(url, cutoff, limit)
+
+
+def _stream(url: str, cutoff: datetime, limit: int) -> ParsedFeed:
+    import urllib.request   # ~30 ms; only scrapes need it
+
+    request = urllib.request.Request(url, headers={
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': 'gzip',
+        'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.1',
+    })
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    title: Optional[str] = None
+    entries: List[Dict] = []
+    depth = 0                 # element nesting; the feed title is the one outside entries
+    in_entry = False
+    entry: Dict = {}
+    bytes_read = 0
+
+    with urllib.request.urlopen(request, timeout=TIMEOUT_S) as response:
+        gzip = response.headers.get('Content-Encoding', '').lower() == 'gzip'
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzip else None
+        while True:
+            chunk = response.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            bytes_read += len(chunk)
+            parser.feed(inflater.decompress(chunk) if inflater else chunk)
+
+            for event, elem in parser.read_events():
+                tag = elem.tag
+                if event == 'start':
+                    depth += 1
+                    if depth == 1 and tag not in ('rss', _ATOM + 'feed'):
+                        # RSS 1.0 (RDF) and anything exotic go to feedparser
+                        raise ValueError(f"Not an RSS 2.0/Atom document: <{tag}>")
+                    if tag in ENTRY_TAGS:
+                        in_entry, entry = True, {}
+                    continue
+
+                depth -= 1
+                if tag in ENTRY_TAGS:
+                    in_entry = False
+                    published = parse_date(entry.get('date') or entry.get('updated'))
+                    elem.clear()
+                    if published is None:
+                        continue            # undated entries can't be windowed
+                    if published < cutoff:
+                        return ParsedFeed(title, entries, bytes_read=bytes_read)  # older from here on
+                    entries.append({
+                        'title': entry.get('title', ''),
+                        'link': entry.get('link', ''),
+                        'summary': entry.get('summary') or entry.get('content')
+                                   or entry.get('title', ''),
+                        'published': published,
+                    })
+                    if len(entries) >= limit:
+                        return ParsedFeed(title, entries, bytes_read=bytes_read)
+                elif in_entry:
+                    _read_field(entry, tag, elem)
+                elif title is None and tag in ('title', _ATOM + 'title'):
+                    title = (elem.text or '').strip() or None
+
+    parser.close()   # raises ParseError on a truncated document
+    return ParsedFeed(title, entries, bytes_read=bytes_read)
+
+
+def _read_field(entry: Dict, tag: str, elem):
+    """Copy one finished child element of an entry, first value wins."""
+    if tag in ('title', _ATOM + 'title'):
+        entry.setdefault('title', elem.text or '')
+    elif tag == 'link':
+        entry.setdefault('link', (elem.text or '').strip())
+    elif tag == _ATOM + 'link':
+        if elem.get('rel', 'alternate') == 'alternate':
+            entry.setdefault('link', elem.get('href', ''))
+    elif tag in SUMMARY_TAGS:
+        entry.setdefault('summary', elem.text or '')
+    elif tag in CONTENT_TAGS:
+        entry.setdefault('content', elem.text or '')
+    elif tag in DATE_TAGS:
+        entry.setdefault('date', elem.text)
+    elif tag == _ATOM + 'updated':
+        entry.setdefault('updated', elem.text)   # Atom entries without <published>
+
+
+def _feedparser(url: str, cutoff: datetime, limit: int) -> ParsedFeed:
+    import feedparser
+
+    feed = feedparser.parse(url, agent=USER_AGENT)
+    if feed.bozo and not feed.entries:
+        raise ValueError(f"Unparseable feed: {getattr(feed, 'bozo_exception', 'no entries')}")
+    entries = []
+    for e in feed.entries[:limit]:
+        if not e.get('published_parsed'):
+            continue
+        published = datetime(*e.published_parsed[:6])
+        if published < cutoff:
+            continue
+        entries.append({
+            'title': e.get('title', ''),
+            'link': e.get('link', ''),
+            'summary': e.get('summary', e.get('title', '')),
+            'published': published,
+        })
+    return ParsedFeed(feed.feed.get('title'), entries, fallback=True)
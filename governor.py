@@ -0,0 +1,285 @@
+"""
+RedHood Insights - API Governor
+================================
+Process-wide throttle, retry and hedging layer for Anthropic calls, shared
+by every NarrativeExtractor (multi-window runs, backfills, re-extractions)
+so concurrent callers cooperate instead of tripping the same limits.
+
+    - Bounded concurrency: at most MAX_CONCURRENCY calls in flight.
+    - Token buckets for requests and input tokens, resynchronised from the
+      ``anthropic-ratelimit-*`` response headers after every call.
+    - Retries on 429 / 5xx / 529 / connection errors with full-jitter
+      exponential backoff; ``retry-after`` (or, on a 429, the exhausted
+      bucket's reset time) pauses every caller, not just the one that was
+      throttled.
+    - Optional hedging: if a call runs past the hedge delay, an identical
+      request is raced against it and the first success wins. It doubles
+      the cost of slow calls, so it is off unless REDHOOD_API_HEDGE_AFTER_S
+      is set, and it only fires when both buckets have headroom.
+
+Usage:
+    from governor import get_governor
+    response = get_governor().create(client, model=..., max_tokens=..., messages=...)
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+MAX_CONCURRENCY = int(os.getenv('REDHOOD_API_CONCURRENCY', '4'))
+MAX_RETRIES = int(os.getenv('REDHOOD_API_RETRIES', '5'))
+BASE_BACKOFF_S = 1.0
+MAX_BACKOFF_S = 60.0
+HEDGE_AFTER_S = float(os.getenv('REDHOOD_API_HEDGE_AFTER_S', '0'))  # 0 = no hedging
+HEDGE_MIN_HEADROOM = 0.25        # fraction of each bucket that must be free to hedge
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+# anthropic-ratelimit-<bucket>-remaining/-reset pairs checked on a 429
+RATE_LIMIT_BUCKETS = ('input-tokens', 'output-tokens', 'requests')
+
+
+class TokenBucket:
+    """
+    Continuously refilling bucket; capacity is learned from headers.
+
+    Until the first response reports a limit the bucket is unbounded, so
+    the very first call is never delayed by a guess.
+    """
+
+    def __init__(self, per_seconds: float = 60.0):
+        self.per_seconds = per_seconds
+        self.capacity: Optional[float] = None
+        self.tokens = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.capacity is not None:
+            rate = self.capacity / self.per_seconds
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def headroom(self) -> float:
+        """Free fraction of the bucket (1.0 when the limit is unknown)."""
+        with self._lock:
+            self._refill()
+            return 1.0 if not self.capacity else self.tokens / self.capacity
+
+    def acquire(self, amount: float):
+        """Block until ``amount`` is available, then take it."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.capacity is None:
+                    return
+                amount = min(amount, self.capacity)   # oversized requests still go through
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait_s = (amount - self.tokens) / (self.capacity / self.per_seconds)
+            time.sleep(min(wait_s, 5.0))
+
+    def sync(self, limit: Optional[float], remaining: Optional[float]):
+        """Adopt the server's view of this bucket."""
+        with self._lock:
+            self._refill()
+            if limit:
+                self.capacity = limit
+            if remaining is not None and self.capacity is not None:
+                self.tokens = min(self.capacity, remaining)
+
+
+class Governor:
+    """Shared gate for messages.create calls."""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, max_retries: int = MAX_RETRIES,
+                 hedge_after_s: float = HEDGE_AFTER_S):
+        self.max_retries = max_retries
+        self.hedge_after_s = hedge_after_s
+        self.requests = TokenBucket()
+        self.input_tokens = TokenBucket()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._paused_until = 0.0
+        self._pause_lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=50)
+        # Imported here so importing this module (redhood_aggregator does) stays cheap
+        from concurrent.futures import ThreadPoolExecutor
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency * 2,
+                                        thread_name_prefix='redhood-api')
+
+    # ------------------------------------------------------------------
+    # Public entry point
+    # ------------------------------------------------------------------
+
+    def create(self, client, estimated_input_tokens: int = 0, metrics=None, **kwargs):
+        """
+        ``client.messages.create(**kwargs)`` with throttling, retries and hedging.
+
+        Raises the last error once retries are exhausted or the error is
+        not retryable (e.g. 400/401).
+        """
+        attempt = 0
+        while True:
+            self._wait_for_pause()
+            self.requests.acquire(1)
+            self.input_tokens.acquire(estimated_input_tokens)
+            try:
+                return self._call_with_hedge(client, kwargs, metrics)
+            except Exception as e:
+                retry_after = self._retry_after(e)
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                attempt += 1
+                # Full jitter keeps parallel callers from retrying in lockstep
+                delay = random.uniform(0, min(MAX_BACKOFF_S, BASE_BACKOFF_S * 2 ** attempt))
+                if retry_after:
+                    delay = max(delay, retry_after)
+                    self._pause(retry_after)
+                status = getattr(e, 'status_code', None) or type(e).__name__
+                print(f"   ⏳ Claude API {status}; retry {attempt}/{self.max_retries} "
+                      f"in {delay:.1f}s")
+                if metrics is not None:
+                    metrics.record('api.retry', duration_ms=delay * 1000, label=str(status))
+                time.sleep(delay)
+
+    # ------------------------------------------------------------------
+    # Single attempt (+ optional hedge)
+    # ------------------------------------------------------------------
+
+    def _call_with_hedge(self, client, kwargs: Dict[str, Any], metrics):
+        from concurrent.futures import FIRST_COMPLETED, wait
+        primary = self._pool.submit(self._call_once, client, kwargs)
+        if not self.hedge_after_s:
+            return primary.result()
+
+        done, _ = wait([primary], timeout=self._hedge_delay())
+        if done or not self._can_hedge():
+            return primary.result()
+
+        print("   🪃 Claude call slow; hedging with a second request")
+        if metrics is not None:
+            metrics.record('api.hedge', value=1)
+        hedge = self._pool.submit(self._call_once, client, kwargs, True)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()   # the loser finishes in the background
+                error = future.exception()
+        raise error
+
+    def _call_once(self, client, kwargs: Dict[str, Any], hedge: bool = False):
+        if hedge:
+            if not self._slots.acquire(blocking=False):
+                raise RuntimeError('No free slot for hedge request')
+        else:
+            self._slots.acquire()
+        try:
+            started = time.perf_counter()
+            messages = client.messages
+            raw_api = getattr(messages, 'with_raw_response', None)
+            if raw_api is not None:
+                raw = raw_api.create(**kwargs)
+                self._sync_headers(raw.headers)
+                response = raw.parse()
+            else:
+                response = messages.create(**kwargs)   # clients without header access
+            self._latencies.append(time.perf_counter() - started)
+            return response
+        finally:
+            self._slots.release()
+
+    def _hedge_delay(self) -> float:
+        """Configured delay, or the recent p95 latency if that is longer."""
+        if len(self._latencies) < 10:
+            return self.hedge_after_s
+        ordered = sorted(self._latencies)
+        return max(self.hedge_after_s, ordered[int(len(ordered) * 0.95) - 1])
+
+    def _can_hedge(self) -> bool:
+        return (self.requests.headroom() >= HEDGE_MIN_HEADROOM
+                and self.input_tokens.headroom() >= HEDGE_MIN_HEADROOM)
+
+    # ------------------------------------------------------------------
+    # Rate-limit headers and errors
+    # ------------------------------------------------------------------
+
+    def _sync_headers(self, headers):
+        def num(name: str) -> Optional[float]:
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        self.requests.sync(num('anthropic-ratelimit-requests-limit'),
+                           num('anthropic-ratelimit-requests-remaining'))
+        self.input_tokens.sync(num('anthropic-ratelimit-input-tokens-limit'),
+                               num('anthropic-ratelimit-input-tokens-remaining'))
+
+    @staticmethod
+    def _retry_after(error) -> Optional[float]:
+        """
+        Seconds every caller should wait: ``retry-after``, or for a 429
+        without it, the reset time of the bucket that ran out (requests if
+        none reports 0 remaining). Other errors without ``retry-after``
+        return None and only the failing caller backs off.
+        """
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        value = headers.get('retry-after')
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+        if getattr(error, 'status_code', None) != 429:
+            return None
+        bucket = next((b for b in RATE_LIMIT_BUCKETS
+                       if headers.get(f'anthropic-ratelimit-{b}-remaining') == '0'), 'requests')
+        reset = headers.get(f'anthropic-ratelimit-{bucket}-reset')
+        if not reset:
+            return None
+        try:
+            reset_at = datetime.fromisoformat(reset.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+    @staticmethod
+    def _is_retryable(error) -> bool:
+        status = getattr(error, 'status_code', None)
+        if status is not None:
+            return status in RETRYABLE_STATUS
+        # APIConnectionError / APITimeoutError carry no status code
+        return type(error).__name__ in ('APIConnectionError', 'APITimeoutError',
+                                        'ConnectionError', 'TimeoutError')
+
+    def _pause(self, seconds: float):
+        with self._pause_lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _wait_for_pause(self):
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+_governor: Optional[Governor] = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> Governor:
+    """The process-wide governor."""
+    global _governor
+    if _governor is None:
+        with _governor_lock:
+            if _governor is None:
+                _governor = Governor()
+    return _governor
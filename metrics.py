@@ -0,0 +1,223 @@
+"""
+RedHood Insights - Pipeline Metrics
+====================================
+Structured per-stage instrumentation for aggregator runs.
+
+Every run records samples of (stage, label, duration_ms, value) — e.g.
+``collect.nitter`` per account@instance, ``api`` latency, ``tokens.input``
+counts — into the ``run_metrics`` table. Samples can also be exported per
+run as a Prometheus textfile or appended as JSON lines.
+
+Stages:
+    collect.rss, collect.nitter, collect   scraping (per source / instance)
+    format, format.history                 prompt packing + formatting, history retrieval
+    api, tokens.*                          Claude call latency and usage
+    api.triage, cascade.*                  cascade-mode triage call and verdicts
+    parse                                  response parsing
+    threads, render, render.ticker         lineage + HTML report
+    persist, publish                       SQLite and GitHub Pages
+    index                                  vector index appends (vector_index.py)
+
+Usage:
+    python metrics.py                      # p50/p95 per stage, last 1000 runs
+    python metrics.py --last 200           # ... over the last 200 runs
+    python metrics.py --run 42             # samples for one run
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from db import DB_PATH, connection, transaction
+from profiler import PROFILED_STAGES
+
+
+class RunMetrics:
+    """Thread-safe collector of stage samples for one pipeline run."""
+
+    def __init__(self, profiler=None):
+        self.samples: List[Dict] = []
+        self._lock = threading.Lock()
+        self.profiler = profiler       # profiler.StageProfiler for --profile runs
+
+    @contextmanager
+    def stage(self, name: str, label: str = ''):
+        """Time the enclosed block as one sample of ``name``."""
+        started = time.perf_counter()
+        try:
+            with self.profile(name):
+                yield
+        finally:
+            self.record(name, duration_ms=(time.perf_counter() - started) * 1000,
+                        label=label)
+
+    @contextmanager
+    def profile(self, name: str):
+        """Profile the block if profiling is on and ``name`` is a pipeline stage."""
+        if self.profiler is None or name not in PROFILED_STAGES:
+            yield
+            return
+        with self.profiler.stage(PROFILED_STAGES[name]):
+            yield
+
+    def record(self, stage: str, duration_ms: float = None, value: float = None,
+               label: str = ''):
+        """Add a timing and/or value sample."""
+        sample = {'stage': stage, 'label': label, 'duration_ms': duration_ms,
+                  'value': value, 'recorded_at': datetime.utcnow().isoformat()}
+        with self._lock:
+            self.samples.append(sample)
+
+    def extend(self, other: 'RunMetrics'):
+        """Adopt another collector's samples (e.g. a shared collection pass)."""
+        with self._lock:
+            self.samples.extend(other.samples)
+
+    def total_ms(self, stage: str) -> float:
+        return sum(s['duration_ms'] or 0 for s in self.samples if s['stage'] == stage)
+
+    # ------------------------------------------------------------------
+    # Persistence and export
+    # ------------------------------------------------------------------
+
+    def persist(self, run_id: int, db_path: str = DB_PATH):
+        """Write all samples to run_metrics under run_id."""
+        try:
+            with transaction(db_path) as conn:
+                conn.executemany(
+                    """INSERT INTO run_metrics (run_id, stage, label, duration_ms, value, recorded_at)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    [(run_id, s['stage'], s['label'], s['duration_ms'], s['value'],
+                      s['recorded_at']) for s in self.samples]
+                )
+        except Exception as e:
+            print(f"⚠️  Metrics persist error: {e}")
+
+    def to_prometheus(self, run_id: Optional[int] = None) -> str:
+        """Render samples in Prometheus text exposition format."""
+        run_label = f',run_id="{run_id}"' if run_id is not None else ''
+        lines = [
+            '# HELP redhood_stage_duration_ms Wall time of a pipeline stage in the last run.',
+            '# TYPE redhood_stage_duration_ms gauge',
+        ]
+        values = []
+        for s in self.samples:
+            labels = f'stage="{_escape(s["stage"])}",label="{_escape(s["label"])}"{run_label}'
+            if s['duration_ms'] is not None:
+                lines.append(f'redhood_stage_duration_ms{{{labels}}} {s["duration_ms"]:.3f}')
+            if s['value'] is not None:
+                values.append(f'redhood_stage_value{{{labels}}} {s["value"]}')
+        if values:
+            lines += ['# HELP redhood_stage_value Counter-like values (tokens, items) '
+                      'recorded in the last run.',
+                      '# TYPE redhood_stage_value gauge'] + values
+        return '\n'.join(lines) + '\n'
+
+    def to_json_lines(self, run_id: Optional[int] = None) -> str:
+        return ''.join(json.dumps({'run_id': run_id, **s}) + '\n' for s in self.samples)
+
+    def export(self, mode: str, output_dir: str, run_id: Optional[int] = None):
+        """
+        Export per the configured mode.
+
+        ``prometheus`` rewrites redhood_metrics.prom (node_exporter textfile
+        collector); ``json`` appends to redhood_metrics.jsonl.
+        """
+        if mode == 'prometheus':
+            path = os.path.join(output_dir, 'redhood_metrics.prom')
+            tmp = path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus(run_id))
+            os.replace(tmp, path)  # atomic for the scraper
+        elif mode == 'json':
+            path = os.path.join(output_dir, 'redhood_metrics.jsonl')
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(self.to_json_lines(run_id))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def stage_percentiles(db_path: str = DB_PATH, last_runs: int = 1000) -> List[Tuple]:
+    """
+    p50/p95 stage latency over the most recent runs.
+
+    Per-run totals are used, so a stage with many samples per run
+    (collect.nitter per account) is summed before taking percentiles.
+
+    Returns:
+        List of (stage, runs, p50_ms, p95_ms, max_ms) sorted by p95
+    """
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            """SELECT stage, run_id, SUM(duration_ms) FROM run_metrics
+               WHERE duration_ms IS NOT NULL
+                 AND run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)
+               GROUP BY stage, run_id""",
+            (last_runs,)
+        ).fetchall()
+
+    by_stage: Dict[str, List[float]] = {}
+    for stage, _, total in rows:
+        by_stage.setdefault(stage, []).append(total)
+
+    summary = []
+    for stage, values in by_stage.items():
+        values.sort()
+        summary.append((stage, len(values), _percentile(values, 50),
+                        _percentile(values, 95), values[-1]))
+    summary.sort(key=lambda r: r[3], reverse=True)
+    return summary
+
+
+def print_summary(db_path: str = DB_PATH, last_runs: int = 1000):
+    rows = stage_percentiles(db_path, last_runs)
+    print(f"\n{'Stage':<22} {'Runs':>6} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    print("-" * 62)
+    for stage, runs, p50, p95, peak in rows:
+        print(f"{stage:<22} {runs:>6} {p50:>10.1f} {p95:>10.1f} {peak:>10.1f}")
+    print(f"\nOver the last {last_runs} run(s).\n")
+
+
+def print_run(run_id: int, db_path: str = DB_PATH):
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            """SELECT stage, label, duration_ms, value FROM run_metrics
+               WHERE run_id = ? ORDER BY id""",
+            (run_id,)
+        ).fetchall()
+    print(f"\n[run #{run_id}]")
+    for stage, label, duration_ms, value in rows:
+        dur = f"{duration_ms:10.1f} ms" if duration_ms is not None else " " * 13
+        val = f"  = {value:g}" if value is not None else ""
+        print(f"  {stage:<18} {dur}{val}  {label or ''}")
+
+
+if __name__ == '__main__':
+    import argparse
+    from models import init_schema
+
+    parser = argparse.ArgumentParser(description='RedHood pipeline metrics')
+    parser.add_argument('--last', type=int, default=1000, help='Number of recent runs')
+    parser.add_argument('--run', type=int, help='Show samples for one run id')
+    args = parser.parse_args()
+
+    init_schema()
+    if args.run:
+        print_run(args.run)
+    else:
+        print_summary(last_runs=args.last)
@@ -9,12 +9,32 @@ Tables:
     feeds             - raw feed items collected per run
     narratives        - AI-extracted narratives per run
     narrative_feeds   - join table: narrative <-> supporting feeds
+    narrative_threads - cross-run narrative lineage (narrative_threads.py)
+    run_metrics       - per-stage timings and counters per run (metrics.py)
+    feed_archives     - index of monthly cold-storage feed archives (retention.py)
+    account_poll_state - learned posting rate and next poll per handle (poll_scheduler.py)
+    scrape_jobs       - leased fetch jobs for distributed scraping (work_queue.py)
+    scrape_results    - feed items written back by scrape workers
+    alerts            - breaking-headline alerts from the fast path (fast_path.py)
+    vector_rows       - metadata for on-disk narrative/feed embeddings (vector_index.py)
+    mention_rollups   - per-symbol/per-account mention counts in 1m/1h/1d buckets (rollups.py)
+    risk_positions    - open/closed hypothetical positions from narrative trades (risk.py)
+    price_history     - cached daily closes for portfolio risk (risk.py)
+    price_fetches     - last price fetch per symbol, so risk.py asks Yahoo at most daily
+
+Timestamps are stored twice: ISO-8601 TEXT for humans and an INTEGER UTC
+epoch (``*_epoch``) that every time-range query filters and sorts on.
+
+Usage:
+    python models.py                       # apply schema, describe tables
+    python models.py --migrate             # upgrade an existing redhood.db
 """
 
 import sqlite3
-import os
+from datetime import datetime, timezone
+from typing import Dict, Optional, Union
 
-DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'redhood.db')
+from db import DB_PATH, connection  # DB_PATH re-exported for existing importers
 
 SCHEMA = """
 -- -----------------------------------------------------------------------
@@ -41,7 +61,15 @@ CREATE TABLE IF NOT EXISTS runs (
     feeds_collected INTEGER NOT NULL DEFAULT 0,
     narratives_extracted INTEGER NOT NULL DEFAULT 0,
     json_path       TEXT,                      -- path to output JSON file
-    html_path       TEXT                       -- path to output HTML file
+    html_path       TEXT,                      -- path to output HTML file
+    input_tokens    INTEGER,                   -- uncached input tokens billed
+    output_tokens   INTEGER,
+    cache_creation_input_tokens INTEGER,       -- prompt-cache writes
+    cache_read_input_tokens     INTEGER,       -- prompt-cache hits
+    api_latency_ms  INTEGER,                   -- Claude call wall time
+    batch_id        TEXT,                      -- shared by sibling multi-window runs
+    run_at_epoch    INTEGER,                   -- run_at as UTC epoch seconds
+    category        TEXT                       -- twitter_accounts.category shard, NULL = all
 );
 
 -- -----------------------------------------------------------------------
@@ -54,9 +82,11 @@ CREATE TABLE IF NOT EXISTS feeds (
     source          TEXT    NOT NULL,          -- "twitter" | "rss"
     author          TEXT    NOT NULL,          -- "@FirstSquawk" or RSS feed title
     content         TEXT,                      -- raw HTML/text of post
+    clean_text      TEXT,                      -- normalized plain text (text_clean.py)
     published_at    TEXT    NOT NULL,          -- ISO-8601 timestamp from feed
     url             TEXT,                      -- canonical x.com or article URL
-    nitter_instance TEXT                       -- which Nitter node served it
+    nitter_instance TEXT,                      -- which Nitter node served it
+    published_epoch INTEGER                    -- published_at as UTC epoch seconds
 );
 
 -- -----------------------------------------------------------------------
@@ -71,7 +101,9 @@ CREATE TABLE IF NOT EXISTS narratives (
     hypothesis      TEXT    NOT NULL,          -- trade idea
     rationale       TEXT    NOT NULL,          -- AI reasoning
     catalysts       TEXT    NOT NULL,          -- JSON array of strings
-    created_at      TEXT    NOT NULL           -- ISO-8601 UTC
+    created_at      TEXT    NOT NULL,          -- ISO-8601 UTC
+    thread_id       INTEGER REFERENCES narrative_threads(id),
+    created_epoch   INTEGER                    -- created_at as UTC epoch seconds
 );
 
 -- -----------------------------------------------------------------------
@@ -84,44 +116,395 @@ CREATE TABLE IF NOT EXISTS narrative_feeds (
     PRIMARY KEY (narrative_id, feed_id)
 );
 
+-- -----------------------------------------------------------------------
+-- narrative_threads
+-- One row per recurring theme; narratives.thread_id links runs together.
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS narrative_threads (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    label           TEXT    NOT NULL,          -- title of the latest narrative
+    signature       BLOB    NOT NULL,          -- MinHash of the latest narrative
+    first_seen      TEXT    NOT NULL,          -- ISO-8601 UTC
+    last_seen       TEXT    NOT NULL,          -- ISO-8601 UTC
+    narrative_count INTEGER NOT NULL DEFAULT 1,
+    last_entropy    INTEGER NOT NULL,          -- 1-10
+    entropy_drift   REAL    NOT NULL DEFAULT 0 -- latest minus mean of prior points
+);
+
+-- -----------------------------------------------------------------------
+-- run_metrics
+-- Per-stage instrumentation samples (timings and counters) for each run.
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS run_metrics (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id          INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    stage           TEXT    NOT NULL,          -- e.g. "collect.nitter", "api"
+    label           TEXT,                      -- e.g. "FirstSquawk@nitter.net"
+    duration_ms     REAL,                      -- wall time, NULL for pure counters
+    value           REAL,                      -- counter value, e.g. tokens
+    recorded_at     TEXT    NOT NULL           -- ISO-8601 UTC
+);
+
+-- -----------------------------------------------------------------------
+-- feed_archives
+-- One row per monthly archive database holding feeds rolled out of the
+-- hot table by retention.py.
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS feed_archives (
+    month           TEXT    PRIMARY KEY,       -- "YYYY-MM" of published_at
+    path            TEXT    NOT NULL,          -- archive DB, relative to the hot DB
+    row_count       INTEGER NOT NULL DEFAULT 0,
+    min_epoch       INTEGER,                   -- published_epoch range covered
+    max_epoch       INTEGER,
+    archived_at     TEXT    NOT NULL           -- ISO-8601 UTC of last roll-up
+);
+
+-- -----------------------------------------------------------------------
+-- account_poll_state
+-- Adaptive Nitter polling: learned posting rate and schedule per handle.
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS account_poll_state (
+    handle          TEXT    PRIMARY KEY,       -- no @, matches twitter_accounts
+    rate_per_hour   REAL    NOT NULL DEFAULT 0,-- posts/hour over the lookback
+    interval_s      INTEGER NOT NULL,          -- current poll interval
+    last_polled_epoch INTEGER,                 -- UTC epoch of the last attempt
+    next_poll_epoch INTEGER NOT NULL,          -- not polled again before this
+    last_item_epoch INTEGER,                   -- newest item seen
+    failures        INTEGER NOT NULL DEFAULT 0 -- consecutive failed polls
+);
+
+-- -----------------------------------------------------------------------
+-- scrape_jobs
+-- Distributed scraping: one fetch job per Nitter account or RSS feed in a
+-- collection window, leased by worker processes (work_queue.py).
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    window_id       TEXT    NOT NULL,          -- one coordinator collection pass
+    kind            TEXT    NOT NULL,          -- "nitter" | "rss"
+    target          TEXT    NOT NULL,          -- handle (no @) or feed URL
+    instances       TEXT,                      -- JSON list of Nitter mirrors, in failover order
+    instance        TEXT,                      -- mirror of the current/last attempt
+    hours_back      REAL    NOT NULL,
+    status          TEXT    NOT NULL DEFAULT 'pending', -- pending|leased|done|failed|cancelled
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    max_attempts    INTEGER NOT NULL DEFAULT 1,
+    lease_owner     TEXT,                      -- worker id ("host:pid")
+    lease_expires_epoch INTEGER,
+    created_epoch   INTEGER NOT NULL,
+    finished_epoch  INTEGER,
+    duration_ms     REAL,                      -- worker fetch time of the final attempt
+    error           TEXT
+);
+
+-- -----------------------------------------------------------------------
+-- scrape_results
+-- FeedItems (FeedItem.to_dict() JSON) written back by scrape workers.
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS scrape_results (
+    job_id          INTEGER NOT NULL REFERENCES scrape_jobs(id) ON DELETE CASCADE,
+    item            TEXT    NOT NULL
+);
+
+-- -----------------------------------------------------------------------
+-- alerts
+-- Breaking-headline alerts from the fast path, one per triggering feed
+-- item, with the timings that make detection-to-alert latency measurable.
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS alerts (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    feed_id         TEXT    NOT NULL UNIQUE,   -- fast_path.alert_key: FeedItem.id + URL/text hash
+    author          TEXT    NOT NULL,          -- e.g. "@FirstSquawk"
+    headline        TEXT    NOT NULL,          -- clean text of the item
+    url             TEXT,
+    rules           TEXT    NOT NULL,          -- JSON array of matched rule names
+    score           INTEGER NOT NULL,          -- summed rule weights
+    title           TEXT    NOT NULL,          -- alert narrative (headline if analysis failed)
+    entropy_risk    INTEGER,                   -- 1-10, NULL without analysis
+    hypothesis      TEXT,
+    rationale       TEXT,
+    catalysts       TEXT,                      -- JSON array of strings
+    model           TEXT,                      -- analysis model, NULL if rules only
+    published_epoch INTEGER NOT NULL,          -- item publish time (UTC epoch)
+    detected_epoch  REAL    NOT NULL,          -- rules matched
+    alerted_epoch   REAL    NOT NULL,          -- alert written
+    detect_to_alert_ms REAL NOT NULL,          -- analysis + write latency
+    created_at      TEXT    NOT NULL           -- ISO-8601 UTC
+);
+
+-- -----------------------------------------------------------------------
+-- vector_rows
+-- Metadata for rows of the append-only embedding files in vectors/
+-- (vector_index.py); the vectors themselves are memory-mapped from disk.
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS vector_rows (
+    kind            TEXT    NOT NULL,          -- 'narrative' | 'feed'
+    row_num         INTEGER NOT NULL,          -- row in vectors/<kind>s.f32
+    ref_id          TEXT    NOT NULL,          -- narratives.id / feeds.id
+    created_epoch   INTEGER,                   -- narrative created / feed published
+    PRIMARY KEY (kind, row_num)
+);
+
+-- -----------------------------------------------------------------------
+-- mention_rollups
+-- Mention counts per cashtag and per author in 1m/1h/1d buckets, added to
+-- in the persist transaction for each newly stored feed (rollups.py).
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS mention_rollups (
+    entity_type     TEXT    NOT NULL,          -- 'symbol' | 'account'
+    entity          TEXT    NOT NULL,          -- e.g. "QQQ", "@FirstSquawk"
+    resolution      TEXT    NOT NULL,          -- '1m' | '1h' | '1d'
+    bucket_epoch    INTEGER NOT NULL,          -- bucket start (UTC epoch)
+    mentions        INTEGER NOT NULL,
+    PRIMARY KEY (entity_type, entity, resolution, bucket_epoch)
+) WITHOUT ROWID;
+
+-- -----------------------------------------------------------------------
+-- risk_positions
+-- Hypothetical positions parsed from narrative hypotheses, one open leg
+-- per narrative thread and symbol (risk.py).
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS risk_positions (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    narrative_id    TEXT    NOT NULL,          -- narrative that last opened or re-sized it
+    thread_id       INTEGER,                   -- narrative_threads.id
+    batch_id        TEXT,                      -- runs.batch_id that last opened or re-sized it
+    symbol          TEXT    NOT NULL,          -- Yahoo symbol, e.g. "QQQ", "BTC-USD"
+    direction       INTEGER NOT NULL,          -- +1 long | -1 short
+    notional        REAL    NOT NULL,          -- sized dollar amount (unsigned)
+    entry_price     REAL,                      -- last cached close when opened
+    opened_epoch    INTEGER NOT NULL,
+    expires_epoch   INTEGER NOT NULL,          -- extended each time the thread is re-seen
+    closed_epoch    INTEGER                    -- NULL while open
+);
+
+-- -----------------------------------------------------------------------
+-- price_history
+-- Daily closes from the Yahoo chart endpoint, refreshed once a day per
+-- symbol for the risk covariance (risk.py).
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS price_history (
+    symbol          TEXT    NOT NULL,
+    day_epoch       INTEGER NOT NULL,          -- UTC midnight of the session
+    close           REAL    NOT NULL,
+    PRIMARY KEY (symbol, day_epoch)
+) WITHOUT ROWID;
+
+-- -----------------------------------------------------------------------
+-- price_fetches
+-- Last Yahoo chart fetch per symbol, whether or not it returned closes,
+-- so every process skips symbols fetched within STALE_AFTER_S (risk.py).
+-- -----------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS price_fetches (
+    symbol          TEXT    PRIMARY KEY,
+    fetched_epoch   INTEGER NOT NULL,          -- UTC epoch of the last attempt
+    row_count       INTEGER NOT NULL           -- closes returned; 0 = failed or unknown symbol
+) WITHOUT ROWID;
+
 -- -----------------------------------------------------------------------
 -- Indexes
 -- -----------------------------------------------------------------------
 CREATE INDEX IF NOT EXISTS idx_feeds_run        ON feeds(run_id);
-CREATE INDEX IF NOT EXISTS idx_feeds_source     ON feeds(source);
-CREATE INDEX IF NOT EXISTS idx_feeds_published  ON feeds(published_at);
-CREATE INDEX IF NOT EXISTS idx_narratives_run   ON narratives(run_id);
 CREATE INDEX IF NOT EXISTS idx_narratives_risk  ON narratives(entropy_risk);
+CREATE INDEX IF NOT EXISTS idx_threads_last_seen ON narrative_threads(last_seen);
+CREATE INDEX IF NOT EXISTS idx_run_metrics_run   ON run_metrics(run_id, stage);
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_status ON scrape_jobs(status, lease_expires_epoch);
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_window ON scrape_jobs(window_id, status);
+CREATE INDEX IF NOT EXISTS idx_scrape_results_job ON scrape_results(job_id);
+CREATE INDEX IF NOT EXISTS idx_alerts_alerted     ON alerts(alerted_epoch);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vector_rows_ref ON vector_rows(kind, ref_id);
+CREATE INDEX IF NOT EXISTS idx_mention_rollups_bucket ON mention_rollups(resolution, entity_type, bucket_epoch);
+CREATE INDEX IF NOT EXISTS idx_risk_positions_open   ON risk_positions(closed_epoch, thread_id);
+"""
+
+# Bump whenever SCHEMA, COLUMN_MIGRATIONS or POST_MIGRATION_SQL change.
+# Stored in PRAGMA user_version so init_schema() can skip the DDL entirely
+# on an up-to-date database.
+SCHEMA_VERSION = 14
+
+# Columns added after the initial release. CREATE TABLE IF NOT EXISTS leaves
+# existing tables untouched, so these are ALTERed into older databases.
+COLUMN_MIGRATIONS = [
+    # (table, column, type)
+    ('feeds', 'clean_text', 'TEXT'),
+    ('runs',  'input_tokens', 'INTEGER'),
+    ('runs',  'output_tokens', 'INTEGER'),
+    ('runs',  'cache_creation_input_tokens', 'INTEGER'),
+    ('runs',  'cache_read_input_tokens', 'INTEGER'),
+    ('runs',  'api_latency_ms', 'INTEGER'),
+    ('runs',  'batch_id', 'TEXT'),
+    ('narratives', 'thread_id', 'INTEGER REFERENCES narrative_threads(id)'),
+    ('runs',  'run_at_epoch', 'INTEGER'),
+    ('feeds', 'published_epoch', 'INTEGER'),
+    ('narratives', 'created_epoch', 'INTEGER'),
+    ('runs',  'category', 'TEXT'),
+    # feed_archives' ISO min_published/max_published became epochs; see backfill_epochs
+    ('feed_archives', 'min_epoch', 'INTEGER'),
+    ('feed_archives', 'max_epoch', 'INTEGER'),
+    ('risk_positions', 'batch_id', 'TEXT'),
+]
+
+# Indexes on migrated columns; run after COLUMN_MIGRATIONS so older
+# databases have the columns by the time these are created.
+POST_MIGRATION_SQL = """
+-- Superseded TEXT-timestamp indexes
+DROP INDEX IF EXISTS idx_feeds_source;
+DROP INDEX IF EXISTS idx_feeds_published;
+DROP INDEX IF EXISTS idx_narratives_run;
+DROP INDEX IF EXISTS idx_narratives_created;
+DROP INDEX IF EXISTS idx_narratives_thread;
+
+-- Time-range indexes on the integer epoch columns. The feeds and narratives
+-- ones carry the filter columns, so the range scan never visits the table
+-- to decide whether a row qualifies.
+CREATE INDEX IF NOT EXISTS idx_runs_epoch         ON runs(run_at_epoch);
+CREATE INDEX IF NOT EXISTS idx_runs_category      ON runs(category, run_at_epoch);
+CREATE INDEX IF NOT EXISTS idx_feeds_epoch        ON feeds(published_epoch, source, author);
+CREATE INDEX IF NOT EXISTS idx_feeds_source_epoch ON feeds(source, published_epoch);
+CREATE INDEX IF NOT EXISTS idx_narratives_created ON narratives(created_epoch, id);
+CREATE INDEX IF NOT EXISTS idx_narratives_run_risk ON narratives(run_id, entropy_risk, created_epoch);
+CREATE INDEX IF NOT EXISTS idx_narratives_thread  ON narratives(thread_id, created_epoch);
 """
 
+EPOCH_BACKFILL_BATCH = 50000   # rows per UPDATE so writers aren't blocked for long
 
-def init_schema(db_path: str = DB_PATH):
-    """Apply the full schema to the database (idempotent)."""
-    conn = sqlite3.connect(db_path)
+
+def to_epoch(value: Union[datetime, str, None]) -> Optional[int]:
+    """
+    UTC epoch seconds for a datetime or ISO-8601 string.
+
+    Naive values are taken as UTC, which is what every writer stores.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _apply_column_migrations(conn: sqlite3.Connection):
+    """Add any COLUMN_MIGRATIONS entries missing from an existing database."""
+    for table, column, col_type in COLUMN_MIGRATIONS:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def init_schema(db_path: str = DB_PATH, force: bool = False) -> bool:
+    """
+    Apply the full schema to the database (idempotent).
+
+    A one-row PRAGMA check makes this a no-op when the database is already
+    at SCHEMA_VERSION. Returns True if the DDL was (re)applied.
+    """
+    with connection(db_path) as conn:
+        if not force and schema_version(conn) >= SCHEMA_VERSION:
+            return False
+        _apply_schema(conn)
+    print(f"Schema applied: {db_path} (version {SCHEMA_VERSION})")
+    return True
+
+
+def _apply_schema(conn: sqlite3.Connection) -> Dict[str, int]:
     conn.executescript(SCHEMA)
-    conn.commit()
-    conn.close()
-    print(f"Schema applied: {db_path}")
+    _apply_column_migrations(conn)
+    conn.executescript(POST_MIGRATION_SQL)
+    updated = backfill_epochs(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return updated
+
+
+def backfill_epochs(conn: sqlite3.Connection) -> Dict[str, int]:
+    """
+    Fill *_epoch columns for rows written before they existed.
+
+    runs.run_at and feeds.published_at were always UTC. narratives.created_at
+    was written in local time, so narratives take their run's epoch instead
+    — they are created within that run. feed_archives rows from before the
+    epoch columns convert their UTC min_published/max_published, which
+    are left in place but no longer written.
+
+    Returns:
+        {table: rows updated}
+    """
+    steps = {
+        'runs': """UPDATE runs SET run_at_epoch = CAST(strftime('%s', run_at) AS INTEGER)
+                   WHERE rowid IN (SELECT rowid FROM runs
+                                   WHERE run_at_epoch IS NULL LIMIT ?)""",
+        'feeds': """UPDATE feeds SET published_epoch = CAST(strftime('%s', published_at) AS INTEGER)
+                    WHERE rowid IN (SELECT rowid FROM feeds
+                                    WHERE published_epoch IS NULL LIMIT ?)""",
+        'narratives': """UPDATE narratives SET created_epoch = COALESCE(
+                             (SELECT run_at_epoch FROM runs WHERE runs.id = narratives.run_id),
+                             CAST(strftime('%s', created_at) AS INTEGER))
+                         WHERE rowid IN (SELECT rowid FROM narratives
+                                         WHERE created_epoch IS NULL LIMIT ?)""",
+    }
+    archive_columns = {row[1] for row in conn.execute("PRAGMA table_info(feed_archives)")}
+    if 'min_published' in archive_columns:
+        steps['feed_archives'] = (
+            """UPDATE feed_archives
+               SET min_epoch = CAST(strftime('%s', min_published) AS INTEGER),
+                   max_epoch = CAST(strftime('%s', max_published) AS INTEGER)
+               WHERE rowid IN (SELECT rowid FROM feed_archives
+                               WHERE min_epoch IS NULL AND min_published IS NOT NULL LIMIT ?)""")
+    updated = {}
+    for table, sql in steps.items():
+        updated[table] = 0
+        while True:
+            count = conn.execute(sql, (EPOCH_BACKFILL_BATCH,)).rowcount
+            conn.commit()
+            updated[table] += count
+            if count < EPOCH_BACKFILL_BATCH:
+                break
+    return updated
+
+
+def migrate(db_path: str = DB_PATH):
+    """Upgrade an existing database in place: schema, epoch backfill, stats."""
+    with connection(db_path) as conn:
+        before = schema_version(conn)
+        updated = _apply_schema(conn)
+        conn.commit()
+        conn.execute("ANALYZE")           # let the planner see the new indexes
+    print(f"Migrated {db_path}: version {before} -> {SCHEMA_VERSION}"
+          + ''.join(f", {table} +{n}" for table, n in updated.items() if n))
 
 
 def describe(db_path: str = DB_PATH):
     """Print column info for all tables."""
-    conn = sqlite3.connect(db_path)
-    tables = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
-    ).fetchall()
-
-    for (table,) in tables:
-        cols = conn.execute(f"PRAGMA table_info({table})").fetchall()
-        print(f"\n[{table}]")
-        for col in cols:
-            pk  = " PK" if col[5] else ""
-            nn  = " NOT NULL" if col[3] else ""
-            dflt = f" DEFAULT {col[4]}" if col[4] is not None else ""
-            print(f"  {col[1]:<28} {col[2]:<12}{pk}{nn}{dflt}")
-    conn.close()
+    with connection(db_path) as conn:
+        tables = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
+        ).fetchall()
+
+        for (table,) in tables:
+            cols = conn.execute(f"PRAGMA table_info({table})").fetchall()
+            print(f"\n[{table}]")
+            for col in cols:
+                pk  = " PK" if col[5] else ""
+                nn  = " NOT NULL" if col[3] else ""
+                dflt = f" DEFAULT {col[4]}" if col[4] is not None else ""
+                print(f"  {col[1]:<28} {col[2]:<12}{pk}{nn}{dflt}")
 
 
 if __name__ == '__main__':
-    init_schema()
-    describe()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='RedHood schema tools')
+    parser.add_argument('--migrate', action='store_true',
+                        help='Upgrade an existing database (columns, epochs, indexes)')
+    parser.add_argument('--db', default=DB_PATH, help='Database path')
+    args = parser.parse_args()
+
+    if args.migrate:
+        migrate(args.db)
+    else:
+        init_schema(args.db, force=True)
+        describe(args.db)
@@ -0,0 +1,220 @@
+"""
+RedHood Insights - Narrative Threads
+=====================================
+Links narratives across runs so "Fed pivot" at 09:00 and the same theme at
+09:10 share a lineage, and tracks how each thread's entropy drifts.
+
+Each narrative is reduced to a MinHash signature over the stemmed terms of
+its title and hypothesis. A new narrative joins the most similar recently active
+thread (estimated Jaccard >= THRESHOLD), otherwise it starts a new one.
+Threads live in the ``narrative_threads`` table; narratives point at them
+through ``narratives.thread_id``.
+
+Sibling windows of one scrape (run_multi, run_categories) share a batch_id
+and are matched against the threads as they stood before the batch: they
+never join a thread a sibling opened, and a thread a sibling already
+extended is linked without counting the batch twice in its history.
+
+Usage:
+    python narrative_threads.py            # list recently active threads
+"""
+
+import re
+import sqlite3
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from db import DB_PATH, connection, transaction
+
+NUM_PERM = 64
+THRESHOLD = 0.2           # estimated Jaccard needed to join a thread
+LOOKBACK_DAYS = 7         # only threads seen this recently are candidates
+HISTORY_POINTS = 7        # entropy points kept for the report sparkline
+MAX_BATCHES = 8           # recent batches whose pre-batch thread state is remembered
+
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed coefficients keep signatures stable across processes and releases
+_PERMS = [((i * 0x9E3779B1 + 0x7F4A7C15) % _MERSENNE | 1,
+           (i * 0x85EBCA77 + 0xC2B2AE3D) % _MERSENNE)
+          for i in range(1, NUM_PERM + 1)]
+
+_WORD_RE = re.compile(r"\$?[a-z0-9][a-z0-9+&'-]*")
+_STOPWORDS = {
+    'a', 'an', 'and', 'the', 'of', 'to', 'in', 'on', 'for', 'with', 'as', 'at',
+    'by', 'is', 'are', 'be', 'from', 'into', 'vs', 'amid', 'over', 'its', 'this',
+    'that', 'long', 'short', 'calls', 'puts', 'position', 'trade', 'weeks', 'week',
+}
+
+
+def shingles(text: str) -> set:
+    """
+    Stemmed unigram terms of a narrative, minus stopwords.
+
+    Titles are 5-8 words, so bigrams would mostly dilute the overlap
+    between paraphrases of the same theme.
+    """
+    terms = set()
+    for word in _WORD_RE.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]  # straddles -> straddle, cuts -> cut
+        terms.add(word)
+    return terms
+
+
+def minhash(terms: set) -> array:
+    """MinHash signature (NUM_PERM x uint32) of a term set."""
+    hashes = [zlib.crc32(t.encode('utf-8')) for t in terms] or [0]
+    return array('I', (min(((a * h + b) % _MERSENNE) & _MAX_HASH for h in hashes)
+                       for a, b in _PERMS))
+
+
+def similarity(sig_a: array, sig_b: array) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def _from_blob(blob: bytes) -> array:
+    sig = array('I')
+    sig.frombytes(blob)
+    return sig
+
+
+def narrative_signature(narrative) -> array:
+    return minhash(shingles(f"{narrative.title} {narrative.hypothesis}"))
+
+
+class ThreadTracker:
+    """Assigns narratives to threads and maintains entropy history."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        # batch_id -> {thread_id: signature before the batch, or None if the batch opened it}
+        self._batches: Dict[str, Dict[int, Optional[array]]] = {}
+
+    def assign(self, narratives: List, batch_id: str = None) -> None:
+        """
+        Set ``thread_id`` and ``entropy_history`` on each narrative.
+
+        Matching threads are updated (latest signature, entropy drift);
+        unmatched narratives open new threads. Each thread is claimed by at
+        most one narrative per call. With batch_id, sibling windows of the
+        same scrape don't match each other (see module docstring).
+        """
+        if not narratives:
+            return
+        now = datetime.utcnow()
+        since = (now - timedelta(days=LOOKBACK_DAYS)).isoformat()
+        batch = None
+        if batch_id:
+            batch = self._batches.setdefault(batch_id, {})
+            while len(self._batches) > MAX_BATCHES:
+                del self._batches[next(iter(self._batches))]
+
+        try:
+            with transaction(self.db_path) as conn:
+                candidates = []
+                for thread_id, blob in conn.execute(
+                        "SELECT id, signature FROM narrative_threads WHERE last_seen >= ?",
+                        (since,)):
+                    if batch is not None and thread_id in batch:
+                        if batch[thread_id] is None:
+                            continue          # opened by a sibling window
+                        candidates.append((thread_id, batch[thread_id]))
+                    else:
+                        candidates.append((thread_id, _from_blob(blob)))
+                claimed = set()
+                for narrative in narratives:
+                    sig = narrative_signature(narrative)
+                    best_id, best_sim = None, THRESHOLD
+                    for thread_id, thread_sig in candidates:
+                        if thread_id in claimed:
+                            continue
+                        sim = similarity(sig, thread_sig)
+                        if sim >= best_sim:
+                            best_id, best_sim = thread_id, sim
+
+                    if best_id is None:
+                        best_id = self._open_thread(conn, narrative, sig, now)
+                        narrative.entropy_history = [narrative.entropy_risk]
+                        if batch is not None:
+                            batch[best_id] = None
+                    else:
+                        history = self._history(conn, best_id, batch_id) + [narrative.entropy_risk]
+                        narrative.entropy_history = history[-HISTORY_POINTS:]
+                        if batch is None or best_id not in batch:
+                            if batch is not None:
+                                batch[best_id] = dict(candidates)[best_id]
+                            self._extend_thread(conn, best_id, narrative, sig, history, now)
+                    claimed.add(best_id)
+                    narrative.thread_id = best_id
+        except Exception as e:
+            print(f"⚠️  Narrative threading failed: {e}")
+
+    @staticmethod
+    def _history(conn: sqlite3.Connection, thread_id: int, batch_id: str = None) -> List[int]:
+        """Prior entropy points of a thread, leaving out the batch's own windows."""
+        rows = conn.execute(
+            """SELECT n.entropy_risk FROM narratives n LEFT JOIN runs r ON r.id = n.run_id
+               WHERE n.thread_id = ? AND (? IS NULL OR r.batch_id IS NOT ?)
+               ORDER BY n.created_epoch DESC LIMIT ?""",
+            (thread_id, batch_id, batch_id, HISTORY_POINTS - 1)
+        ).fetchall()
+        return [r[0] for r in reversed(rows)]
+
+    @staticmethod
+    def _open_thread(conn: sqlite3.Connection, narrative, sig: array, now: datetime) -> int:
+        cursor = conn.execute(
+            """INSERT INTO narrative_threads
+               (label, signature, first_seen, last_seen, narrative_count,
+                last_entropy, entropy_drift)
+               VALUES (?, ?, ?, ?, 1, ?, 0)""",
+            (narrative.title, sig.tobytes(), now.isoformat(), now.isoformat(),
+             narrative.entropy_risk)
+        )
+        return cursor.lastrowid
+
+    @staticmethod
+    def _extend_thread(conn: sqlite3.Connection, thread_id: int, narrative,
+                       sig: array, history: List[int], now: datetime):
+        # Drift: latest entropy minus the mean of the points before it
+        prior = history[:-1]
+        drift = history[-1] - sum(prior) / len(prior) if prior else 0.0
+        # The latest signature replaces the old one so the thread follows
+        # the theme as its wording evolves.
+        conn.execute(
+            """UPDATE narrative_threads
+               SET label = ?, signature = ?, last_seen = ?,
+                   narrative_count = narrative_count + 1,
+                   last_entropy = ?, entropy_drift = ?
+               WHERE id = ?""",
+            (narrative.title, sig.tobytes(), now.isoformat(),
+             narrative.entropy_risk, drift, thread_id)
+        )
+
+
+def list_threads(db_path: str = DB_PATH, days: Optional[float] = LOOKBACK_DAYS):
+    """Print recently active threads with their entropy drift."""
+    since = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            """SELECT id, label, narrative_count, last_entropy, entropy_drift, last_seen
+               FROM narrative_threads WHERE last_seen >= ? ORDER BY last_seen DESC""",
+            (since,)
+        ).fetchall()
+
+    print(f"\n{'ID':<5} {'Runs':<5} {'Risk':<5} {'Drift':<7} {'Last seen':<20} {'Label'}")
+    print("-" * 80)
+    for thread_id, label, count, entropy, drift, last_seen in rows:
+        print(f"{thread_id:<5} {count:<5} {entropy:<5} {drift:<+7.1f} {last_seen[:19]:<20} {label}")
+    print(f"\n{len(rows)} thread(s) active in the last {days:g} day(s).\n")
+
+
+if __name__ == '__main__':
+    from models import init_schema
+    init_schema()
+    list_threads()
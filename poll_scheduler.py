@@ -0,0 +1,188 @@
+"""
+RedHood Insights - Adaptive Poll Scheduler
+===========================================
+Decides which X/Twitter handles to poll through Nitter on each run.
+
+Each handle's posting rate is learned from stored ``feeds`` history. The
+poll interval is the time the account needs to post TARGET_ITEMS_PER_POLL
+items (well inside the 20 items a Nitter RSS page returns), capped by its
+category's freshness SLO, so a slow news account is still checked often
+enough to catch a breaking headline.
+
+The interval is also capped by the run's window: a poll only keeps items
+newer than ``hours_back``, so a handle skipped for longer than the window
+would never have its posts from between polls stored. A handle last polled
+a window or more ago is always due, which is what lets a skipped account
+lose nothing; short windows (e.g. 10 minutes) therefore poll most handles
+every run and the savings come from longer windows.
+
+    FirstSquawk  ~60 posts/h  → every run
+    slow macro   ~2 posts/wk  → every min(SLO, window) (e.g. 60 min)
+
+Polls that return nothing new stretch the interval (still capped by the
+SLO and window); failed polls back off exponentially so a dead handle stops
+hammering the mirrors. State lives in ``account_poll_state``.
+
+Usage:
+    python poll_scheduler.py               # show rates and the next poll per handle
+"""
+
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from db import DB_PATH, connection, transaction
+
+RATE_LOOKBACK_HOURS = 7 * 24     # posting history used to estimate rates
+TARGET_ITEMS_PER_POLL = 5        # expected new posts between polls
+MIN_INTERVAL_S = 0               # 0 = fast accounts are polled every run
+EMPTY_POLL_GROWTH = 1.5          # interval multiplier after a poll with nothing new
+FAILURE_BACKOFF_S = 300          # first retry delay after a failed poll
+MAX_BACKOFF_S = 6 * 3600
+POLL_GRACE_S = 120               # due if within this of next_poll (run cadence jitter)
+
+FALLBACK_SLO_MINUTES = 60        # categories missing from the SLO map
+
+
+class PollScheduler:
+    """Plans which handles are due and records poll outcomes."""
+
+    def __init__(self, slo_minutes: Dict[str, int], db_path: str = DB_PATH):
+        """slo_minutes: category -> max minutes between polls (Config.POLL_FRESHNESS_SLO_MINUTES)."""
+        self.slo_minutes = slo_minutes
+        self.db_path = db_path
+
+    def _slo_s(self, category: Optional[str]) -> int:
+        return int(self.slo_minutes.get(category, FALLBACK_SLO_MINUTES) * 60)
+
+    def plan(self, handles: List[str], window_s: float = None,
+             now: float = None) -> Tuple[List[str], List[str]]:
+        """
+        Split handles into (due, skipped).
+
+        Handles with no state yet are always due so their rate gets learned.
+        With window_s (the run's hours_back in seconds), a handle last polled
+        that long ago is due whatever its schedule, since anything older
+        than the window is dropped by the fetch.
+        """
+        now = now or time.time()
+        with connection(self.db_path) as conn:
+            state = {r['handle']: r for r in conn.execute(
+                "SELECT handle, next_poll_epoch, last_polled_epoch FROM account_poll_state"
+            )}
+        due, skipped = [], []
+        for handle in handles:
+            row = state.get(handle)
+            if (row is None or row['next_poll_epoch'] <= now + POLL_GRACE_S
+                    or (window_s and (row['last_polled_epoch'] or 0) + window_s <= now + POLL_GRACE_S)):
+                due.append(handle)
+            else:
+                skipped.append(handle)
+        return due, skipped
+
+    def record(self, status: Dict[str, bool], newest: Dict[str, int],
+               window_s: float = None, now: float = None):
+        """
+        Update schedules after a collection pass.
+
+        Args:
+            status: handle -> whether any Nitter instance answered
+            newest: handle -> epoch of the newest item fetched (absent if none)
+            window_s: the run's hours_back in seconds; caps successful intervals
+        """
+        if not status:
+            return
+        now = int(now or time.time())
+        with transaction(self.db_path) as conn:
+            rates = self._rates(conn, list(status), now)
+            categories = {r['handle']: r['category'] for r in conn.execute(
+                "SELECT handle, category FROM twitter_accounts"
+            )}
+            previous = {r['handle']: r for r in conn.execute(
+                "SELECT handle, interval_s, last_item_epoch, failures FROM account_poll_state"
+            )}
+            rows = []
+            for handle, ok in status.items():
+                prev = previous.get(handle)
+                slo = self._slo_s(categories.get(handle))
+                if window_s:
+                    slo = min(slo, int(window_s))
+                rate = rates.get(handle, 0.0)
+                last_item = max(filter(None, [newest.get(handle),
+                                              prev['last_item_epoch'] if prev else None]),
+                                default=None)
+                if not ok:
+                    failures = (prev['failures'] if prev else 0) + 1
+                    interval = prev['interval_s'] if prev else slo
+                    delay = min(MAX_BACKOFF_S, FAILURE_BACKOFF_S * 2 ** (failures - 1))
+                else:
+                    failures = 0
+                    interval = self._interval(rate, slo)
+                    got_new = prev is None or (newest.get(handle) or 0) > (prev['last_item_epoch'] or 0)
+                    if not got_new and prev:
+                        interval = min(slo, max(interval, int(prev['interval_s'] * EMPTY_POLL_GROWTH)))
+                    delay = interval
+                # Jitter spreads polls of similar accounts across runs
+                next_poll = now + int(delay * random.uniform(0.9, 1.0))
+                rows.append((handle, rate, interval, now, next_poll, last_item, failures))
+
+            conn.executemany(
+                """INSERT INTO account_poll_state
+                   (handle, rate_per_hour, interval_s, last_polled_epoch, next_poll_epoch,
+                    last_item_epoch, failures)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(handle) DO UPDATE SET
+                       rate_per_hour = excluded.rate_per_hour,
+                       interval_s = excluded.interval_s,
+                       last_polled_epoch = excluded.last_polled_epoch,
+                       next_poll_epoch = excluded.next_poll_epoch,
+                       last_item_epoch = excluded.last_item_epoch,
+                       failures = excluded.failures""",
+                rows
+            )
+
+    @staticmethod
+    def _interval(rate_per_hour: float, slo_s: int) -> int:
+        if rate_per_hour <= 0:
+            return slo_s
+        interval = int(TARGET_ITEMS_PER_POLL / rate_per_hour * 3600)
+        return max(MIN_INTERVAL_S, min(slo_s, interval))
+
+    @staticmethod
+    def _rates(conn, handles: List[str], now: int) -> Dict[str, float]:
+        """Posts per hour over the lookback, from stored tweets."""
+        authors = {f"@{h}": h for h in handles}
+        placeholders = ','.join('?' * len(authors))
+        rows = conn.execute(
+            f"""SELECT author, COUNT(*) FROM feeds
+                WHERE source = 'twitter' AND published_epoch >= ?
+                  AND author IN ({placeholders})
+                GROUP BY author""",
+            [now - RATE_LOOKBACK_HOURS * 3600] + list(authors)
+        ).fetchall()
+        return {authors[author]: count / RATE_LOOKBACK_HOURS for author, count in rows}
+
+
+def show_schedule(db_path: str = DB_PATH):
+    now = time.time()
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            """SELECT s.handle, a.category, s.rate_per_hour, s.interval_s,
+                      s.next_poll_epoch, s.failures
+               FROM account_poll_state s
+               LEFT JOIN twitter_accounts a ON a.handle = s.handle
+               ORDER BY s.next_poll_epoch"""
+        ).fetchall()
+    print(f"\n{'Handle':<22} {'Category':<10} {'Posts/h':>8} {'Every':>8} {'Next in':>9} {'Fails':>6}")
+    print("-" * 70)
+    for r in rows:
+        next_in = max(0, r['next_poll_epoch'] - now) / 60
+        print(f"@{r['handle']:<21} {r['category'] or '':<10} {r['rate_per_hour']:>8.2f} "
+              f"{r['interval_s'] / 60:>6.0f}m {next_in:>7.0f}m {r['failures']:>6}")
+    print(f"\n{len(rows)} handle(s) scheduled.\n")
+
+
+if __name__ == '__main__':
+    from models import init_schema
+    init_schema()
+    show_schedule()
@@ -0,0 +1,247 @@
+"""
+RedHood Insights - Stage Profiler
+==================================
+CPU and memory profiles per pipeline stage for ``--profile`` runs.
+
+RunMetrics already brackets every stage; when a StageProfiler is attached
+(``RunMetrics(profiler=...)``) the top-level stages are additionally run
+under cProfile and tracemalloc:
+
+    collect → scrape    format    api → extract    parse
+    render    persist    publish
+
+Each run writes, next to its redhood_insights_*.json:
+
+    redhood_profile_<name>.json        per stage: wall/CPU time, top functions,
+                                       top allocation sites, traced and RSS peaks
+    redhood_profile_<name>/<stage>.pstats   raw cProfile data (snakeviz, pstats)
+
+Stages that run on several threads (multi-window extraction) are merged.
+CPU and memory figures are process-wide, so concurrent stages overlap.
+
+Usage:
+    python redhood_aggregator.py --profile
+    python profiler.py diff data/redhood_profile_A.json data/redhood_profile_B.json
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource          # Unix only; peak RSS is omitted elsewhere
+except ImportError:
+    resource = None
+
+# RunMetrics stage name -> profile stage name
+PROFILED_STAGES = {
+    'collect': 'scrape',
+    'format': 'format',
+    'api': 'extract',
+    'parse': 'parse',
+    'render': 'render',
+    'persist': 'persist',
+    'publish': 'publish',
+}
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+TRACEMALLOC_FRAMES = 10
+
+
+def _peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak   # bytes on macOS
+
+
+class StageProfiler:
+    """Collects cProfile/tracemalloc data per stage for one run."""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        import tracemalloc   # profiling modules load only under --profile
+
+        self._profiles: Dict[str, List['cProfile.Profile']] = {}
+        self._lock = threading.Lock()
+        self._active = threading.local()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Profile the enclosed block as ``name``; nested stages are not re-profiled."""
+        import cProfile
+        import tracemalloc
+
+        if getattr(self._active, 'name', None):
+            yield
+            return
+        self._active.name = name
+        profile = cProfile.Profile()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        rss_before = _peak_rss_kb()
+        started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            profile.enable()
+        except ValueError:
+            profile = None   # 3.12+: one cProfile at a time; concurrent stages keep timings only
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            wall_ms = (time.perf_counter() - started) * 1000
+            cpu_ms = (time.process_time() - cpu_started) * 1000
+            _, traced_peak = tracemalloc.get_traced_memory()
+            growth = tracemalloc.take_snapshot().compare_to(before, 'lineno')
+            self._active.name = None
+            self._record(name, profile, wall_ms, cpu_ms, traced_peak, growth,
+                         rss_before, _peak_rss_kb())
+
+    def _record(self, name, profile, wall_ms, cpu_ms, traced_peak, growth,
+                rss_before, rss_after):
+        allocations = [{
+            'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_kb': round(stat.size_diff / 1024, 1),
+            'count': stat.count_diff,
+        } for stat in growth if stat.size_diff > 0][:TOP_ALLOCATIONS]
+        with self._lock:
+            if profile is not None:
+                self._profiles.setdefault(name, []).append(profile)
+            entry = self.stages.setdefault(name, {
+                'calls': 0, 'wall_ms': 0.0, 'cpu_ms': 0.0, 'traced_peak_kb': 0.0,
+                'rss_peak_kb': None, 'rss_growth_kb': 0, 'allocations': [],
+            })
+            entry['calls'] += 1
+            entry['wall_ms'] = round(entry['wall_ms'] + wall_ms, 2)
+            entry['cpu_ms'] = round(entry['cpu_ms'] + cpu_ms, 2)
+            entry['traced_peak_kb'] = max(entry['traced_peak_kb'], round(traced_peak / 1024, 1))
+            if rss_after is not None:
+                entry['rss_peak_kb'] = rss_after
+                entry['rss_growth_kb'] += rss_after - rss_before
+            entry['allocations'] = sorted(entry['allocations'] + allocations,
+                                          key=lambda a: -a['size_kb'])[:TOP_ALLOCATIONS]
+
+    # ------------------------------------------------------------------
+    # Artifacts
+    # ------------------------------------------------------------------
+
+    def _stats(self, name: str) -> Optional['pstats.Stats']:
+        import pstats
+
+        profiles = self._profiles.get(name)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0], stream=io.StringIO())
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    @staticmethod
+    def _top_functions(stats: 'pstats.Stats') -> List[Dict[str, Any]]:
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({'function': f"{os.path.basename(filename)}:{line}({func})",
+                         'calls': nc, 'tottime_ms': round(tt * 1000, 2),
+                         'cumtime_ms': round(ct * 1000, 2)})
+        rows.sort(key=lambda r: -r['cumtime_ms'])
+        return rows[:TOP_FUNCTIONS]
+
+    def write(self, json_path: str) -> str:
+        """Write the artifact for the run saved at json_path; returns its path."""
+        directory, filename = os.path.split(json_path)
+        base = os.path.splitext(filename)[0].replace('redhood_insights_', 'redhood_profile_', 1)
+        pstats_dir = os.path.join(directory, base)
+        os.makedirs(pstats_dir, exist_ok=True)
+
+        report = {'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                  'rss_peak_kb': _peak_rss_kb(), 'stages': {}}
+        with self._lock:
+            for name, entry in self.stages.items():
+                stats = self._stats(name)
+                if stats is not None:
+                    stats.dump_stats(os.path.join(pstats_dir, f"{name}.pstats"))
+                report['stages'][name] = {**entry,
+                                          'functions': self._top_functions(stats) if stats else []}
+
+        path = os.path.join(directory, f"{base}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"🔬 Profile saved to:  {path}")
+        return path
+
+
+# ============================================================================
+# DIFF
+# ============================================================================
+
+def diff(path_a: str, path_b: str, top: int = 10):
+    """Print stage-by-stage changes from profile A to profile B."""
+    with open(path_a, encoding='utf-8') as f:
+        a = json.load(f)
+    with open(path_b, encoding='utf-8') as f:
+        b = json.load(f)
+
+    def delta(old, new, unit):
+        if old is None or new is None:
+            return f"{'n/a':>10}"
+        change = new - old
+        pct = f" ({change / old * 100:+.0f}%)" if old else ''
+        return f"{change:+10.1f}{unit}{pct}"
+
+    print(f"\nA: {path_a}\nB: {path_b}\n")
+    print(f"{'Stage':<9} {'wall A':>10} {'wall B':>10} {'Δ wall':>18} {'Δ CPU':>18} "
+          f"{'Δ traced peak':>20}")
+    print("-" * 90)
+    names = list(PROFILED_STAGES.values())
+    names += [n for n in {**a['stages'], **b['stages']} if n not in names]
+    for name in names:
+        sa, sb = a['stages'].get(name), b['stages'].get(name)
+        if not sa and not sb:
+            continue
+        if not sa or not sb:
+            print(f"{name:<9} {'only in ' + ('B' if sb else 'A'):>21}")
+            continue
+        print(f"{name:<9} {sa['wall_ms']:>8.1f}ms {sb['wall_ms']:>8.1f}ms "
+              f"{delta(sa['wall_ms'], sb['wall_ms'], 'ms'):>18} "
+              f"{delta(sa['cpu_ms'], sb['cpu_ms'], 'ms'):>18} "
+              f"{delta(sa['traced_peak_kb'], sb['traced_peak_kb'], 'KB'):>20}")
+    print(f"\nPeak RSS: {a.get('rss_peak_kb')} KB → {b.get('rss_peak_kb')} KB")
+
+    # Functions whose cumulative time moved most, per stage
+    for name in names:
+        sa, sb = a['stages'].get(name), b['stages'].get(name)
+        if not sa or not sb:
+            continue
+        old = {f['function']: f['cumtime_ms'] for f in sa['functions']}
+        new = {f['function']: f['cumtime_ms'] for f in sb['functions']}
+        moves = sorted(((new.get(fn, 0.0) - old.get(fn, 0.0), fn) for fn in set(old) | set(new)),
+                       key=lambda m: -abs(m[0]))[:top]
+        moves = [m for m in moves if abs(m[0]) >= 1.0]
+        if moves:
+            print(f"\n{name}: largest cumulative-time changes")
+            for change, fn in moves:
+                print(f"   {change:+9.1f} ms  {fn}")
+    print()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='RedHood stage profiles')
+    commands = parser.add_subparsers(dest='command', required=True)
+    diff_cmd = commands.add_parser('diff', help='Compare two redhood_profile_*.json artifacts')
+    diff_cmd.add_argument('a', help='Baseline profile')
+    diff_cmd.add_argument('b', help='Profile to compare')
+    diff_cmd.add_argument('--top', type=int, default=10, help='Functions listed per stage')
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        diff(args.a, args.b, args.top)
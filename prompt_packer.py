@@ -0,0 +1,193 @@
+"""
+RedHood Insights - Token-Budget Prompt Packer
+==============================================
+Chooses which feeds go into the extraction prompt, and how much of each,
+so that a run fills a fixed input-token budget instead of a fixed
+"50 feeds x 300 characters" slice.
+
+Each feed is scored for relevance (recency, cross-author overlap of tickers
+and named entities, substance), its token cost is estimated, and the
+budget is filled greedily from the highest score down. Short tweets cost
+only what they use, leaving room for longer Substack excerpts.
+
+Token estimation is offline by default. Pass ``count_tokens`` (e.g. a
+wrapper around ``client.messages.count_tokens``) to calibrate the offline
+estimate against the real tokenizer with a single call per run, on a
+bounded sample of the window.
+"""
+
+import math
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Word runs and individual punctuation marks approximate BPE pieces well
+# enough for budgeting; the factor covers sub-word splits.
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_PIECE_FACTOR = 1.15
+
+# Tickers ($QQQ) and capitalized terms (Fed, OPEC, Powell) drive overlap
+_ENTITY_RE = re.compile(r"\$[A-Za-z]{1,6}\b|\b[A-Z][A-Za-z0-9+&]{2,}\b")
+
+# Mention z-score (rollups.window_heat) at which a ticker's spike bonus maxes out
+HEAT_Z_CAP = 4.0
+
+# Characters of feed text sent to count_tokens for calibration
+CALIBRATION_SAMPLE_CHARS = 8000
+
+# Per-feed prompt header: "[12] TWITTER | @FirstSquawk | 2026-02-22 08:49\n"
+HEADER_TOKENS = 18
+
+
+class PromptPacker:
+    """Greedy relevance-ordered packing of feeds into an input-token budget."""
+
+    def __init__(self, token_budget: int, max_item_tokens: int,
+                 count_tokens: Optional[Callable[[str], int]] = None,
+                 recency_half_life_hours: float = 2.0):
+        self.token_budget = token_budget
+        self.max_item_tokens = max_item_tokens
+        self.count_tokens = count_tokens
+        self.recency_half_life_hours = recency_half_life_hours
+
+    # ------------------------------------------------------------------
+    # Token estimation
+    # ------------------------------------------------------------------
+
+    def estimate_tokens(self, text: str, scale: float = 1.0) -> int:
+        """Offline token estimate, times a tokenizer calibration scale."""
+        if not text:
+            return 0
+        pieces = len(_PIECE_RE.findall(text))
+        return max(1, math.ceil(pieces * _PIECE_FACTOR * scale))
+
+    def truncate(self, text: str, max_tokens: int, scale: float = 1.0) -> Tuple[str, bool]:
+        """Cut text to roughly max_tokens. Returns (text, was_truncated)."""
+        limit = int(max_tokens / (_PIECE_FACTOR * scale))
+        for i, match in enumerate(_PIECE_RE.finditer(text)):
+            if i == limit:
+                return text[:match.start()].rstrip(), True
+        return text, False
+
+    def _calibrate(self, texts: List[str]) -> float:
+        """
+        Scale fitting the offline estimate to the real tokenizer, from one call.
+
+        Returned rather than stored: concurrent windows share the packer.
+        The sample takes evenly spaced texts up to CALIBRATION_SAMPLE_CHARS,
+        so a large window costs no more to calibrate than a small one.
+        """
+        texts = [t for t in texts if t]
+        if not self.count_tokens or not texts:
+            return 1.0
+        step = max(1, len(texts) * 300 // CALIBRATION_SAMPLE_CHARS)
+        picked, size = [], 0
+        for text in texts[::step]:
+            text = text[:CALIBRATION_SAMPLE_CHARS - size]
+            picked.append(text)
+            size += len(text) + 1
+            if size >= CALIBRATION_SAMPLE_CHARS:
+                break
+        sample = "\n".join(picked)
+        estimated = self.estimate_tokens(sample)
+        try:
+            actual = self.count_tokens(sample)
+        except Exception as e:
+            print(f"   ⚠️  Token count endpoint failed, using offline estimate: {e}")
+            return 1.0
+        return actual / estimated if estimated and actual else 1.0
+
+    # ------------------------------------------------------------------
+    # Relevance scoring
+    # ------------------------------------------------------------------
+
+    def score(self, feeds: List, heat: Optional[Dict[str, float]] = None,
+              scale: float = 1.0) -> List[float]:
+        """
+        Relevance score in [0, 1] per feed.
+
+        Blends recency relative to the newest item, how many other authors
+        mention the same tickers/entities, and how much substance the item
+        carries (near-empty posts score low). With ``heat`` (ticker ->
+        mention z-score) a fifth of the score goes to the feed's hottest
+        cashtag, so chatter that is spiking against its history ranks up.
+        """
+        if not feeds:
+            return []
+
+        newest = max(f.timestamp for f in feeds)
+        entity_sets = [set(_ENTITY_RE.findall(f.clean_text)) for f in feeds]
+
+        # entity -> set of authors mentioning it
+        authors_by_entity = {}
+        for feed, entities in zip(feeds, entity_sets):
+            for entity in entities:
+                authors_by_entity.setdefault(entity, set()).add(feed.author)
+
+        scores = []
+        for feed, entities in zip(feeds, entity_sets):
+            age_h = (newest - feed.timestamp).total_seconds() / 3600
+            recency = 0.5 ** (age_h / self.recency_half_life_hours)
+
+            echoes = sum(len(authors_by_entity[e]) - 1 for e in entities)
+            overlap = 1 - 1 / (1 + echoes)
+
+            tokens = self.estimate_tokens(feed.clean_text, scale)
+            substance = min(1.0, math.log1p(tokens) / math.log1p(self.max_item_tokens))
+
+            score = 0.4 * recency + 0.4 * overlap + 0.2 * substance
+            if heat:
+                spike = max((heat.get(e[1:].upper(), 0.0) for e in entities if e[0] == '$'),
+                            default=0.0)
+                score = 0.8 * score + 0.2 * min(1.0, max(spike, 0.0) / HEAT_Z_CAP)
+            scores.append(score)
+        return scores
+
+    # ------------------------------------------------------------------
+    # Packing
+    # ------------------------------------------------------------------
+
+    def pack(self, feeds: List, max_feeds: Optional[int] = None,
+             heat: Optional[Dict[str, float]] = None) -> List[Tuple[object, str]]:
+        """
+        Select feeds and their (possibly truncated) prompt text.
+
+        Args:
+            feeds: FeedItem objects, newest first
+            max_feeds: optional hard cap on the number of feeds
+            heat: optional ticker -> mention z-score (see score)
+
+        Returns:
+            List of (feed, text) in the original feed order
+        """
+        scale = self._calibrate([f.clean_text for f in feeds])
+        scores = self.score(feeds, heat, scale)
+        ranked = sorted(range(len(feeds)), key=lambda i: scores[i], reverse=True)
+
+        remaining = self.token_budget
+        seen_text = set()
+        chosen = {}
+        for i in ranked:
+            if max_feeds is not None and len(chosen) >= max_feeds:
+                break
+            feed = feeds[i]
+            text = feed.clean_text
+            if not text or text in seen_text:  # empty or duplicate/retweet
+                continue
+
+            cost = self.estimate_tokens(text, scale)
+            allowance = min(self.max_item_tokens, remaining - HEADER_TOKENS)
+            if allowance <= 0:
+                break
+            if cost > allowance:
+                # Only truncate when a meaningful excerpt still fits
+                if allowance < min(cost, self.max_item_tokens) // 3:
+                    continue
+                text, _ = self.truncate(text, allowance - 1, scale)
+                text += "…"
+                cost = self.estimate_tokens(text, scale)
+
+            seen_text.add(feed.clean_text)
+            chosen[i] = text
+            remaining -= cost + HEADER_TOKENS
+
+        return [(feeds[i], chosen[i]) for i in sorted(chosen)]
@@ -24,18 +24,33 @@ import os
 import json
 import time
 import base64
-import urllib.request
-import urllib.error
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import sqlite3
-import feedparser
-from anthropic import Anthropic
-from dotenv import load_dotenv
-from accounts_db import get_active_handles, init_db
-from models import DB_PATH, init_schema
-
-load_dotenv()  # loads .env from project root if present
+from typing import List, Dict, Any, Tuple
+from accounts_db import get_account_categories, get_active_handles, init_db
+from db import DB_PATH, connection, transaction
+from models import to_epoch
+from text_clean import clean_html
+from prompt_packer import PromptPacker
+from narrative_threads import ThreadTracker
+from metrics import RunMetrics
+from profiler import StageProfiler
+from poll_scheduler import PollScheduler
+from governor import get_governor
+import fast_rss
+import work_queue
+import report_assets
+import response_parser
+
+# Heavy modules (anthropic, feedparser, urllib.request, concurrent.futures,
+# and the NumPy-backed risk, rollups and vector_index) are imported where
+# they are first used, so CLI commands that never touch the network, the
+# API or the analytics start fast.
+
+_ENV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+if os.path.exists(_ENV_PATH):
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_PATH)  # loads .env from project root if present
 
 # ============================================================================
 # CONFIGURATION
@@ -69,14 +84,90 @@ class Config:
         'https://doomberg.substack.com/feed',
         'https://noahpinion.substack.com/feed'
     ]
+
+    # Category shards (--categories): tweets take their account's
+    # twitter_accounts.category, RSS feeds are mapped here, and anything
+    # unmapped goes to the UNCATEGORIZED desk.
+    SUBSTACK_FEED_CATEGORIES = {
+        'https://arbitrageandy.substack.com/feed': 'market',
+        'https://doomberg.substack.com/feed':      'macro',
+        'https://noahpinion.substack.com/feed':    'macro',
+    }
+    UNCATEGORIZED = 'general'
     
+    # Yahoo Finance chart endpoint for the report ticker tape
+    YAHOO_CHART_URL = 'https://query1.finance.yahoo.com/v8/finance/chart/'
+
+    # Stream feeds and stop at the time cutoff (fast_rss.py); '0' parses
+    # every feed with feedparser instead
+    FAST_RSS = os.getenv('REDHOOD_FAST_RSS', '1') != '0'
+
     # AI Configuration
     CLAUDE_MODEL = 'claude-sonnet-4-5'
-    MAX_FEEDS_TO_PROCESS = 50  # Limit for cost control
+    MAX_FEEDS_TO_PROCESS = 150  # Hard cap; the token budget usually binds first
+
+    # Prompt packing (see prompt_packer.py)
+    PROMPT_INPUT_TOKEN_BUDGET = int(os.getenv('REDHOOD_PROMPT_TOKEN_BUDGET', '12000'))
+    PROMPT_MAX_ITEM_TOKENS = 400     # longest excerpt any single feed may take
+    PROMPT_COUNT_TOKENS_API = os.getenv('REDHOOD_COUNT_TOKENS_API', '') == '1'
+
+    # Force a record_narratives tool call so output arrives as structured
+    # JSON (see response_parser.py); text mode is parsed tolerantly either way
+    TOOL_OUTPUT = os.getenv('REDHOOD_TOOL_OUTPUT', '') == '1'
+
+    # Two-tier cascade: a small model triages the window and compresses it
+    # to one-line evidence; CLAUDE_MODEL runs only when something material
+    # changed, on that evidence alone. Quiet windows carry the last
+    # narratives forward.
+    CASCADE_MODE = os.getenv('REDHOOD_CASCADE', '') == '1'
+    TRIAGE_MODEL = 'claude-haiku-4-5'
+    TRIAGE_MAX_TOKENS = 2000
+
+    # Similar stored narratives retrieved into the prompt as a HISTORY block
+    # (see vector_index.py; needs NumPy). 0 disables retrieval and indexing.
+    HISTORY_K = int(os.getenv('REDHOOD_HISTORY_K', '5'))
+
+    # Rank feeds on tickers whose mention rate spikes against the hourly
+    # rollups higher (see rollups.py; needs NumPy)
+    ROLLUP_RANKING = os.getenv('REDHOOD_ROLLUP_RANKING', '1') != '0'
+    CHATTER_SPIKE_Z = 2.0            # report's "Chatter Spike" cell from this z-score
+
+    # Keep narrative trades open as hypothetical positions and size them
+    # against the book's correlation-adjusted heat (see risk.py; needs NumPy)
+    RISK_SIZING = os.getenv('REDHOOD_RISK_SIZING', '1') != '0'
+    RISK_EQUITY = float(os.getenv('REDHOOD_RISK_EQUITY', '100000'))   # run.ps1 -InitialEquity
+    MAX_HEAT = float(os.getenv('REDHOOD_MAX_HEAT', '6'))              # % of equity at 2σ over the hold
     
     # Output
     OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
 
+    # Per-run metrics export besides the run_metrics table: '', 'prometheus' or 'json'
+    METRICS_EXPORT = os.getenv('REDHOOD_METRICS_EXPORT', '').lower()
+
+    # Per-stage cProfile/tracemalloc artifacts next to the JSON (see profiler.py)
+    PROFILE = os.getenv('REDHOOD_PROFILE', '') == '1'
+
+    # Slim reports (see report_assets.py): shared versioned stylesheet,
+    # minified HTML and precompressed .gz/.br siblings
+    SLIM_OUTPUT = os.getenv('REDHOOD_SLIM_OUTPUT', '') == '1'
+
+    # Adaptive Nitter polling (see poll_scheduler.py). Handles not due this
+    # run contribute their already-stored posts instead of a fresh fetch;
+    # none is skipped for longer than the run's window.
+    ADAPTIVE_POLLING = os.getenv('REDHOOD_ADAPTIVE_POLLING', '1') != '0'
+    POLL_FRESHNESS_SLO_MINUTES = {   # max staleness per twitter_accounts.category
+        'news':   5,
+        'market': 15,
+        'macro':  60,
+        'bio':    240,
+    }
+
+    # Distributed scraping (see work_queue.py): enqueue fetch jobs and let
+    # worker processes do the fetching; analysis starts once the window's
+    # jobs are finished or the timeout passes.
+    DISTRIBUTED_SCRAPE = os.getenv('REDHOOD_DISTRIBUTED', '') == '1'
+    SCRAPE_WINDOW_TIMEOUT_S = int(os.getenv('REDHOOD_SCRAPE_TIMEOUT', '300'))
+
 
 # ============================================================================
 # DATA MODELS
@@ -86,11 +177,14 @@ class FeedItem:
     """Represents a single feed item from any source"""
     
     def __init__(self, source: str, author: str, content: str, 
-                 timestamp: datetime, url: str = None, metadata: Dict = None):
+                 timestamp: datetime, url: str = None, metadata: Dict = None,
+                 clean_text: str = None):
         self.id = f"{source}_{author}_{int(timestamp.timestamp())}"
         self.source = source
         self.author = author
         self.content = content
+        # Normalized once here; prompts and persistence reuse it
+        self.clean_text = clean_text if clean_text is not None else clean_html(content)
         self.timestamp = timestamp
         self.url = url
         self.metadata = metadata or {}
@@ -101,11 +195,27 @@ class FeedItem:
             'source': self.source,
             'author': self.author,
             'content': self.content,
+            'clean_text': self.clean_text,
             'timestamp': self.timestamp.isoformat(),
             'url': self.url,
             'metadata': self.metadata
         }
-    
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'FeedItem':
+        """Rebuild a FeedItem from to_dict() output (e.g. a scrape worker's result)."""
+        item = cls(
+            source=d['source'],
+            author=d['author'],
+            content=d['content'],
+            timestamp=datetime.fromisoformat(d['timestamp']),
+            url=d.get('url'),
+            metadata=d.get('metadata') or {},
+            clean_text=d.get('clean_text')
+        )
+        item.id = d.get('id', item.id)
+        return item
+
     def __repr__(self):
         return f"FeedItem({self.source}, {self.author}, {self.timestamp})"
 
@@ -116,13 +226,16 @@ class Narrative:
     def __init__(self, title: str, entropy_risk: int, hypothesis: str,
                  rationale: str, catalysts: List[str], supporting_feeds: List[str]):
         self.id = f"narrative_{int(time.time())}_{id(self)}"
-        self.date = datetime.now()
+        self.date = datetime.utcnow()
         self.title = title
         self.entropy_risk = entropy_risk  # 1-10 scale
         self.hypothesis = hypothesis
         self.rationale = rationale
         self.catalysts = catalysts
         self.supporting_feeds = supporting_feeds
+        self.thread_id = None          # set by ThreadTracker.assign
+        self.entropy_history = []      # prior entropy points in the thread + this one
+        self.sizing = []               # sized trade legs, set by risk.RiskBook.update
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -133,9 +246,30 @@ class Narrative:
             'hypothesis': self.hypothesis,
             'rationale': self.rationale,
             'catalysts': self.catalysts,
-            'supporting_feeds': self.supporting_feeds
+            'supporting_feeds': self.supporting_feeds,
+            'thread_id': self.thread_id,
+            'entropy_history': self.entropy_history,
+            'sizing': self.sizing
         }
 
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'Narrative':
+        """Rebuild a Narrative from to_dict() output (e.g. a saved JSON run)."""
+        narrative = cls(
+            title=d['title'],
+            entropy_risk=d['entropy_risk'],
+            hypothesis=d['hypothesis'],
+            rationale=d['rationale'],
+            catalysts=d.get('catalysts', []),
+            supporting_feeds=d.get('supporting_feeds', [])
+        )
+        narrative.id = d.get('id', narrative.id)
+        if d.get('date'):
+            narrative.date = datetime.fromisoformat(d['date'])
+        narrative.thread_id = d.get('thread_id')
+        narrative.entropy_history = d.get('entropy_history', [])
+        return narrative
+
 
 # ============================================================================
 # FEED SCRAPERS
@@ -145,28 +279,30 @@ class RSSFeedScraper:
     """Scraper for Substack and other RSS feeds"""
     
     @staticmethod
-    def fetch(feed_urls: List[str], hours_back: float = 24) -> List[FeedItem]:
+    def fetch(feed_urls: List[str], hours_back: float = 24,
+              metrics: RunMetrics = None) -> List[FeedItem]:
         """Fetch recent posts from RSS feeds"""
         items = []
-        cutoff_time = datetime.now() - timedelta(hours=hours_back)
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours_back)  # feed dates are UTC
+        metrics = metrics or RunMetrics()
         
         for feed_url in feed_urls:
             try:
-                feed = feedparser.parse(feed_url)
-                source_name = feed.feed.get('title', 'Unknown RSS')
+                # Stops reading at the cutoff or the 10 most recent entries
+                with metrics.stage('collect.rss', label=feed_url):
+                    feed = fast_rss.fetch(feed_url, cutoff_time, limit=10,
+                                          streaming=Config.FAST_RSS)
+                if feed.fallback:
+                    metrics.record('collect.rss.fallback', value=1, label=feed_url)
+                source_name = feed.title or 'Unknown RSS'
                 
-                for entry in feed.entries[:10]:  # Limit to 10 most recent
-                    pub_date = datetime(*entry.published_parsed[:6])
-                    
-                    if pub_date < cutoff_time:
-                        continue
-                    
+                for entry in feed.entries:
                     item = FeedItem(
                         source='rss',
                         author=source_name,
-                        content=entry.get('summary', entry.get('title', '')),
-                        timestamp=pub_date,
-                        url=entry.get('link'),
+                        content=entry['summary'],
+                        timestamp=entry['published'],
+                        url=entry['link'],
                         metadata={'feed_url': feed_url}
                     )
                     items.append(item)
@@ -180,41 +316,49 @@ class RSSFeedScraper:
 class NitterScraper:
     """Scraper for X/Twitter via Nitter RSS (no API key required)"""
 
-    def __init__(self, instances: List[str]):
+    def __init__(self, instances: List[str], scheme: str = 'https'):
         self.instances = instances
+        self.scheme = scheme  # 'http' only for local stub servers (bench.py)
 
     def _rss_url(self, instance: str, account: str) -> str:
-        return f"https://{instance}/{account}/rss"
+        return f"{self.scheme}://{instance}/{account}/rss"
+
+    def fetch(self, accounts: List[str], hours_back: float = 24,
+              metrics: RunMetrics = None, status: Dict[str, bool] = None) -> List[FeedItem]:
+        """
+        Fetch recent tweets via Nitter RSS, trying each instance per account.
 
-    def fetch(self, accounts: List[str], hours_back: float = 24) -> List[FeedItem]:
-        """Fetch recent tweets via Nitter RSS, trying each instance per account."""
+        If ``status`` is given it is filled with account -> whether any
+        instance answered, for the poll scheduler.
+        """
         items = []
-        cutoff_time = datetime.now() - timedelta(hours=hours_back)
+        status = status if status is not None else {}
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours_back)  # feed dates are UTC
+        metrics = metrics or RunMetrics()
 
         for account in accounts:
             fetched = False
             for instance in self.instances:
                 url = self._rss_url(instance, account)
                 try:
-                    feed = feedparser.parse(url)
-                    if feed.bozo and not feed.entries:
-                        continue
-                    for entry in feed.entries[:20]:
-                        if not entry.get('published_parsed'):
-                            continue
-                        pub_date = datetime(*entry.published_parsed[:6])
-                        if pub_date < cutoff_time:
-                            continue
+                    with metrics.stage('collect.nitter', label=f"{account}@{instance}"):
+                        feed = fast_rss.fetch(url, cutoff_time, limit=20,
+                                              streaming=Config.FAST_RSS)
+                    if feed.fallback:
+                        metrics.record('collect.nitter.fallback', value=1,
+                                       label=f"{account}@{instance}")
+                    for entry in feed.entries:
                         # Nitter links point back to nitter; rewrite to x.com
-                        link = entry.get('link', '')
-                        link = link.replace(f'https://{instance}', 'https://x.com')
+                        link = entry['link'].replace(f'{self.scheme}://{instance}', 'https://x.com')
+                        content = entry['summary']
                         item = FeedItem(
                             source='twitter',
                             author=f"@{account}",
-                            content=entry.get('summary', entry.get('title', '')),
-                            timestamp=pub_date,
+                            content=content,
+                            timestamp=entry['published'],
                             url=link,
-                            metadata={'nitter_instance': instance}
+                            metadata={'nitter_instance': instance},
+                            clean_text=clean_html(content, rewrite_host=instance)
                         )
                         items.append(item)
                     fetched = True
@@ -222,12 +366,27 @@ class NitterScraper:
                 except Exception as e:
                     print(f"   Nitter instance {instance} failed for @{account}: {e}")
 
+            status[account] = fetched
             if not fetched:
                 print(f"⚠️  Could not fetch @{account} from any Nitter instance")
 
         return items
 
 
+def symbol_heat(feeds: List[FeedItem]) -> Dict[str, Dict[str, float]]:
+    """Cashtag -> {mentions, rate, zscore} of the window against the hourly rollups."""
+    if not Config.ROLLUP_RANKING:
+        return {}
+    import rollups
+    if not rollups.available():
+        return {}
+    try:
+        return rollups.window_heat((f.clean_text, to_epoch(f.timestamp)) for f in feeds)
+    except Exception as e:
+        print(f"⚠️  Mention rollups unavailable: {e}")
+        return {}
+
+
 # ============================================================================
 # AI ANALYSIS ENGINE
 # ============================================================================
@@ -236,45 +395,122 @@ class NarrativeExtractor:
     """Uses Claude AI to extract market narratives from feeds"""
     
     def __init__(self, api_key: str):
-        self.client = Anthropic(api_key=api_key)
+        self.api_key = api_key
+        self._client = None
+        self._client_lock = threading.Lock()
         self.model = Config.CLAUDE_MODEL
+        self.triage_model = Config.TRIAGE_MODEL
+        self.packer = PromptPacker(
+            token_budget=Config.PROMPT_INPUT_TOKEN_BUDGET,
+            max_item_tokens=Config.PROMPT_MAX_ITEM_TOKENS,
+            count_tokens=self._count_tokens if Config.PROMPT_COUNT_TOKENS_API else None,
+        )
+
+    @property
+    def client(self):
+        """Anthropic client, created on first API use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from anthropic import Anthropic
+                    # Retries and backoff are owned by the shared governor
+                    self._client = Anthropic(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    def _count_tokens(self, text: str) -> int:
+        """Exact input token count from the Anthropic token-counting endpoint."""
+        result = self.client.messages.count_tokens(
+            model=self.model,
+            messages=[{"role": "user", "content": text}]
+        )
+        return result.input_tokens
     
-    def extract_narratives(self, feeds: List[FeedItem], max_feeds: int = 50) -> List[Narrative]:
+    def extract_narratives(self, feeds: List[FeedItem], max_feeds: int = 50,
+                           usage: Dict[str, Any] = None,
+                           metrics: RunMetrics = None,
+                           previous: List[Narrative] = None) -> List[Narrative]:
         """
         Process feeds through Claude to extract top narratives
         
         Args:
             feeds: List of FeedItem objects
-            max_feeds: Maximum number of feeds to process (cost control)
+            max_feeds: Hard cap on feeds to process; the packer's token
+                budget decides how many actually fit (cost control)
+            usage: Optional dict filled with token usage and API latency
+                (see _record_usage), for persisting on the runs row
+            metrics: Optional collector for format/api/parse stage samples
+            previous: The window's last narratives; in cascade mode the
+                triage compares against them and a quiet window returns them
         
         Returns:
             List of Narrative objects
         """
         
-        # Limit feeds for cost control
-        feeds_to_process = feeds[:max_feeds]
-        
-        # Format feeds for prompt
-        feeds_text = self._format_feeds_for_prompt(feeds_to_process)
-        
-        # Build prompt
-        prompt = self._build_extraction_prompt(feeds_text)
+        metrics = metrics or RunMetrics()
+        usage = usage if usage is not None else {}
+
+        with metrics.stage('format'):
+            # Fill the input token budget by relevance
+            heat = {s: h['zscore'] for s, h in symbol_heat(feeds).items()}
+            packed = self.packer.pack(feeds, max_feeds=max_feeds, heat=heat)
+            feeds_to_process = [feed for feed, _ in packed]
+            
+            # Format feeds for prompt
+            feeds_text = self._format_feeds_for_prompt(packed)
+            history = self._history(' '.join(text for _, text in packed), metrics)
+            
+            # Static instructions go in the system prompt; only the user turn varies per call
+            request = self._build_extraction_request(feeds_text, history)
+        metrics.record('format.feeds', value=len(feeds_to_process))
+
+        if Config.CASCADE_MODE:
+            triage = self._triage(feeds_text, previous or [], metrics)
+            if triage is not None and not triage['material']:
+                print(f"🧊 Triage: no material change ({triage.get('reason') or 'quiet window'}); "
+                      f"skipping {self.model}")
+                metrics.record('cascade.skipped', value=1)
+                return self._carry_forward(previous or [])
+            evidence = self._evidence(triage, feeds_to_process) if triage else []
+            if evidence:
+                # The large model sees only the triage's compressed evidence
+                feeds_to_process = [feed for feed, _ in evidence]
+                request = self._build_extraction_request(self._format_feeds_for_prompt(evidence),
+                                                         history)
+                metrics.record('cascade.escalated', value=len(evidence))
         
         # Call Claude API
         try:
             print(f"🤖 Analyzing {len(feeds_to_process)} feeds with Claude...")
             
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            started = time.perf_counter()
+            with metrics.profile('api'):
+                response = get_governor().create(
+                    self.client,
+                    estimated_input_tokens=self.packer.estimate_tokens(feeds_text),
+                    metrics=metrics,
+                    model=self.model,
+                    max_tokens=4000,
+                    **request
+                )
+            self._record_usage(usage, response, time.perf_counter() - started)
+            metrics.record('api', duration_ms=usage['api_latency_ms'])
+            for stage, key in (('tokens.input', 'input_tokens'),
+                               ('tokens.output', 'output_tokens'),
+                               ('tokens.cache_write', 'cache_creation_input_tokens'),
+                               ('tokens.cache_read', 'cache_read_input_tokens')):
+                metrics.record(stage, value=usage[key])
             
             # Parse response
-            response_text = response.content[0].text
-            narratives = self._parse_claude_response(response_text, feeds_to_process)
+            with metrics.stage('parse'):
+                if getattr(response, 'stop_reason', None) == 'max_tokens':
+                    print("⚠️  Response hit max_tokens; salvaging complete narratives")
+                data, repaired = response_parser.payload_from_response(response)
+                narratives = self._narratives_from_payload(data, repaired, feeds_to_process,
+                                                           metrics)
             
             print(f"✅ Extracted {len(narratives)} narratives")
             return narratives
@@ -282,29 +518,117 @@ class NarrativeExtractor:
         except Exception as e:
             print(f"❌ Error calling Claude API: {e}")
             return []
+
+    # ------------------------------------------------------------------
+    # Cascade triage
+    # ------------------------------------------------------------------
+
+    TRIAGE_SYSTEM_PROMPT = """You screen market intelligence feeds before a senior analyst sees them.
+
+Decide whether the feeds in the user message contain anything material for trading: new information that would create, change or invalidate a market narrative. Restated consensus, promotion, jokes and chatter are not material. If PREVIOUS NARRATIVES are given, only developments beyond them count.
+
+Then compress: pick the feeds that carry the material information (at most 25) and summarize each in one factual line, keeping tickers, numbers and names.
+
+OUTPUT FORMAT (strict JSON):
+{
+  "material": true,
+  "reason": "One sentence on why",
+  "evidence": [{"index": 3, "summary": "One-line fact from feed [3]"}]
+}
+
+Return ONLY valid JSON. Use the feed numbers as given."""
+
+    def _triage(self, feeds_text: str, previous: List[Narrative],
+                metrics: RunMetrics) -> Dict[str, Any]:
+        """
+        Small-model verdict on a packed window.
+
+        Returns:
+            TRIAGE_SCHEMA dict, or None if the triage failed — callers then
+            fall back to the full extraction
+        """
+        prior = "\n".join(f"- {n.title}: {n.hypothesis}" for n in previous) or "(none)"
+        try:
+            started = time.perf_counter()
+            response = get_governor().create(
+                self.client,
+                estimated_input_tokens=self.packer.estimate_tokens(feeds_text),
+                metrics=metrics,
+                model=self.triage_model,
+                max_tokens=Config.TRIAGE_MAX_TOKENS,
+                system=self.TRIAGE_SYSTEM_PROMPT,
+                messages=[{"role": "user",
+                           "content": f"PREVIOUS NARRATIVES:\n{prior}\n\nFEEDS:\n{feeds_text}"}],
+            )
+            metrics.record('api.triage', duration_ms=(time.perf_counter() - started) * 1000)
+            u = response.usage
+            metrics.record('tokens.triage_input', value=getattr(u, 'input_tokens', 0) or 0)
+            metrics.record('tokens.triage_output', value=getattr(u, 'output_tokens', 0) or 0)
+        except Exception as e:
+            print(f"⚠️  Triage call failed ({e}); running full extraction")
+            metrics.record('cascade.fallback', value=1)
+            return None
+
+        data, _ = response_parser.payload_from_response(response)
+        errors = response_parser.validate_triage(data) if data is not None else ['no JSON']
+        if errors:
+            print(f"⚠️  Unusable triage output ({errors[0]}); running full extraction")
+            metrics.record('cascade.fallback', value=1)
+            return None
+        print(f"🔎 Triage ({self.triage_model}): "
+              f"{'material' if data['material'] else 'quiet'}, "
+              f"{len(data['evidence'])} evidence item(s)")
+        return data
+
+    @staticmethod
+    def _evidence(triage: Dict[str, Any],
+                  feeds: List[FeedItem]) -> List[Tuple[FeedItem, str]]:
+        """(feed, one-line summary) pairs for the triage's evidence, in feed order."""
+        summaries: Dict[int, str] = {}
+        for item in triage['evidence']:
+            if 0 < item['index'] <= len(feeds):
+                summaries.setdefault(item['index'], item['summary'].strip())
+        return [(feeds[i - 1], summaries[i]) for i in sorted(summaries)]
+
+    @staticmethod
+    def _carry_forward(previous: List[Narrative]) -> List[Narrative]:
+        """Fresh copies of the last narratives for a window with nothing new."""
+        return [Narrative(title=n.title, entropy_risk=n.entropy_risk,
+                          hypothesis=n.hypothesis, rationale=n.rationale,
+                          catalysts=list(n.catalysts), supporting_feeds=[])
+                for n in previous]
+
+    @staticmethod
+    def _record_usage(usage: Dict[str, Any], response, latency_s: float):
+        """Copy token usage from a response (cache counts stay 0 while nothing is cached)."""
+        u = response.usage
+        usage['input_tokens'] = getattr(u, 'input_tokens', 0) or 0
+        usage['output_tokens'] = getattr(u, 'output_tokens', 0) or 0
+        usage['cache_creation_input_tokens'] = getattr(u, 'cache_creation_input_tokens', 0) or 0
+        usage['cache_read_input_tokens'] = getattr(u, 'cache_read_input_tokens', 0) or 0
+        usage['api_latency_ms'] = int(latency_s * 1000)
+        print(f"   🧾 Tokens: {usage['input_tokens']} in, "
+              f"{usage['output_tokens']} out, {usage['api_latency_ms']} ms")
     
-    def _format_feeds_for_prompt(self, feeds: List[FeedItem]) -> str:
-        """Format feeds into readable text for Claude"""
+    def _format_feeds_for_prompt(self, packed: List[Tuple[FeedItem, str]]) -> str:
+        """Format packed (feed, excerpt) pairs into readable text for Claude"""
         
         formatted = []
-        for i, feed in enumerate(feeds, 1):
+        for i, (feed, text) in enumerate(packed, 1):
             formatted.append(
                 f"[{i}] {feed.source.upper()} | {feed.author} | "
                 f"{feed.timestamp.strftime('%Y-%m-%d %H:%M')}\n"
-                f"{feed.content[:300]}...\n"
+                f"{text}\n"
             )
         
         return "\n".join(formatted)
-    
-    def _build_extraction_prompt(self, feeds_text: str) -> str:
-        """Build the prompt for Claude"""
-        
-        return f"""You are a portfolio manager with a physics PhD analyzing market intelligence feeds.
 
-Your task: Extract the top 3 market narratives from these feeds and generate actionable trade hypotheses.
+    # Static analysis instructions, sent as the system prompt. At ~450 tokens
+    # (~900 with the extraction tool) it is below the 1024-token minimum
+    # cacheable prefix, so it is not marked for prompt caching.
+    EXTRACTION_SYSTEM_PROMPT = """You are a portfolio manager with a physics PhD analyzing market intelligence feeds.
 
-FEEDS:
-{feeds_text}
+Your task: Extract the top 3 market narratives from the feeds in the user message and generate actionable trade hypotheses.
 
 ANALYSIS FRAMEWORK:
 1. Identify the 3 most significant narratives (themes repeated across multiple sources)
@@ -319,64 +643,106 @@ ANALYSIS FRAMEWORK:
 4. Use physics analogies where helpful (entropy, momentum, phase transitions, etc.)
 
 OUTPUT FORMAT (strict JSON):
-{{
+{
   "narratives": [
-    {{
+    {
       "title": "Narrative title (5-8 words)",
       "entropy_risk": 1-10,
       "hypothesis": "Specific trade idea (e.g., 'Long QQQ calls, short XLE')",
       "rationale": "Why this trade makes sense given the narrative (2-3 sentences)",
       "catalysts": ["Upcoming event 1", "Data release 2"],
       "supporting_feed_indices": [1, 3, 5]
-    }}
+    }
   ]
-}}
+}
 
 IMPORTANT: 
 - Return ONLY valid JSON, no markdown formatting
 - Include exactly 3 narratives
 - Be specific with trade ideas (not just "buy tech")
-- Entropy scoring should reflect information quality/consensus level"""
-    
-    def _parse_claude_response(self, response_text: str, feeds: List[FeedItem]) -> List[Narrative]:
-        """Parse Claude's JSON response into Narrative objects"""
-        
+- Entropy scoring should reflect information quality/consensus level
+- HISTORY, when present, lists similar earlier narratives (first→last seen, runs, risk):
+  treat a match as a continuing story and say what changed, not as a new one"""
+
+    def _history(self, window_text: str, metrics: RunMetrics) -> str:
+        """HISTORY lines for the stored narratives most similar to the window ('' if none)."""
+        if not Config.HISTORY_K:
+            return ''
+        import vector_index
+        if not vector_index.available():
+            return ''
+        started = time.perf_counter()
         try:
-            # Remove markdown code blocks if present
-            if response_text.strip().startswith('```'):
-                response_text = response_text.split('```')[1]
-                if response_text.startswith('json'):
-                    response_text = response_text[4:]
-            
-            data = json.loads(response_text.strip())
-            narratives = []
-            
-            for n in data.get('narratives', []):
-                # Map feed indices to feed IDs
-                supporting_feeds = [
-                    feeds[i-1].id for i in n.get('supporting_feed_indices', [])
-                    if 0 < i <= len(feeds)
-                ]
-                
-                narrative = Narrative(
-                    title=n['title'],
-                    entropy_risk=n['entropy_risk'],
-                    hypothesis=n['hypothesis'],
-                    rationale=n['rationale'],
-                    catalysts=n.get('catalysts', []),
-                    supporting_feeds=supporting_feeds
-                )
-                narratives.append(narrative)
-            
-            return narratives
-            
-        except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse Claude response as JSON: {e}")
-            print(f"Response was: {response_text[:500]}...")
-            return []
+            related = vector_index.get_index().related_narratives(window_text, Config.HISTORY_K)
         except Exception as e:
-            print(f"❌ Error parsing response: {e}")
+            print(f"⚠️  History retrieval failed: {e}")
+            return ''
+        metrics.record('format.history', duration_ms=(time.perf_counter() - started) * 1000,
+                       value=len(related))
+        return vector_index.format_history(related)
+    
+    def _build_extraction_request(self, feeds_text: str, history: str = '') -> Dict[str, Any]:
+        """
+        Build the system/messages arguments for messages.create.
+
+        The static framework is the system prompt; the variable history and
+        feed blocks follow it in the user turn. There is no cache_control
+        breakpoint: the tools plus system prompt come to well under the
+        1024-token minimum cacheable prefix, so a breakpoint would never
+        write or read the cache.
+        """
+        content = f"FEEDS:\n{feeds_text}"
+        if history:
+            content = f"HISTORY:\n{history}\n\n{content}"
+        request = {
+            "system": self.EXTRACTION_SYSTEM_PROMPT,
+            "messages": [
+                {"role": "user", "content": content}
+            ],
+        }
+        if Config.TOOL_OUTPUT:
+            request["tools"] = [response_parser.EXTRACTION_TOOL]
+            request["tool_choice"] = {"type": "tool", "name": response_parser.TOOL_NAME}
+        return request
+    
+    def _parse_claude_response(self, response_text: str, feeds: List[FeedItem]) -> List[Narrative]:
+        """Parse Claude's text response into Narrative objects"""
+        data, repaired = response_parser.parse_payload(response_text)
+        return self._narratives_from_payload(data, repaired, feeds)
+
+    def _narratives_from_payload(self, data: Any, repaired: bool, feeds: List[FeedItem],
+                                 metrics: RunMetrics = None) -> List[Narrative]:
+        """Build Narratives from a parsed payload, keeping every valid one."""
+        metrics = metrics or RunMetrics()
+        if data is None:
+            print("❌ No JSON object found in Claude response")
+            metrics.record('parse.failed', value=1)
             return []
+        if repaired:
+            print("   🩹 Repaired malformed/truncated JSON")
+            metrics.record('parse.repaired', value=1)
+
+        valid, errors = response_parser.valid_narratives(data)
+        if errors:
+            print(f"   ⚠️  Dropped {len(errors)} invalid narrative(s): {' | '.join(errors[:3])}")
+            metrics.record('parse.dropped', value=len(errors))
+
+        narratives = []
+        for n in valid:
+            # Map feed indices to feed IDs
+            supporting_feeds = [
+                feeds[i-1].id for i in n.get('supporting_feed_indices', [])
+                if 0 < i <= len(feeds)
+            ]
+            narratives.append(Narrative(
+                title=n['title'],
+                entropy_risk=n['entropy_risk'],
+                hypothesis=n['hypothesis'],
+                rationale=n['rationale'],
+                catalysts=n.get('catalysts', []),
+                supporting_feeds=supporting_feeds
+            ))
+        return narratives
 
 
 # ============================================================================
@@ -391,6 +757,9 @@ class GitHubPagesPublisher:
     BRANCH    = "main"
     DOCS_PATH = "docs"
     BASE_URL  = "https://tazeemc.github.io/Redhood-Systems"
+    API_URL   = "https://api.github.com"
+
+    _published_assets: set = set()   # shared stylesheets known to be on Pages
 
     def __init__(self, token: str):
         self._headers = {
@@ -401,7 +770,9 @@ class GitHubPagesPublisher:
 
     def _get_sha(self, path: str):
         """Return current blob SHA for a file (needed to update existing files)."""
-        url = (f"https://api.github.com/repos/{self.OWNER}/{self.REPO}"
+        import urllib.request
+        import urllib.error
+        url = (f"{self.API_URL}/repos/{self.OWNER}/{self.REPO}"
                f"/contents/{path}?ref={self.BRANCH}")
         req = urllib.request.Request(url, headers=self._headers)
         try:
@@ -414,7 +785,8 @@ class GitHubPagesPublisher:
 
     def _put_file(self, path: str, content: str, message: str, sha=None):
         """Create or update a file via the GitHub Contents API."""
-        url = (f"https://api.github.com/repos/{self.OWNER}/{self.REPO}"
+        import urllib.request
+        url = (f"{self.API_URL}/repos/{self.OWNER}/{self.REPO}"
                f"/contents/{path}")
         body: Dict[str, Any] = {
             "message": message,
@@ -432,27 +804,40 @@ class GitHubPagesPublisher:
         with urllib.request.urlopen(req, timeout=20) as r:
             return json.loads(r.read())
 
-    def publish(self, html_path: str) -> str:
+    def publish(self, html_path: str, update_latest: bool = True) -> str:
         """
         Push html_path to docs/ on GitHub Pages.
 
         Publishes two files:
           - docs/redhood_reads_TIMESTAMP.html  (permanent archive URL)
-          - docs/latest.html                   (stable link, always current)
+          - docs/latest.html                   (stable link, always current;
+                                                skipped if update_latest=False)
 
-        Returns the permanent archive URL.
+        Slim reports also need their shared stylesheet, which is uploaded
+        once per version. Returns the permanent archive URL.
         """
         filename = os.path.basename(html_path)
         with open(html_path, "r", encoding="utf-8") as f:
             html = f.read()
-        ts  = datetime.now().strftime("%Y-%m-%d %H:%M UTC")
+        ts  = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
         msg = f"Auto-publish RedHood Reads {ts}"
 
+        stylesheet = report_assets.stylesheet_href(html)
+        if stylesheet and stylesheet not in self._published_assets:
+            # Content-hashed, so an existing copy is already the right one
+            css_path = f"{self.DOCS_PATH}/{stylesheet}"
+            if self._get_sha(css_path) is None:
+                with open(os.path.join(os.path.dirname(html_path), stylesheet),
+                          "r", encoding="utf-8") as f:
+                    self._put_file(css_path, f.read(), f"Add stylesheet {stylesheet}")
+            self._published_assets.add(stylesheet)
+
         archive_path = f"{self.DOCS_PATH}/{filename}"
         self._put_file(archive_path, html, msg, self._get_sha(archive_path))
 
-        latest_path = f"{self.DOCS_PATH}/latest.html"
-        self._put_file(latest_path, html, f"Update latest {ts}", self._get_sha(latest_path))
+        if update_latest:
+            latest_path = f"{self.DOCS_PATH}/latest.html"
+            self._put_file(latest_path, html, f"Update latest {ts}", self._get_sha(latest_path))
 
         return f"{self.BASE_URL}/{filename}"
 
@@ -466,8 +851,9 @@ class RedHoodAggregator:
     
     def __init__(self):
         self.config = Config()
-        init_schema()  # ensure all tables exist (runs, feeds, narratives, etc.)
-        init_db()      # seed default twitter accounts if not present
+        # One PRAGMA check when current; otherwise applies the schema
+        # (runs, feeds, narratives, etc.) and seeds default accounts
+        init_db()
 
         # Initialize scrapers
         self.rss_scraper = RSSFeedScraper()
@@ -475,6 +861,8 @@ class RedHoodAggregator:
         
         # Initialize AI engine
         self.ai_engine = NarrativeExtractor(self.config.ANTHROPIC_API_KEY)
+        self.thread_tracker = ThreadTracker()
+        self.poll_scheduler = PollScheduler(self.config.POLL_FRESHNESS_SLO_MINUTES)
         
         # Ensure output directory exists
         os.makedirs(self.config.OUTPUT_DIR, exist_ok=True)
@@ -492,74 +880,508 @@ class RedHoodAggregator:
         print("=" * 60)
         print(f"📅 Fetching feeds from last {hours_back} hours...\n")
         
-        # Fetch from all sources
+        metrics = self._new_metrics()
+        all_feeds = self._collect(hours_back, metrics)
+        if not all_feeds:
+            print("⚠️  No feeds found. Check your API keys and feed URLs.")
+            return {'feeds': [], 'narratives': []}
+        
+        # Extract narratives using AI
+        print("🧠 AI Analysis Phase...\n")
+        narratives, usage = self._extract(all_feeds, metrics, hours_back)
+        
+        return self._report(all_feeds, narratives, usage, hours_back, metrics=metrics)
+
+    def run_multi(self, windows: List[float]) -> Dict[float, Dict[str, Any]]:
+        """
+        Scrape once for the widest window, then analyze several windows.
+
+        The collected feeds are sliced in memory into each ``hours_back``
+        window, extraction runs concurrently across windows, and every
+        window is persisted as a sibling ``runs`` row sharing a batch_id.
+
+        Returns:
+            Dictionary of hours_back -> results (as returned by run())
+        """
+        windows = sorted(set(windows), reverse=True)
+        widest = windows[0]
+
+        print("=" * 60)
+        print("🔥 REDHOOD INSIGHTS - Feed Aggregator (multi-window)")
+        print("=" * 60)
+        print(f"📅 Windows: {', '.join(self._window_suffix(h) for h in windows)} "
+              f"— fetching last {widest} hours once...\n")
+
+        collected_at = datetime.utcnow()
+        # Collection is profiled into the widest window's artifact
+        widest_profiler = StageProfiler() if self.config.PROFILE else None
+        collect_metrics = RunMetrics(profiler=widest_profiler)
+        all_feeds = self._collect(widest, collect_metrics)
+        if not all_feeds:
+            print("⚠️  No feeds found. Check your API keys and feed URLs.")
+            return {h: {'feeds': [], 'narratives': []} for h in windows}
+
+        # all_feeds is newest-first, so each window is a prefix
+        slices = {
+            h: [f for f in all_feeds if f.timestamp >= collected_at - timedelta(hours=h)]
+            for h in windows
+        }
+        for h in windows:
+            print(f"   🪟 {self._window_suffix(h):>6}: {len(slices[h])} feeds")
+
+        # Shared collection cost is attributed to the widest window's run
+        window_metrics = {h: self._new_metrics() for h in windows}
+        window_metrics[widest] = RunMetrics(profiler=widest_profiler)
+        window_metrics[widest].extend(collect_metrics)
+
+        print("\n🧠 AI Analysis Phase (concurrent per window)...\n")
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(windows)) as pool:
+            futures = {h: pool.submit(self._extract, slices[h], window_metrics[h], h)
+                       for h in windows if slices[h]}
+            extracted = {h: future.result() for h, future in futures.items()}
+
+        batch_id = collected_at.strftime('%Y%m%d_%H%M%S')
+        with window_metrics[widest].stage('render.ticker'):
+            ticker_html = self._fetch_ticker_prices()  # one quote fetch for every report
+        narrowest = windows[-1]
+        results = {}
+        # Widest first so shared feed rows are attributed to the widest run
+        for h in windows:
+            if h not in extracted:
+                print(f"\n⚠️  No feeds in the {self._window_suffix(h)} window, skipping.")
+                results[h] = {'feeds': [], 'narratives': []}
+                continue
+            narratives, usage = extracted[h]
+            print(f"\n🪟 Window {self._window_suffix(h)}")
+            results[h] = self._report(slices[h], narratives, usage, h,
+                                      batch_id=batch_id,
+                                      suffix=self._window_suffix(h),
+                                      update_latest=(h == narrowest),
+                                      ticker_html=ticker_html,
+                                      metrics=window_metrics[h])
+        return results
+
+    def run_categories(self, hours_back: float,
+                       categories: List[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Scrape once, then analyze each account category as its own desk.
+
+        The collected feeds are partitioned by category (see _shard_feeds),
+        extraction runs concurrently across shards, and every shard is
+        persisted as a sibling ``runs`` row with its category and a shared
+        batch_id.
+
+        Args:
+            categories: Desks to report on (default: every non-empty shard)
+
+        Returns:
+            Dictionary of category -> results (as returned by run())
+        """
+        print("=" * 60)
+        print("🔥 REDHOOD INSIGHTS - Feed Aggregator (category shards)")
+        print("=" * 60)
+        print(f"📅 Fetching feeds from last {hours_back} hours once...\n")
+
+        collected_at = datetime.utcnow()
+        # Collection is profiled into the largest shard's artifact
+        shared_profiler = StageProfiler() if self.config.PROFILE else None
+        collect_metrics = RunMetrics(profiler=shared_profiler)
+        # An explicit subset scrapes only its own accounts and feeds, so the
+        # poll scheduler never marks an account polled whose tweets are dropped
+        all_feeds = self._collect(hours_back, collect_metrics, categories)
+        shards = self._shard_feeds(all_feeds)
+        if categories:
+            shards = {c: shards.get(c, []) for c in categories}
+        if not any(shards.values()):
+            print("⚠️  No feeds found. Check your API keys and feed URLs.")
+            return {c: {'feeds': [], 'narratives': []} for c in shards}
+
+        # Largest first so shared feed rows and collection cost go to one run
+        names = sorted(shards, key=lambda c: (-len(shards[c]), c))
+        for c in names:
+            print(f"   🗂️  {c:>8}: {len(shards[c])} feeds")
+
+        shard_metrics = {c: self._new_metrics() for c in names}
+        shard_metrics[names[0]] = RunMetrics(profiler=shared_profiler)
+        shard_metrics[names[0]].extend(collect_metrics)
+
+        print("\n🧠 AI Analysis Phase (concurrent per category)...\n")
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            futures = {c: pool.submit(self._extract, shards[c], shard_metrics[c],
+                                      hours_back, c)
+                       for c in names if shards[c]}
+            extracted = {c: future.result() for c, future in futures.items()}
+
+        batch_id = collected_at.strftime('%Y%m%d_%H%M%S')
+        with shard_metrics[names[0]].stage('render.ticker'):
+            ticker_html = self._fetch_ticker_prices()  # one quote fetch for every report
+        results = {}
+        for c in names:
+            if c not in extracted:
+                print(f"\n⚠️  No {c} feeds in this window, skipping.")
+                results[c] = {'feeds': [], 'narratives': []}
+                continue
+            narratives, usage = extracted[c]
+            print(f"\n🗂️  Category {c}")
+            # latest.html stays the all-desk report
+            results[c] = self._report(shards[c], narratives, usage, hours_back,
+                                      batch_id=batch_id, suffix=c,
+                                      update_latest=False, ticker_html=ticker_html,
+                                      metrics=shard_metrics[c], category=c)
+        return results
+
+    def _shard_feeds(self, feeds: List[FeedItem]) -> Dict[str, List[FeedItem]]:
+        """Partition feeds by category, keeping each shard newest-first."""
+        account_categories = get_account_categories()
+        shards: Dict[str, List[FeedItem]] = {}
+        for feed in feeds:
+            if feed.source == 'twitter':
+                category = account_categories.get(feed.author.lstrip('@'))
+            else:
+                category = self.config.SUBSTACK_FEED_CATEGORIES.get(feed.metadata.get('feed_url'))
+            shards.setdefault(category or self.config.UNCATEGORIZED, []).append(feed)
+        return shards
+
+    def _collect(self, hours_back: float, metrics: RunMetrics,
+                 categories: List[str] = None) -> List[FeedItem]:
+        """
+        Fetch from all sources; returns feeds sorted most recent first.
+
+        With categories, only accounts and RSS feeds in those categories
+        (see _shard_feeds) are fetched.
+        """
+        if self.config.DISTRIBUTED_SCRAPE:
+            return self._collect_distributed(hours_back, metrics, categories)
         all_feeds = []
         
         print("📰 Fetching RSS feeds...")
-        rss_feeds = self.rss_scraper.fetch(self.config.SUBSTACK_FEEDS, hours_back)
+        with metrics.stage('collect', label='rss'):
+            rss_feeds = self.rss_scraper.fetch(self._rss_feeds(categories), hours_back, metrics)
         all_feeds.extend(rss_feeds)
         print(f"   ✅ Found {len(rss_feeds)} RSS items\n")
         
         print("🐦 Fetching Twitter feeds...")
-        accounts = get_active_handles() or self.config.TWITTER_ACCOUNTS
-        print(f"   📋 Active accounts from DB: {', '.join('@' + a for a in accounts)}")
-        twitter_feeds = self.twitter_scraper.fetch(accounts, hours_back)
-        all_feeds.extend(twitter_feeds)
-        print(f"   ✅ Found {len(twitter_feeds)} tweets\n")
+        due, skipped = self._plan_accounts(hours_back, categories)
+        status: Dict[str, bool] = {}
+        with metrics.stage('collect', label='twitter'):
+            twitter_feeds = self.twitter_scraper.fetch(due, hours_back, metrics, status=status)
+        self._record_polls(status, twitter_feeds, hours_back)
+        stored = self._stored_tweets(skipped, hours_back)
+        all_feeds.extend(twitter_feeds + stored)
+        metrics.record('collect.polled', value=len(due))
+        metrics.record('collect.skipped', value=len(skipped))
+        print(f"   ✅ Found {len(twitter_feeds)} tweets"
+              + (f" (+{len(stored)} stored from skipped accounts)" if skipped else "") + "\n")
 
         print(f"📊 Total feeds collected: {len(all_feeds)}\n")
-        
-        if not all_feeds:
-            print("⚠️  No feeds found. Check your API keys and feed URLs.")
-            return {'feeds': [], 'narratives': []}
+        metrics.record('collect.feeds', value=len(all_feeds))
         
         # Sort by timestamp (most recent first)
         all_feeds.sort(key=lambda x: x.timestamp, reverse=True)
-        
-        # Extract narratives using AI
-        print("🧠 AI Analysis Phase...\n")
+        return all_feeds
+
+    def _rss_feeds(self, categories: List[str] = None) -> List[str]:
+        """Substack feed URLs, limited to categories when given."""
+        if not categories:
+            return self.config.SUBSTACK_FEEDS
+        return [url for url in self.config.SUBSTACK_FEEDS
+                if (self.config.SUBSTACK_FEED_CATEGORIES.get(url)
+                    or self.config.UNCATEGORIZED) in categories]
+
+    def _plan_accounts(self, hours_back: float,
+                       categories: List[str] = None) -> Tuple[List[str], List[str]]:
+        """Active handles (in categories, if given) split into (due, skipped) by the poll scheduler."""
+        accounts = get_active_handles() or self.config.TWITTER_ACCOUNTS
+        if categories:
+            account_categories = get_account_categories()
+            accounts = [a for a in accounts
+                        if (account_categories.get(a) or self.config.UNCATEGORIZED) in categories]
+        print(f"   📋 Active accounts from DB: {', '.join('@' + a for a in accounts)}")
+        if not self.config.ADAPTIVE_POLLING:
+            return accounts, []
+        due, skipped = self.poll_scheduler.plan(accounts, window_s=hours_back * 3600)
+        if skipped:
+            print(f"   ⏭️  Not due this run: {', '.join('@' + a for a in skipped)}")
+        return due, skipped
+
+    def _record_polls(self, status: Dict[str, bool], twitter_feeds: List[FeedItem],
+                      hours_back: float):
+        """Feed poll outcomes and newest item times back to the scheduler."""
+        if not self.config.ADAPTIVE_POLLING:
+            return
+        newest: Dict[str, int] = {}
+        for feed in twitter_feeds:
+            handle = feed.author.lstrip('@')
+            newest[handle] = max(newest.get(handle, 0), to_epoch(feed.timestamp))
+        self.poll_scheduler.record(status, newest, window_s=hours_back * 3600)
+
+    def _collect_distributed(self, hours_back: float, metrics: RunMetrics,
+                             categories: List[str] = None) -> List[FeedItem]:
+        """
+        _collect via the scrape work queue: one job per RSS feed and due
+        account, fetched by worker processes (python work_queue.py).
+        """
+        queue = work_queue.get_queue()
+        window_id = f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        due, skipped = self._plan_accounts(hours_back, categories)
+        instances = self.config.NITTER_INSTANCES
+        jobs = [{'kind': 'rss', 'target': url, 'hours_back': hours_back}
+                for url in self._rss_feeds(categories)]
+        # Rotate the mirror order per account so first attempts spread out
+        jobs += [{'kind': 'nitter', 'target': handle, 'hours_back': hours_back,
+                  'instances': instances[i % len(instances):] + instances[:i % len(instances)]}
+                 for i, handle in enumerate(due)]
+        queue.enqueue(window_id, jobs)
+        print(f"📤 Queued {len(jobs)} scrape job(s) as window {window_id}; waiting for workers...")
+
+        with metrics.stage('collect', label='queue'):
+            deadline = time.monotonic() + self.config.SCRAPE_WINDOW_TIMEOUT_S
+            counts = queue.window_status(window_id)
+            while counts.get('pending', 0) + counts.get('leased', 0) > 0:
+                if time.monotonic() > deadline:
+                    cancelled = queue.cancel(window_id)
+                    print(f"   ⚠️  Timed out; cancelled {cancelled} unfinished job(s)")
+                    break
+                time.sleep(work_queue.IDLE_POLL_S)
+                counts = queue.window_status(window_id)
+
+        status: Dict[str, bool] = {}
+        for job in queue.finished_jobs(window_id):
+            label = job['target'] if job['kind'] == 'rss' else f"{job['target']}@{job['instance']}"
+            metrics.record(f"collect.{job['kind']}", duration_ms=job['duration_ms'], label=label)
+            if job['kind'] == 'nitter' and job['status'] != 'cancelled':
+                status[job['target']] = job['status'] == 'done'
+                if job['status'] == 'failed':
+                    print(f"⚠️  Could not fetch @{job['target']}: {job['error']}")
+        feeds = [FeedItem.from_dict(d) for d in queue.results(window_id)]
+        queue.purge(window_id)
+
+        twitter_feeds = [f for f in feeds if f.source == 'twitter']
+        self._record_polls(status, twitter_feeds, hours_back)
+        stored = self._stored_tweets(skipped, hours_back)
+        all_feeds = feeds + stored
+        metrics.record('collect.polled', value=len(due))
+        metrics.record('collect.skipped', value=len(skipped))
+        print(f"   ✅ Workers returned {len(feeds) - len(twitter_feeds)} RSS items and "
+              f"{len(twitter_feeds)} tweets"
+              + (f" (+{len(stored)} stored from skipped accounts)" if skipped else "") + "\n")
+
+        print(f"📊 Total feeds collected: {len(all_feeds)}\n")
+        metrics.record('collect.feeds', value=len(all_feeds))
+        all_feeds.sort(key=lambda x: x.timestamp, reverse=True)
+        return all_feeds
+
+    @staticmethod
+    def _stored_tweets(handles: List[str], hours_back: float) -> List[FeedItem]:
+        """Window's already-persisted tweets for handles not polled this run."""
+        if not handles:
+            return []
+        since = to_epoch(datetime.utcnow() - timedelta(hours=hours_back))
+        placeholders = ','.join('?' * len(handles))
+        with connection() as conn:
+            rows = conn.execute(
+                f"""SELECT source, author, content, clean_text, published_at, url, nitter_instance
+                    FROM feeds
+                    WHERE source = 'twitter' AND published_epoch >= ?
+                      AND author IN ({placeholders})""",
+                [since] + ['@' + h for h in handles]
+            ).fetchall()
+        return [
+            FeedItem(source=r['source'], author=r['author'], content=r['content'],
+                     timestamp=datetime.fromisoformat(r['published_at']), url=r['url'],
+                     metadata={'nitter_instance': r['nitter_instance']},
+                     clean_text=r['clean_text'])
+            for r in rows
+        ]
+
+    def _extract(self, feeds: List[FeedItem], metrics: RunMetrics,
+                 hours_back: float = None,
+                 category: str = None) -> Tuple[List[Narrative], Dict[str, Any]]:
+        """Run narrative extraction; returns (narratives, token usage)."""
+        usage: Dict[str, Any] = {}
+        previous = None
+        if self.config.CASCADE_MODE and hours_back is not None:
+            previous = self._previous_narratives(hours_back, category)
         narratives = self.ai_engine.extract_narratives(
-            all_feeds,
-            max_feeds=self.config.MAX_FEEDS_TO_PROCESS
+            feeds,
+            max_feeds=self.config.MAX_FEEDS_TO_PROCESS,
+            usage=usage,
+            metrics=metrics,
+            previous=previous
         )
-        
-        # Save results
+        return narratives, usage
+
+    @staticmethod
+    def _previous_narratives(hours_back: float, category: str = None) -> List[Narrative]:
+        """Narratives of the latest run over the same window and category that produced any."""
+        try:
+            with connection(DB_PATH) as conn:
+                rows = conn.execute(
+                    """SELECT title, entropy_risk, hypothesis, rationale, catalysts
+                       FROM narratives
+                       WHERE run_id = (SELECT MAX(n.run_id) FROM narratives n
+                                       JOIN runs r ON r.id = n.run_id
+                                       WHERE r.hours_back = ? AND r.category IS ?)
+                       ORDER BY created_epoch, id""",
+                    (hours_back, category)
+                ).fetchall()
+        except Exception as e:
+            print(f"⚠️  Could not load previous narratives: {e}")
+            return []
+        return [Narrative(title=r['title'], entropy_risk=r['entropy_risk'],
+                          hypothesis=r['hypothesis'], rationale=r['rationale'],
+                          catalysts=json.loads(r['catalysts']), supporting_feeds=[])
+                for r in rows]
+
+    def _report(self, all_feeds: List[FeedItem], narratives: List[Narrative],
+                usage: Dict[str, Any], hours_back: float, batch_id: str = None,
+                suffix: str = '', update_latest: bool = True,
+                ticker_html: str = None, metrics: RunMetrics = None,
+                category: str = None) -> Dict[str, Any]:
+        """Save, persist, publish and summarize one window's results."""
+        metrics = metrics or RunMetrics()
+
+        # Link to prior runs before rendering so the report shows real history
+        with metrics.stage('threads'):
+            self.thread_tracker.assign(narratives, batch_id)
+
+        book = None
+        if self.config.RISK_SIZING and narratives:
+            import risk
+            if risk.available():
+                with metrics.stage('risk'):
+                    book = self._size_positions(narratives, batch_id)
+
         results = {
             'timestamp': datetime.now().isoformat(),
+            'hours_back': hours_back,
             'feeds': [f.to_dict() for f in all_feeds],
-            'narratives': [n.to_dict() for n in narratives]
+            'narratives': [n.to_dict() for n in narratives],
+            'usage': usage
         }
+        if category:
+            results['category'] = category
+        chatter = sorted(({'symbol': sym, **h} for sym, h in symbol_heat(all_feeds).items()),
+                         key=lambda c: -c['zscore'])[:5]
+        if chatter:
+            results['chatter'] = chatter
+        if book:
+            results['risk'] = book
         
-        json_path, html_path = self._save_results(results, narratives, hours_back)
-        self._persist_to_db(hours_back, all_feeds, narratives, json_path, html_path)
+        json_path, html_path = self._save_results(results, narratives, hours_back,
+                                                  suffix=suffix, ticker_html=ticker_html,
+                                                  metrics=metrics)
+        with metrics.stage('persist'):
+            run_id = self._persist_to_db(hours_back, all_feeds, narratives, json_path,
+                                         html_path, usage, batch_id=batch_id,
+                                         category=category)
 
         github_token = os.getenv("GITHUB_TOKEN")
         if github_token:
             try:
-                pub_url = GitHubPagesPublisher(github_token).publish(html_path)
+                with metrics.stage('publish'):
+                    pub_url = GitHubPagesPublisher(github_token).publish(
+                        html_path, update_latest=update_latest)
                 print(f"\n🌐 [GitHub Pages] Published:  {pub_url}")
-                print(f"🌐 [GitHub Pages] Latest URL: {GitHubPagesPublisher.BASE_URL}/latest.html")
+                if update_latest:
+                    print(f"🌐 [GitHub Pages] Latest URL: {GitHubPagesPublisher.BASE_URL}/latest.html")
             except Exception as e:
                 print(f"\n⚠️  [GitHub Pages] Publish failed: {e}")
 
+        if run_id is not None and self.config.HISTORY_K:
+            import vector_index
+            if vector_index.available():
+                with metrics.stage('index'):
+                    self._index_run(all_feeds, narratives)
+
+        if run_id is not None:
+            metrics.persist(run_id)
+            if self.config.METRICS_EXPORT:
+                metrics.export(self.config.METRICS_EXPORT, self.config.OUTPUT_DIR, run_id)
+        if metrics.profiler is not None:
+            metrics.profiler.write(json_path)
+
         self._print_summary(narratives)
 
         return results
+
+    def _new_metrics(self) -> RunMetrics:
+        """Metrics collector for one run, profiling its stages under --profile."""
+        return RunMetrics(profiler=StageProfiler() if self.config.PROFILE else None)
+
+    def _size_positions(self, narratives: List[Narrative], batch_id: str = None) -> Dict[str, Any]:
+        """
+        Open/extend the narratives' trades as hypothetical positions and set
+        each narrative's sizing from the book's heat. Sibling windows/shards
+        pass their shared batch_id so one trade idea is held once. Writes the
+        book summary to risk_latest.json for run.ps1. Returns the summary, or None.
+        """
+        import risk
+        try:
+            book = risk.RiskBook(equity=Config.RISK_EQUITY, max_heat=Config.MAX_HEAT)
+            summary = book.update(narratives, batch_id)
+        except Exception as e:
+            print(f"⚠️  Position sizing failed: {e}")
+            return None
+        for n in narratives:
+            n.sizing = summary['sizing'].get(n.id, [])
+        del summary['sizing']
+        os.makedirs(Config.OUTPUT_DIR, exist_ok=True)
+        path = os.path.join(Config.OUTPUT_DIR, 'risk_latest.json')
+        with open(f"{path}.{os.getpid()}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'updated_at': datetime.utcnow().isoformat() + 'Z', **summary}, f, indent=2)
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+        print(f"🎯 Portfolio heat {summary['heat']:.2f}% of {summary['max_heat']:g}% "
+              f"({summary['positions']} open leg(s), was {summary['heat_before']:.2f}%)")
+        return summary
+
+    @staticmethod
+    def _index_run(feeds: List[FeedItem], narratives: List[Narrative]):
+        """Add the run's narratives and feeds to the vector index."""
+        import vector_index
+        try:
+            index = vector_index.get_index()
+            index.add('narrative', [
+                (n.id, vector_index.narrative_text(n.title, n.hypothesis, n.rationale),
+                 to_epoch(n.date))
+                for n in narratives])
+            index.add('feed', [(f.id, f.clean_text or f.content, to_epoch(f.timestamp))
+                               for f in feeds])
+        except Exception as e:
+            print(f"⚠️  Vector indexing failed: {e}")
+
+    @staticmethod
+    def _window_suffix(hours_back: float) -> str:
+        """Short window label for filenames, e.g. '10m', '1h', '24h'."""
+        if hours_back < 1:
+            return f"{int(round(hours_back * 60))}m"
+        return f"{hours_back:g}h"
     
     def _save_results(self, results: Dict[str, Any],
-                      narratives: List[Narrative], hours_back: float):
+                      narratives: List[Narrative], hours_back: float,
+                      suffix: str = '', ticker_html: str = None,
+                      metrics: RunMetrics = None):
         """Save results to JSON and HTML report. Returns (json_path, html_path)."""
+        metrics = metrics or RunMetrics()
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        name = f'{timestamp}_{suffix}' if suffix else timestamp
 
         json_path = os.path.join(self.config.OUTPUT_DIR,
-                                 f'redhood_insights_{timestamp}.json')
+                                 f'redhood_insights_{name}.json')
         with open(json_path, 'w', encoding='utf-8') as f:
             json.dump(results, f, indent=2)
         print(f"\n💾 Results saved to: {json_path}")
 
         html_path = os.path.join(self.config.OUTPUT_DIR,
-                                 f'redhood_reads_{timestamp}.html')
-        self._save_html_report(results, narratives, html_path, timestamp, hours_back)
+                                 f'redhood_reads_{name}.html')
+        if ticker_html is None:
+            with metrics.stage('render.ticker'):
+                ticker_html = self._fetch_ticker_prices()
+        with metrics.stage('render'):
+            self._save_html_report(results, narratives, html_path, timestamp, hours_back,
+                                   ticker_html=ticker_html)
         print(f"📰 Report saved to:   {html_path}")
 
         return json_path, html_path
@@ -567,6 +1389,7 @@ class RedHoodAggregator:
     @staticmethod
     def _fetch_ticker_prices() -> str:
         """Fetch live prices from Yahoo Finance and return ticker tape HTML (doubled for loop)."""
+        import urllib.request
         TICKERS = [
             ('BTC/USD',  'BTC-USD',   '{:,.0f}',  '$'),
             ('S&P 500',  '^GSPC',     '{:,.0f}',  ''),
@@ -579,7 +1402,7 @@ class RedHoodAggregator:
         items = []
         for label, symbol, fmt, prefix in TICKERS:
             try:
-                url = (f'https://query1.finance.yahoo.com/v8/finance/chart/'
+                url = (f'{Config.YAHOO_CHART_URL}'
                        f'{urllib.request.quote(symbol)}?interval=1d&range=2d')
                 req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
                 with urllib.request.urlopen(req, timeout=5) as resp:
@@ -608,8 +1431,39 @@ class RedHoodAggregator:
         tape = '\n    '.join(items)
         return tape + '\n    ' + tape  # duplicate for seamless loop
 
+    @staticmethod
+    def _placeholder_ticker() -> str:
+        """Ticker tape without live quotes, for offline re-renders."""
+        labels = ['BTC/USD', 'S&P 500', 'WTI', 'GOLD', 'VIX', '10YR UST', 'USD/CAD']
+        tape = '\n    '.join(
+            f'<span class="tick-item"><span class="tick-sym">{label}</span>'
+            f'<span class="tick-val">—</span></span>'
+            for label in labels
+        )
+        return tape + '\n    ' + tape
+
+    def rerender(self, json_path: str, out_path: str = None,
+                 hours_back: float = None, live_ticker: bool = False) -> str:
+        """
+        Rebuild the RedHood Reads HTML from a saved results JSON, without
+        scraping or calling Claude. Returns the HTML path.
+        """
+        with open(json_path, 'r', encoding='utf-8') as f:
+            results = json.load(f)
+        narratives = [Narrative.from_dict(d) for d in results.get('narratives', [])]
+        hours_back = hours_back or results.get('hours_back') or round(10/60, 4)
+        timestamp = datetime.fromisoformat(results['timestamp']).strftime('%Y%m%d_%H%M%S')
+        out_path = out_path or os.path.splitext(json_path)[0].replace(
+            'redhood_insights_', 'redhood_reads_') + '.html'
+        ticker_html = None if live_ticker else self._placeholder_ticker()
+        self._save_html_report(results, narratives, out_path, timestamp, hours_back,
+                               ticker_html=ticker_html)
+        print(f"📰 Report re-rendered to: {out_path}")
+        return out_path
+
     def _save_html_report(self, results: Dict[str, Any], narratives: List[Narrative],
-                          filepath: str, timestamp: str, hours_back: float):
+                          filepath: str, timestamp: str, hours_back: float,
+                          ticker_html: str = None):
         """Generate styled RedHood Reads HTML report from run data."""
         import html as H
 
@@ -623,6 +1477,8 @@ class RedHoodAggregator:
         feed_count = len(twitter_feeds)
         window_label = (f"{int(hours_back * 60)}m window"
                         if hours_back < 1 else f"{hours_back:.1f}h window")
+        if results.get('category'):
+            window_label = f"{H.escape(results['category'])} desk &middot; {window_label}"
 
         narrs = list(narratives[:3]) + [None] * max(0, 3 - len(narratives))
         top = narrs[0]
@@ -636,8 +1492,14 @@ class RedHoodAggregator:
         def dclass(s):
             return 'dn' if s >= 8 else 'neutral' if s >= 5 else 'up'
 
-        def sparkline(entropy):
-            if entropy >= 8:
+        def sparkline(narr):
+            entropy = narr.entropy_risk
+            history = narr.entropy_history
+            if len(history) >= 2:
+                # Real entropy history of the narrative thread, oldest first
+                bars = [(e * 10, 'lo' if e >= 8 else 'mid-hi' if e >= 5 else 'hi')
+                        for e in history]
+            elif entropy >= 8:
                 bars = [(20,'lo'),(45,'lo'),(30,'lo'),(80,'hi'),(55,'mid-hi'),(90,'hi'),(100,'hi')]
             elif entropy >= 5:
                 bars = [(60,'mid-hi'),(45,'lo'),(70,'mid-hi'),(55,'mid-hi'),(80,'hi'),(65,'mid-hi'),(75,'hi')]
@@ -659,7 +1521,7 @@ class RedHoodAggregator:
                     f'<div class="col-tag">{tag}</div>'
                     f'<div class="col-title">{title}</div>'
                     f'<div class="col-body">{body}</div>'
-                    f'{sparkline(narr.entropy_risk)}</div>')
+                    f'{sparkline(narr)}</div>')
 
         # Metrics: feeds + 3 narrative entropy scores + narrative count
         metric_blocks = []
@@ -680,11 +1542,21 @@ class RedHoodAggregator:
                     f'<div class="metric-delta {dclass(narr.entropy_risk)}">'
                     f'{elabel(narr.entropy_risk)} entropy</div></div>'
                 )
-        metric_blocks.append(
-            f'<div class="metric"><div class="metric-label">Narratives</div>'
-            f'<div class="metric-val">{len(narratives)}</div>'
-            f'<div class="metric-delta neutral">Extracted</div></div>'
-        )
+        chatter = results.get('chatter') or []
+        if chatter and chatter[0]['zscore'] >= Config.CHATTER_SPIKE_Z:
+            spike = chatter[0]
+            metric_blocks.append(
+                f'<div class="metric"><div class="metric-label">Chatter Spike</div>'
+                f'<div class="metric-val">${H.escape(spike["symbol"])}</div>'
+                f'<div class="metric-delta dn">z {spike["zscore"]:+.1f} &middot; '
+                f'{spike["rate"]:g}/h</div></div>'
+            )
+        else:
+            metric_blocks.append(
+                f'<div class="metric"><div class="metric-label">Narratives</div>'
+                f'<div class="metric-val">{len(narratives)}</div>'
+                f'<div class="metric-delta neutral">Extracted</div></div>'
+            )
         metrics_html = '\n'.join(metric_blocks[:5])
 
         headline = H.escape(top.title) if top else 'Market Intelligence Brief'
@@ -701,7 +1573,8 @@ class RedHoodAggregator:
             for f in twitter_feeds
         )
 
-        ticker_html = self._fetch_ticker_prices()
+        if ticker_html is None:
+            ticker_html = self._fetch_ticker_prices()
 
         # Build HTML using string replacement to avoid f-string brace conflicts with CSS
         tpl = self._html_report_template()
@@ -720,8 +1593,12 @@ class RedHoodAggregator:
             .replace('%%RUN_TIME%%',     run_time_short)
             .replace('%%TICKER_HTML%%',  ticker_html)
         )
+        if Config.SLIM_OUTPUT:
+            html_out = report_assets.slim_html(html_out, os.path.dirname(filepath) or '.')
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(html_out)
+        if Config.SLIM_OUTPUT:
+            report_assets.precompress(filepath)
 
     @staticmethod
     def _html_report_template() -> str:
@@ -921,53 +1798,73 @@ class RedHoodAggregator:
 </html>'''
     
     def _persist_to_db(self, hours_back: float, all_feeds: List, narratives: List,
-                        json_path: str, html_path: str) -> int:
+                        json_path: str, html_path: str, usage: Dict[str, Any] = None,
+                        batch_id: str = None, category: str = None) -> int:
         """Persist run results into SQLite (runs, feeds, narratives, narrative_feeds)."""
-        conn = sqlite3.connect(DB_PATH)
+        import rollups   # imported here, before the write transaction: it loads NumPy
+        usage = usage or {}
         try:
-            cursor = conn.execute(
-                """INSERT INTO runs (run_at, hours_back, feeds_collected, narratives_extracted, json_path, html_path)
-                   VALUES (?, ?, ?, ?, ?, ?)""",
-                (datetime.utcnow().isoformat(), hours_back,
-                 len(all_feeds), len(narratives), json_path, html_path)
-            )
-            run_id = cursor.lastrowid
-            conn.commit()
-
-            for feed in all_feeds:
-                conn.execute(
+            # One IMMEDIATE transaction per run: concurrent writers (multi-window
+            # runs, workers) queue on busy_timeout instead of failing mid-run.
+            run_at = datetime.utcnow()
+            with transaction(DB_PATH) as conn:
+                cursor = conn.execute(
+                    """INSERT INTO runs (run_at, hours_back, feeds_collected, narratives_extracted,
+                                         json_path, html_path, input_tokens, output_tokens,
+                                         cache_creation_input_tokens, cache_read_input_tokens,
+                                         api_latency_ms, batch_id, run_at_epoch, category)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (run_at.isoformat(), hours_back,
+                     len(all_feeds), len(narratives), json_path, html_path,
+                     usage.get('input_tokens'), usage.get('output_tokens'),
+                     usage.get('cache_creation_input_tokens'), usage.get('cache_read_input_tokens'),
+                     usage.get('api_latency_ms'), batch_id, to_epoch(run_at), category)
+                )
+                run_id = cursor.lastrowid
+
+                # Only feeds not stored by an earlier run count towards the rollups
+                stored = set()
+                ids = [feed.id for feed in all_feeds]
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    stored.update(r[0] for r in conn.execute(
+                        f"SELECT id FROM feeds WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+                rollups.upsert(conn, [(feed.author, feed.clean_text or feed.content,
+                                       to_epoch(feed.timestamp))
+                                      for feed in all_feeds if feed.id not in stored])
+
+                conn.executemany(
                     """INSERT OR IGNORE INTO feeds
-                       (id, run_id, source, author, content, published_at, url, nitter_instance)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (feed.id, run_id, feed.source, feed.author, feed.content,
-                     feed.timestamp.isoformat(), feed.url,
-                     feed.metadata.get('nitter_instance'))
+                       (id, run_id, source, author, content, clean_text,
+                        published_at, url, nitter_instance, published_epoch)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    [(feed.id, run_id, feed.source, feed.author, feed.content, feed.clean_text,
+                      feed.timestamp.isoformat(), feed.url,
+                      feed.metadata.get('nitter_instance'), to_epoch(feed.timestamp))
+                     for feed in all_feeds]
                 )
-
-            for narrative in narratives:
-                conn.execute(
+                conn.executemany(
                     """INSERT OR IGNORE INTO narratives
-                       (id, run_id, title, entropy_risk, hypothesis, rationale, catalysts, created_at)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (narrative.id, run_id, narrative.title, narrative.entropy_risk,
-                     narrative.hypothesis, narrative.rationale,
-                     json.dumps(narrative.catalysts), narrative.date.isoformat())
+                       (id, run_id, title, entropy_risk, hypothesis, rationale, catalysts,
+                        created_at, thread_id, created_epoch)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    [(narrative.id, run_id, narrative.title, narrative.entropy_risk,
+                      narrative.hypothesis, narrative.rationale,
+                      json.dumps(narrative.catalysts), narrative.date.isoformat(),
+                      narrative.thread_id, to_epoch(narrative.date))
+                     for narrative in narratives]
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO narrative_feeds (narrative_id, feed_id) VALUES (?, ?)",
+                    [(narrative.id, feed_id)
+                     for narrative in narratives for feed_id in narrative.supporting_feeds]
                 )
-                for feed_id in narrative.supporting_feeds:
-                    conn.execute(
-                        "INSERT OR IGNORE INTO narrative_feeds (narrative_id, feed_id) VALUES (?, ?)",
-                        (narrative.id, feed_id)
-                    )
 
-            conn.commit()
             print(f"🗄️  DB: run #{run_id} saved — {len(all_feeds)} feeds, {len(narratives)} narratives")
             return run_id
         except Exception as e:
-            conn.rollback()
             print(f"⚠️  DB persist error: {e}")
             return None
-        finally:
-            conn.close()
 
     def _print_summary(self, narratives: List[Narrative]):
         """Print formatted summary of narratives"""
@@ -983,6 +1880,10 @@ class RedHoodAggregator:
             print(f"[{i}] {narrative.title}")
             print(f"    Entropy Risk: {entropy_level} ({narrative.entropy_risk}/10)")
             print(f"    💡 Hypothesis: {narrative.hypothesis}")
+            if narrative.sizing:
+                legs = ' · '.join(f"{'long' if leg['direction'] > 0 else 'short'} {leg['symbol']} "
+                                  f"${leg['notional']:,.0f}" for leg in narrative.sizing)
+                print(f"    📐 Size: {legs}")
             print(f"    📝 Rationale: {narrative.rationale}")
             print(f"    📅 Catalysts: {', '.join(narrative.catalysts)}")
             print()
@@ -992,6 +1893,47 @@ class RedHoodAggregator:
 # CLI INTERFACE
 # ============================================================================
 
+def search(term: str, limit: int = 20, include_feeds: bool = False, since: str = None):
+    """
+    Print stored narratives (and optionally feeds) matching term.
+
+    Feed search spans the hot table and any archived months (retention.py)
+    published on or after ``since``.
+    """
+    from retention import all_feeds
+    pattern = f"%{term}%"
+    since_epoch = to_epoch(since) if since else None
+    with connection() as conn:
+        rows = conn.execute(
+            """SELECT r.run_at, n.entropy_risk, n.title, n.hypothesis
+               FROM narratives n JOIN runs r ON r.id = n.run_id
+               WHERE n.title LIKE ? OR n.hypothesis LIKE ? OR n.rationale LIKE ?
+               ORDER BY n.created_epoch DESC LIMIT ?""",
+            (pattern, pattern, pattern, limit)
+        ).fetchall()
+        print(f"\n🔎 Narratives matching '{term}': {len(rows)}")
+        for run_at, risk, title, hypothesis in rows:
+            print(f"   {run_at[:16].replace('T', ' ')}  [{risk}/10] {title}")
+            print(f"      💡 {hypothesis}")
+
+        if include_feeds:
+            with all_feeds(conn, since=since_epoch) as feeds_view:
+                rows = conn.execute(
+                    f"""SELECT published_at, author, COALESCE(clean_text, content), url
+                        FROM {feeds_view}
+                        WHERE COALESCE(clean_text, content) LIKE ?
+                          AND (? IS NULL OR published_epoch >= ?)
+                        ORDER BY published_epoch DESC LIMIT ?""",
+                    (pattern, since_epoch, since_epoch, limit)
+                ).fetchall()
+            print(f"\n🔎 Feeds matching '{term}': {len(rows)}")
+            for published_at, author, text, url in rows:
+                print(f"   {published_at[:16].replace('T', ' ')}  {author}: {(text or '')[:100]}")
+                if url:
+                    print(f"      {url}")
+    print()
+
+
 def main():
     """Command-line interface for the aggregator"""
     
@@ -1006,17 +1948,94 @@ def main():
         default=round(10/60, 4),
         help='Hours of history to fetch, accepts decimals e.g. 0.1667 for 10 minutes (default: 0.1667)'
     )
+    parser.add_argument(
+        '--windows',
+        type=str,
+        help='Comma-separated hours_back windows analyzed from one scrape, e.g. 0.1667,1,24'
+    )
+    parser.add_argument(
+        '--categories',
+        nargs='?',
+        const='all',
+        metavar='CATS',
+        help="One report per account category from a single scrape: 'all' or e.g. macro,bio"
+    )
+    parser.add_argument(
+        '--distributed',
+        action='store_true',
+        help='Scrape through the work queue; start workers with: python work_queue.py --workers N'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Write per-stage CPU/memory profiles next to the JSON (see profiler.py)'
+    )
+    parser.add_argument(
+        '--slim',
+        action='store_true',
+        help='Shared versioned CSS, minified HTML and .gz/.br siblings (see report_assets.py)'
+    )
     parser.add_argument(
         '--api-key',
         type=str,
         help='Anthropic API key (or set ANTHROPIC_API_KEY env var)'
     )
+
+    # Lightweight subcommands: no scraping, no Anthropic client
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    accounts = commands.add_parser('accounts', help='Manage tracked X/Twitter accounts')
+    accounts.add_argument('--add', metavar='HANDLE', help='Add an account')
+    accounts.add_argument('--remove', metavar='HANDLE', help='Remove an account')
+    accounts.add_argument('--toggle', metavar='HANDLE', help='Toggle active/inactive')
+    accounts.add_argument('--category', metavar='CAT', help='Category for --add')
+    accounts.add_argument('--notes', metavar='TEXT', help='Notes for --add')
+
+    search_cmd = commands.add_parser('search', help='Search stored narratives and feeds')
+    search_cmd.add_argument('term', help='Text to search for')
+    search_cmd.add_argument('--limit', type=int, default=20, help='Max rows per section')
+    search_cmd.add_argument('--feeds', action='store_true', help='Also search feed text')
+    search_cmd.add_argument('--since', metavar='YYYY-MM-DD',
+                            help='Only feeds published since (limits archives attached)')
+
+    render = commands.add_parser('render', help='Re-render a report from a saved JSON run')
+    render.add_argument('json_path', help='Path to a redhood_insights_*.json file')
+    render.add_argument('--out', help='Output HTML path (default: next to the JSON)')
+    render.add_argument('--hours', dest='render_hours', type=float,
+                        help='Window label override for runs saved without hours_back')
+    render.add_argument('--live-ticker', action='store_true',
+                        help='Fetch current quotes instead of a placeholder tape')
     
     args = parser.parse_args()
+    if args.slim:
+        Config.SLIM_OUTPUT = True
+    if args.windows and args.categories:
+        parser.error('--windows and --categories cannot be combined')
+
+    if args.command == 'accounts':
+        import accounts_db
+        accounts_db.init_db()
+        if args.add:
+            accounts_db.add_account(args.add, args.category, args.notes)
+        elif args.remove:
+            accounts_db.remove_account(args.remove)
+        elif args.toggle:
+            accounts_db.toggle_account(args.toggle)
+        accounts_db.list_accounts()
+        return
+    if args.command == 'search':
+        init_db()
+        search(args.term, args.limit, args.feeds, args.since)
+        return
+    if args.command == 'render':
+        RedHoodAggregator().rerender(args.json_path, args.out, args.render_hours,
+                                     args.live_ticker)
+        return
     
     # Override API key if provided
     if args.api_key:
         os.environ['ANTHROPIC_API_KEY'] = args.api_key
+        Config.ANTHROPIC_API_KEY = args.api_key
     
     # Check for required API key
     if not os.getenv('ANTHROPIC_API_KEY'):
@@ -1026,8 +2045,31 @@ def main():
         print("  python redhood_aggregator.py --api-key your-key-here")
         return
     
+    if args.distributed:
+        Config.DISTRIBUTED_SCRAPE = True
+    if args.profile:
+        Config.PROFILE = True
+
     # Run aggregator
     aggregator = RedHoodAggregator()
+    if args.categories:
+        categories = None if args.categories == 'all' else [
+            c.strip() for c in args.categories.split(',') if c.strip()]
+        all_results = aggregator.run_categories(args.hours, categories)
+        print("\n✅ Category pipeline complete!")
+        for c, results in all_results.items():
+            print(f"   [{c}] Feeds: {len(results['feeds'])}, "
+                  f"Narratives: {len(results['narratives'])}")
+        return
+    if args.windows:
+        windows = [float(w) for w in args.windows.split(',') if w.strip()]
+        all_results = aggregator.run_multi(windows)
+        print("\n✅ Multi-window pipeline complete!")
+        for h, results in all_results.items():
+            print(f"   [{aggregator._window_suffix(h)}] Feeds: {len(results['feeds'])}, "
+                  f"Narratives: {len(results['narratives'])}")
+        return
+
     results = aggregator.run(hours_back=args.hours)
     
     print("\n✅ Pipeline complete!")
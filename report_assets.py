@@ -0,0 +1,115 @@
+"""
+RedHood Insights - Slim Report Assets
+======================================
+Shared stylesheet, minified HTML and precompressed siblings for RedHood Reads.
+
+Every redhood_reads_*.html inlines the full stylesheet (including the SVG
+noise data URI), so each archived report, and each publish to docs/,
+carries the same CSS again. In slim mode the stylesheet is written once as
+a content-hashed ``redhood_reads.<hash>.css``: reports link to it, browsers
+cache it across the whole archive, and a style change simply produces a new
+file name. The per-run HTML is minified, and ``.gz``/``.br`` siblings are
+written for servers that serve precompressed files (nginx gzip_static /
+brotli_static). Brotli needs the optional ``brotli`` package; without it
+only ``.gz`` is written.
+
+Usage:
+    python redhood_aggregator.py --slim           # or REDHOOD_SLIM_OUTPUT=1
+
+    html = report_assets.slim_html(html, output_dir)   # writes the CSS if new
+    report_assets.precompress(html_path)               # html_path.gz / .br
+"""
+
+import gzip
+import hashlib
+import os
+import re
+from typing import List, Optional
+
+try:
+    import brotli            # optional; .br siblings are skipped without it
+except ImportError:
+    brotli = None
+
+STYLESHEET_PREFIX = 'redhood_reads.'
+FONT_HOSTS = ['https://fonts.googleapis.com', 'https://fonts.gstatic.com']
+
+_STYLE_RE = re.compile(r'<style>(.*?)</style>', re.S)
+_STYLESHEET_RE = re.compile(r'<link rel="stylesheet" href="(redhood_reads\.[0-9a-f]+\.css)">')
+_FONTS_LINK_RE = re.compile(r'<link href="https://fonts\.googleapis\.com/')
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_HTML_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and the whitespace CSS doesn't need."""
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)          # declarations only; selectors never have ': '
+    return css.replace(';}', '}').strip()
+
+
+def minify_html(html: str) -> str:
+    """
+    Collapse whitespace runs to one space and drop comments.
+
+    A single space renders the same as any whitespace run outside <pre>,
+    which the report doesn't use, so the page looks identical.
+    """
+    html = _HTML_COMMENT_RE.sub('', html)
+    return re.sub(r'\s+', ' ', html).strip()
+
+
+def stylesheet_name(css: str) -> str:
+    """Versioned file name: changes whenever the CSS does."""
+    return f"{STYLESHEET_PREFIX}{hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]}.css"
+
+
+def stylesheet_href(html: str) -> Optional[str]:
+    """The shared stylesheet a slim report links to, or None for inline CSS."""
+    match = _STYLESHEET_RE.search(html)
+    return match.group(1) if match else None
+
+
+def slim_html(html: str, output_dir: str) -> str:
+    """
+    Move the report's inline CSS into the shared stylesheet and minify it.
+
+    The stylesheet is written to output_dir (with precompressed siblings)
+    only if that version doesn't exist yet.
+    """
+    match = _STYLE_RE.search(html)
+    if match is None:
+        return minify_html(html)
+    css = minify_css(match.group(1))
+    name = stylesheet_name(css)
+    path = os.path.join(output_dir, name)
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp"        # concurrent runs race to the same name
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(css)
+        os.replace(tmp, path)
+        precompress(path)
+
+    html = html[:match.start()] + f'<link rel="stylesheet" href="{name}">' + html[match.end():]
+    # Open the font connections while the stylesheets download
+    preconnect = ''.join(f'<link rel="preconnect" href="{host}"'
+                         + (' crossorigin' if 'gstatic' in host else '') + '>'
+                         for host in FONT_HOSTS)
+    html = _FONTS_LINK_RE.sub(lambda m: preconnect + m.group(0), html, count=1)
+    return minify_html(html)
+
+
+def precompress(path: str) -> List[str]:
+    """Write path.gz (and path.br when brotli is installed); returns the paths written."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = [path + '.gz']
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))   # mtime=0: reproducible bytes
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, mode=brotli.MODE_TEXT))
+        written.append(path + '.br')
+    return written
@@ -0,0 +1,306 @@
+"""
+RedHood Insights - Response Parser
+===================================
+Turns Claude's extraction output into validated narrative dicts without
+throwing away a whole (paid-for) response over one formatting glitch.
+
+    1. Fast path: the text is plain JSON.
+    2. Otherwise the first JSON object is cut out of any surrounding prose
+       or ``` fences by a string-aware brace scanner.
+    3. If the output was truncated (max_tokens), the scanner rolls back to
+       the last complete element and closes the open brackets, so finished
+       narratives survive.
+    4. Each narrative is coerced ("7" -> 7) and checked on its own against
+       NARRATIVE_SCHEMA; invalid ones are dropped, valid ones kept.
+
+TRIAGE_SCHEMA is the small model's verdict in cascade mode.
+
+RESPONSE_SCHEMA doubles as the input_schema of the ``record_narratives``
+tool, so in tool-use mode Claude returns the same structure as already
+parsed JSON.
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+NARRATIVE_SCHEMA = {
+    "type": "object",
+    "required": ["title", "entropy_risk", "hypothesis", "rationale"],
+    "properties": {
+        "title": {"type": "string", "minLength": 1},
+        "entropy_risk": {"type": "integer", "minimum": 1, "maximum": 10},
+        "hypothesis": {"type": "string", "minLength": 1},
+        "rationale": {"type": "string", "minLength": 1},
+        "catalysts": {"type": "array", "items": {"type": "string"}},
+        "supporting_feed_indices": {"type": "array", "items": {"type": "integer"}},
+    },
+}
+
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "required": ["narratives"],
+    "properties": {
+        "narratives": {"type": "array", "items": NARRATIVE_SCHEMA},
+    },
+}
+
+TRIAGE_SCHEMA = {
+    "type": "object",
+    "required": ["material", "evidence"],
+    "properties": {
+        "material": {"type": "boolean"},
+        "reason": {"type": "string"},
+        "evidence": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["index", "summary"],
+                "properties": {
+                    "index": {"type": "integer", "minimum": 1},
+                    "summary": {"type": "string", "minLength": 1},
+                },
+            },
+        },
+    },
+}
+
+TOOL_NAME = 'record_narratives'
+
+EXTRACTION_TOOL = {
+    "name": TOOL_NAME,
+    "description": "Record the extracted market narratives.",
+    "input_schema": RESPONSE_SCHEMA,
+}
+
+_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+}
+
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+
+# ============================================================================
+# SCHEMA COMPILATION
+# ============================================================================
+
+Validator = Callable[[Any, str], List[str]]
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """
+    Compile a JSON Schema subset into a validator closure.
+
+    Supports type, required, properties, items, minimum, maximum and
+    minLength — what RESPONSE_SCHEMA uses. The schema is walked once here;
+    validation is then plain function calls.
+
+    Returns:
+        validate(value, path) -> list of error strings (empty if valid)
+    """
+    checks: List[Validator] = []
+
+    expected = schema.get('type')
+    if expected:
+        py_type = _TYPES[expected]
+
+        def check_type(value, path):
+            # bool is an int subclass; JSON true is not an integer
+            if isinstance(value, bool) and expected in ('integer', 'number'):
+                return [f"{path}: expected {expected}"]
+            return [] if isinstance(value, py_type) else [f"{path}: expected {expected}"]
+        checks.append(check_type)
+
+    for key in schema.get('required', []):
+        checks.append(lambda value, path, key=key:
+                      [] if not isinstance(value, dict) or key in value
+                      else [f"{path}.{key}: required"])
+
+    for key, sub in schema.get('properties', {}).items():
+        sub_validate = compile_schema(sub)
+        checks.append(lambda value, path, key=key, v=sub_validate:
+                      v(value[key], f"{path}.{key}")
+                      if isinstance(value, dict) and key in value else [])
+
+    if 'items' in schema:
+        item_validate = compile_schema(schema['items'])
+
+        def check_items(value, path):
+            if not isinstance(value, list):
+                return []
+            errors = []
+            for i, item in enumerate(value):
+                errors += item_validate(item, f"{path}[{i}]")
+            return errors
+        checks.append(check_items)
+
+    if 'minimum' in schema:
+        checks.append(lambda value, path, lo=schema['minimum']:
+                      [f"{path}: below {lo}"] if isinstance(value, (int, float)) and value < lo else [])
+    if 'maximum' in schema:
+        checks.append(lambda value, path, hi=schema['maximum']:
+                      [f"{path}: above {hi}"] if isinstance(value, (int, float)) and value > hi else [])
+    if 'minLength' in schema:
+        checks.append(lambda value, path, n=schema['minLength']:
+                      [f"{path}: shorter than {n}"] if isinstance(value, str) and len(value.strip()) < n else [])
+
+    def validate(value, path='$'):
+        errors = []
+        for check in checks:
+            errors += check(value, path)
+            if errors and check is checks[0] and expected:
+                break  # wrong type; the remaining checks would only add noise
+        return errors
+
+    return validate
+
+
+validate_narrative = compile_schema(NARRATIVE_SCHEMA)
+validate_triage = compile_schema(TRIAGE_SCHEMA)
+
+
+# ============================================================================
+# JSON EXTRACTION AND REPAIR
+# ============================================================================
+
+def extract_json(text: str) -> Tuple[Optional[str], bool]:
+    """
+    Cut the first JSON object out of text.
+
+    Returns:
+        (json_text, repaired) — repaired is True when the object was
+        truncated and had to be closed; json_text is None if no object
+        could be recovered.
+    """
+    start = text.find('{')
+    if start < 0:
+        return None, False
+
+    closers: List[str] = []
+    in_string = escaped = False
+    last_cut: Optional[Tuple[int, str]] = None   # (end index, closers to append)
+
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in '{[':
+            closers.append('}' if ch == '{' else ']')
+        elif ch in '}]':
+            if not closers or closers[-1] != ch:
+                break                       # malformed; salvage what we have
+            closers.pop()
+            if not closers:
+                return text[start:i + 1], False
+            last_cut = (i + 1, ''.join(reversed(closers)))
+        elif ch == ',':
+            # A comma outside strings ends a complete element
+            last_cut = (i, ''.join(reversed(closers)))
+
+    if last_cut is None:
+        return None, False
+    end, closing = last_cut
+    return text[start:end] + closing, True
+
+
+def parse_payload(text: str) -> Tuple[Any, bool]:
+    """
+    Best-effort JSON payload from model text.
+
+    Returns:
+        (data, repaired); data is None if nothing parseable was found
+    """
+    stripped = text.strip()
+    try:
+        return json.loads(stripped), False
+    except ValueError:
+        pass
+
+    candidate, repaired = extract_json(stripped)
+    if candidate is None:
+        return None, False
+    for attempt in (candidate, _TRAILING_COMMA.sub(r'\1', candidate)):
+        try:
+            return json.loads(attempt), repaired or attempt is not candidate
+        except ValueError:
+            continue
+    return None, False
+
+
+def payload_from_response(response) -> Tuple[Any, bool]:
+    """
+    Payload from a Messages API response.
+
+    A ``record_narratives`` tool_use block is already structured and is
+    used as-is; otherwise the text blocks are parsed.
+    """
+    texts = []
+    for block in getattr(response, 'content', None) or []:
+        if getattr(block, 'type', 'text') == 'tool_use' and getattr(block, 'name', '') == TOOL_NAME:
+            return block.input, False
+        text = getattr(block, 'text', None)
+        if text:
+            texts.append(text)
+    return parse_payload('\n'.join(texts))
+
+
+# ============================================================================
+# NARRATIVE SALVAGE
+# ============================================================================
+
+def _coerce(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Fix the harmless type slips models make before validating."""
+    item = dict(item)
+    risk = item.get('entropy_risk')
+    if isinstance(risk, str) and risk.strip().isdigit():
+        item['entropy_risk'] = int(risk.strip())
+    elif isinstance(risk, float) and risk.is_integer():
+        item['entropy_risk'] = int(risk)
+    if isinstance(item.get('catalysts'), str):
+        item['catalysts'] = [item['catalysts']]
+    indices = item.get('supporting_feed_indices')
+    if isinstance(indices, list):
+        item['supporting_feed_indices'] = [
+            int(i) for i in indices
+            if isinstance(i, int) and not isinstance(i, bool)
+            or isinstance(i, str) and i.strip().isdigit()
+        ]
+    return item
+
+
+def valid_narratives(data: Any) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Validate narratives one by one.
+
+    Accepts ``{"narratives": [...]}`` or a bare list.
+
+    Returns:
+        (valid narrative dicts, one error string per dropped narrative)
+    """
+    items = data.get('narratives') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return [], ["$.narratives: missing or not an array"]
+
+    valid, errors = [], []
+    for i, item in enumerate(items):
+        if isinstance(item, dict):
+            item = _coerce(item)
+        problems = validate_narrative(item, f"$.narratives[{i}]")
+        if problems:
+            errors.append('; '.join(problems))
+        else:
+            valid.append(item)
+    return valid, errors
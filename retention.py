@@ -0,0 +1,314 @@
+"""
+RedHood Insights - Feed Retention
+==================================
+Keeps the hot ``feeds`` table small by rolling old rows into monthly
+cold-storage archives.
+
+Feeds published more than RETENTION_DAYS ago move to
+``archive/feeds_YYYY_MM.db`` — one SQLite file per month with the raw HTML
+``content`` zlib-compressed (clean_text stays plain so it remains
+searchable). The hot DB keeps a thin ``feed_archives`` index of which
+months live where, and is VACUUMed afterwards so daily runs scan less.
+Expired 1-minute and 1-hour mention rollups (rollups.py) are pruned too.
+
+narrative_feeds rows are left alone, so archived feeds stay linked to
+their narratives. ``all_feeds()`` attaches the archives a time range
+needs and exposes one ``feeds_all`` view over hot and cold rows:
+
+    with connection() as conn, all_feeds(conn, since=to_epoch('2026-01-01')) as view:
+        conn.execute(f"SELECT author, clean_text FROM {view} WHERE ...")
+
+Usage:
+    python retention.py                    # archive feeds older than 30 days
+    python retention.py --days 14 --dry-run
+    python retention.py --list             # show archived months
+"""
+
+import os
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from db import DB_PATH, connection, transaction, get_pool
+from models import to_epoch
+
+RETENTION_DAYS = int(os.getenv('REDHOOD_RETENTION_DAYS', '30'))
+ARCHIVE_DIRNAME = 'archive'          # next to the hot DB
+BATCH_SIZE = 2000                    # rows moved per fetch
+MAX_ATTACHED = 9                     # SQLite allows 10 attached DBs by default
+COMPRESSION_LEVEL = 6
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    id              TEXT    PRIMARY KEY,
+    run_id          INTEGER,
+    source          TEXT    NOT NULL,
+    author          TEXT    NOT NULL,
+    content_z       BLOB,                      -- zlib-compressed raw content
+    clean_text      TEXT,
+    published_at    TEXT    NOT NULL,
+    url             TEXT,
+    nitter_instance TEXT,
+    published_epoch INTEGER
+);
+"""
+
+ARCHIVE_INDEXES = """
+DROP INDEX IF EXISTS idx_feeds_published;
+CREATE INDEX IF NOT EXISTS idx_feeds_epoch ON feeds(published_epoch, source, author);
+"""
+
+FEED_COLUMNS = ['id', 'run_id', 'source', 'author', 'content', 'clean_text',
+                'published_at', 'url', 'nitter_instance', 'published_epoch']
+
+
+def _compress(text: Optional[str]) -> Optional[bytes]:
+    if text is None:
+        return None
+    return zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def _inflate(blob: Optional[bytes]) -> Optional[str]:
+    if blob is None:
+        return None
+    return zlib.decompress(blob).decode('utf-8')
+
+
+def _archive_path(db_path: str, month: str) -> str:
+    directory = os.path.join(os.path.dirname(os.path.abspath(db_path)), ARCHIVE_DIRNAME)
+    return os.path.join(directory, f"feeds_{month.replace('-', '_')}.db")
+
+
+# ============================================================================
+# ARCHIVING
+# ============================================================================
+
+def archive(days: int = RETENTION_DAYS, db_path: str = DB_PATH,
+            dry_run: bool = False, vacuum: bool = True) -> Dict[str, int]:
+    """
+    Move feeds older than ``days`` into monthly archive databases.
+
+    Each month is copied and committed to its archive before the hot rows
+    are deleted, so an interruption can only leave rows in both places;
+    the next run re-inserts them idempotently and finishes the delete.
+
+    Returns:
+        {month: rows moved}
+    """
+    cutoff = to_epoch(datetime.utcnow() - timedelta(days=days))
+    with connection(db_path) as conn:
+        months = conn.execute(
+            """SELECT strftime('%Y-%m', published_epoch, 'unixepoch') AS month, COUNT(*)
+               FROM feeds WHERE published_epoch < ? GROUP BY month ORDER BY month""",
+            (cutoff,)
+        ).fetchall()
+
+    moved: Dict[str, int] = {}
+    for month, count in months:
+        if dry_run:
+            moved[month] = count
+            continue
+        moved[month] = _archive_month(db_path, month, cutoff)
+
+    if not dry_run:
+        import rollups   # loads NumPy; search and the API import this module
+        pruned = rollups.prune(db_path)
+        if pruned:
+            print(f"🧹 Pruned {pruned} expired mention rollup bucket(s)")
+
+    if moved and not dry_run and vacuum:
+        with connection(db_path) as conn:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    verb = 'Would archive' if dry_run else 'Archived'
+    total = sum(moved.values())
+    print(f"🗃️  {verb} {total} feed(s) older than {days} day(s) across {len(moved)} month(s)")
+    return moved
+
+
+def _archive_month(db_path: str, month: str, cutoff: int) -> int:
+    path = _archive_path(db_path, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lower = to_epoch(f"{month}-01")
+    upper = min(cutoff, to_epoch(f"{_next_month(month)}-01"))
+
+    with connection(path) as cold:
+        cold.executescript(ARCHIVE_SCHEMA)
+        columns = {row[1] for row in cold.execute("PRAGMA table_info(feeds)")}
+        if 'published_epoch' not in columns:   # archives written before epoch columns
+            cold.execute("ALTER TABLE feeds ADD COLUMN published_epoch INTEGER")
+            cold.execute("""UPDATE feeds SET published_epoch =
+                                CAST(strftime('%s', published_at) AS INTEGER)""")
+        cold.executescript(ARCHIVE_INDEXES)
+
+    # 1. Copy into the archive (committed before anything is deleted)
+    with connection(db_path) as hot, transaction(path) as cold:
+        cursor = hot.execute(
+            f"""SELECT {', '.join(FEED_COLUMNS)} FROM feeds
+                WHERE published_epoch >= ? AND published_epoch < ?""",
+            (lower, upper)
+        )
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            cold.executemany(
+                """INSERT OR IGNORE INTO feeds
+                   (id, run_id, source, author, content_z, clean_text,
+                    published_at, url, nitter_instance, published_epoch)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(r['id'], r['run_id'], r['source'], r['author'], _compress(r['content']),
+                  r['clean_text'], r['published_at'], r['url'], r['nitter_instance'],
+                  r['published_epoch'])
+                 for r in rows]
+            )
+        stats = cold.execute(
+            "SELECT COUNT(*), MIN(published_epoch), MAX(published_epoch) FROM feeds"
+        ).fetchone()
+
+    # 2. Drop the hot copies and record the archive in the index
+    with transaction(db_path) as hot:
+        deleted = hot.execute(
+            "DELETE FROM feeds WHERE published_epoch >= ? AND published_epoch < ?",
+            (lower, upper)
+        ).rowcount
+        hot.execute(
+            """INSERT INTO feed_archives (month, path, row_count, min_epoch,
+                                         max_epoch, archived_at)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(month) DO UPDATE SET
+                   path = excluded.path, row_count = excluded.row_count,
+                   min_epoch = excluded.min_epoch,
+                   max_epoch = excluded.max_epoch,
+                   archived_at = excluded.archived_at""",
+            (month, os.path.relpath(path, os.path.dirname(os.path.abspath(db_path))),
+             stats[0], stats[1], stats[2], datetime.utcnow().isoformat())
+        )
+    get_pool(path).close_all()  # archives are cold; don't hold their handles open
+    print(f"   📦 {month}: {deleted} feed(s) → {path}")
+    return deleted
+
+
+def _next_month(month: str) -> str:
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+# ============================================================================
+# HOT + COLD QUERIES
+# ============================================================================
+
+def archived_months(conn, since: Optional[int] = None,
+                    until: Optional[int] = None) -> List:
+    """feed_archives rows whose published range overlaps [since, until] (epochs)."""
+    return conn.execute(
+        """SELECT month, path FROM feed_archives
+           WHERE (? IS NULL OR max_epoch >= ?)
+             AND (? IS NULL OR min_epoch <= ?)
+           ORDER BY month DESC""",
+        (since, since, until, until)
+    ).fetchall()
+
+
+@contextmanager
+def all_feeds(conn, since: Optional[int] = None, until: Optional[int] = None,
+              db_path: str = DB_PATH) -> Iterator[str]:
+    """
+    Expose hot and archived feeds as one TEMP VIEW; yields its name.
+
+    Only archives overlapping [since, until] (UTC epochs) are used. Up to
+    MAX_ATTACHED of them are attached directly; a wider range is attached
+    MAX_ATTACHED at a time and its rows in [since, until] are copied into
+    a TEMP table, since SQLite limits attached databases. Everything is
+    detached and dropped on exit so the pooled connection goes back clean.
+    The view has the same columns as ``feeds``, with archived content
+    inflated on read.
+    """
+    months = archived_months(conn, since, until)
+    batched = len(months) > MAX_ATTACHED
+    base = os.path.dirname(os.path.abspath(db_path))
+    conn.create_function('redhood_inflate', 1, _inflate, deterministic=True)
+    attached = []
+    try:
+        selects = [f"SELECT {', '.join(FEED_COLUMNS)} FROM main.feeds"]
+        cold_columns = ', '.join('redhood_inflate(content_z) AS content' if c == 'content' else c
+                                 for c in FEED_COLUMNS)
+        if batched:
+            conn.execute("DROP TABLE IF EXISTS temp.feeds_cold")
+            conn.execute(f"CREATE TEMP TABLE feeds_cold AS "
+                         f"SELECT {', '.join(FEED_COLUMNS)} FROM main.feeds WHERE 0")
+            selects.append(f"SELECT {', '.join(FEED_COLUMNS)} FROM temp.feeds_cold")
+        for row in months:
+            path = os.path.join(base, row['path'])
+            if not os.path.exists(path):
+                continue
+            # Batches detach at MAX_ATTACHED, so this never reuses a live alias
+            alias = f"archive_{len(attached)}"
+            conn.execute("ATTACH DATABASE ? AS " + alias, (path,))
+            attached.append(alias)
+            columns = cold_columns
+            if 'published_epoch' not in {r[1] for r in conn.execute(f"PRAGMA {alias}.table_info(feeds)")}:
+                # Archived before epoch columns and not re-archived since (see _archive_month)
+                columns = columns.replace(
+                    'published_epoch',
+                    "CAST(strftime('%s', published_at) AS INTEGER) AS published_epoch")
+            if not batched:
+                selects.append(f"SELECT {columns} FROM {alias}.feeds")
+                continue
+            conn.execute(
+                f"""INSERT INTO temp.feeds_cold SELECT {columns} FROM {alias}.feeds
+                    WHERE (? IS NULL OR published_epoch >= ?)
+                      AND (? IS NULL OR published_epoch <= ?)""",
+                (since, since, until, until))
+            if len(attached) == MAX_ATTACHED:
+                _detach(conn, attached)
+        if batched:
+            _detach(conn, attached)
+        conn.execute("DROP VIEW IF EXISTS temp.feeds_all")
+        conn.execute(f"CREATE TEMP VIEW feeds_all AS {' UNION ALL '.join(selects)}")
+        yield 'feeds_all'
+    finally:
+        conn.execute("DROP VIEW IF EXISTS temp.feeds_all")
+        if batched:
+            conn.execute("DROP TABLE IF EXISTS temp.feeds_cold")
+        _detach(conn, attached)
+
+
+def _detach(conn, aliases: List[str]):
+    if conn.in_transaction:
+        conn.commit()  # DETACH fails inside an open transaction
+    while aliases:
+        conn.execute(f"DETACH DATABASE {aliases.pop()}")
+
+
+def list_archives(db_path: str = DB_PATH):
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            "SELECT month, path, row_count, archived_at FROM feed_archives ORDER BY month"
+        ).fetchall()
+    print(f"\n{'Month':<9} {'Rows':>8}  {'Archived':<20} {'Path'}")
+    print("-" * 70)
+    for r in rows:
+        print(f"{r['month']:<9} {r['row_count']:>8}  {r['archived_at'][:19]:<20} {r['path']}")
+    print(f"\n{len(rows)} archived month(s).\n")
+
+
+if __name__ == '__main__':
+    import argparse
+    from models import init_schema
+
+    parser = argparse.ArgumentParser(description='RedHood feed retention')
+    parser.add_argument('--days', type=int, default=RETENTION_DAYS,
+                        help=f'Keep this many days hot (default {RETENTION_DAYS})')
+    parser.add_argument('--dry-run', action='store_true', help='Only report what would move')
+    parser.add_argument('--no-vacuum', action='store_true', help='Skip VACUUM of the hot DB')
+    parser.add_argument('--list', action='store_true', help='List archived months')
+    args = parser.parse_args()
+
+    init_schema()
+    if args.list:
+        list_archives()
+    else:
+        archive(args.days, dry_run=args.dry_run, vacuum=not args.no_vacuum)
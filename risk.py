@@ -0,0 +1,524 @@
+"""
+RedHood Insights - Portfolio Risk
+==================================
+Open hypothetical positions for narrative trades, their aggregate heat and
+correlation-adjusted exposure, and per-narrative sizing that accounts for
+what the book already holds.
+
+Each run parses the trades in ``narratives.hypothesis`` ("Long QQQ calls,
+short XLE") into legs and keeps them open in ``risk_positions`` for
+HOLD_DAYS. A narrative thread holds at most one leg per symbol: re-seeing
+the same story extends and re-sizes its legs instead of stacking new ones.
+Sibling windows and category shards of one scrape share a batch_id, and a
+leg one of them opened is reused by the others rather than opened again.
+
+Risk comes from daily closes cached in ``price_history`` (Yahoo chart
+endpoint, fetched at most once per STALE_AFTER_S per symbol, tracked in
+``price_fetches`` across runs). With S symbols and the
+book's net dollar exposure per symbol ``n``:
+
+    Σ          S x S covariance of daily returns over LOOKBACK_DAYS (NumPy)
+    exposure   sqrt(nᵀ Σ n)       1-day 1σ dollar move of the whole book
+    gross      Σ |n_i| σ_i        the same, as if every leg were perfectly correlated
+    heat       HEAT_SIGMAS · sqrt(HOLD_DAYS) · exposure / equity, in % of equity
+
+New legs are sized like ``Calculate-PositionSize`` in run.ps1: 1% of equity,
+scaled down by the narrative's entropy risk and by ``1 - heat / MAX_HEAT``,
+then by how correlated the leg is with the current book (a leg that hedges
+the book is not penalised), capped at 2% of equity per narrative.
+
+Everything after the price lookup is a handful of matrix operations, so
+hundreds of positions recompute in a few milliseconds. ``risk_latest.json``
+in the output directory carries the heat for run.ps1, which passes it to
+``Calculate-PositionSize`` instead of a fixed 0.
+
+NumPy is optional; without it no positions are opened or sized.
+
+Usage:
+    python risk.py                   # open book, exposure and heat
+    python risk.py --positions       # every open leg
+    python risk.py --refresh-prices  # re-fetch price history for open symbols
+    python risk.py --close-all       # close every open position
+
+    summary = risk.RiskBook().update(narratives, batch_id)   # after ThreadTracker.assign
+"""
+
+import json
+import math
+import re
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db import DB_PATH, connection, transaction
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+YAHOO_CHART_URL = 'https://query1.finance.yahoo.com/v8/finance/chart/'
+PRICE_RANGE = '6mo'        # history fetched per symbol
+LOOKBACK_DAYS = 90         # calendar days of returns in the covariance
+STALE_AFTER_S = 20 * 3600  # min time between fetches of a symbol lacking today's close
+FETCH_WORKERS = 8
+
+HOLD_DAYS = 5              # hypothetical positions close this long after last sighting
+HEAT_SIGMAS = 2.0          # heat is a 2σ move over the holding period
+BASE_SIZE_PCT = 0.01       # run.ps1: $baseSize = $equity * 0.01
+MAX_SIZE_PCT = 0.02        # run.ps1: cap at 2% of equity (per narrative here)
+ENTROPY_DECAY = 6.0        # entropy risk 1 -> full size, 10 -> ~22%
+CORRELATION_PENALTY = 0.5  # a leg perfectly correlated with the book gets half size
+DEFAULT_DAILY_VOL = 0.02   # assumed for symbols without price history
+
+# Uppercase words in hypotheses that are not tradeable symbols
+NOT_SYMBOLS = {
+    'AI', 'ATH', 'ATM', 'BOE', 'BOJ', 'CEO', 'CPI', 'DTE', 'ECB', 'EPS', 'ETF', 'EU',
+    'FED', 'FOMC', 'FX', 'GDP', 'IPO', 'ITM', 'IV', 'NFP', 'OPEC', 'OTM', 'PBOC',
+    'PCE', 'PMI', 'PPI', 'QOQ', 'SEC', 'UK', 'US', 'USA', 'VWAP', 'YOY', 'YTD',
+}
+# Symbols as narratives write them -> Yahoo symbols
+SYMBOL_ALIASES = {
+    'BTC': 'BTC-USD', 'ETH': 'ETH-USD', 'SOL': 'SOL-USD',
+    'SPX': '^GSPC', 'NDX': '^NDX', 'VIX': '^VIX', 'DXY': 'DX-Y.NYB',
+}
+
+# +1 long / -1 short
+DIRECTION_WORDS = {
+    'long': 1, 'buy': 1, 'overweight': 1,
+    'short': -1, 'sell': -1, 'underweight': -1, 'fade': -1,
+}
+OPTION_WORDS = {'call': 1, 'calls': 1, 'put': -1, 'puts': -1}   # side of buying them
+
+# Joiners are captured: "and" carries the previous clause's direction to a
+# leading symbol that has none of its own, "vs"/"versus" carries its opposite
+_CLAUSE_RE = re.compile(r"([,;/+]|\.(?=\s|$)|\band\b|\bvs\b\.?|\bversus\b)", re.I)
+_WORD_RE = re.compile(r"\$?[A-Za-z]+(?:[.-][A-Za-z]{1,2})?\b")
+_SYMBOL_RE = re.compile(r"\$([A-Z]{1,5}(?:[.-][A-Z]{1,2})?)")
+# Without a $, only 3-5 letters (plus share class) pass as a ticker; "EM",
+# "I" and other short capitals need the $ ("$GE")
+_BARE_SYMBOL_RE = re.compile(r"([A-Z]{3,5}(?:[.-][A-Z]{1,2})?)")
+
+# (db_path, symbol) -> (day_epochs, closes); history changes at most daily,
+# so a scheduled process reads each symbol from SQLite once
+_closes: Dict[Tuple[str, str], Tuple['np.ndarray', 'np.ndarray']] = {}
+
+
+def available() -> bool:
+    return np is not None
+
+
+def parse_legs(hypothesis: str) -> List[Tuple[str, int]]:
+    """
+    (symbol, direction) legs of a trade idea, direction +1 long / -1 short.
+
+    A leg is a ``$TICKER`` in a clause with a direction word, or a bare
+    ticker (3-5 capitals, not in NOT_SYMBOLS) right after its own direction
+    word ("Long QQQ") or right before an option word ("SPY puts").
+    "puts"/"calls" set the side of their own symbol only: buying puts is
+    short the underlying, selling them is long. A clause joined by "and"
+    with no direction word of its own passes the previous leg's direction
+    to its ``$TICKER``s and to a leading bare ticker ("Long QQQ and SPY");
+    "vs" passes the opposite ("Long EEM vs SPY"). Otherwise nothing carries
+    over, so "stay away from AMD" yields nothing and "Fade the VIX spike
+    via SPY puts" is short SPY, nothing on VIX. A symbol appears once, with
+    its first direction.
+    """
+    legs, seen = [], set()
+    parts = _CLAUSE_RE.split(hypothesis or '')
+    previous = None          # direction of the last leg in the previous clause
+    for clause, joiner in zip(parts[::2], [''] + parts[1::2]):
+        joiner = joiner.lower().rstrip('.')
+        carry = None
+        if previous is not None and joiner == 'and':
+            carry = previous
+        elif previous is not None and joiner in ('vs', 'versus'):
+            carry = -previous
+        words = _WORD_RE.findall(clause)
+        lowered = [w.lower() for w in words]
+        if any(w in DIRECTION_WORDS for w in lowered):
+            carry = None
+        previous = None
+        for i, word in enumerate(words):
+            match = (_SYMBOL_RE if word.startswith('$') else _BARE_SYMBOL_RE).fullmatch(word)
+            if not match or match.group(1) in NOT_SYMBOLS:
+                continue
+            own = DIRECTION_WORDS.get(lowered[i - 1]) if i else None
+            if own is None and carry is not None and (i == 0 or word.startswith('$')):
+                own = carry
+            option = OPTION_WORDS.get(lowered[i + 1]) if i + 1 < len(words) else None
+            if option is not None:
+                direction = (own or 1) * option     # bought unless the symbol says otherwise
+            elif own is not None:
+                direction = own
+            elif word.startswith('$'):
+                # Nearest direction word before the ticker, else the clause's first
+                before = [DIRECTION_WORDS[w] for w in lowered[:i] if w in DIRECTION_WORDS]
+                after = [DIRECTION_WORDS[w] for w in lowered[i:] if w in DIRECTION_WORDS]
+                if before:
+                    direction = before[-1]
+                elif after:
+                    direction = after[0]
+                else:
+                    continue
+            else:
+                continue
+            previous = direction
+            symbol = SYMBOL_ALIASES.get(match.group(1), match.group(1))
+            if symbol not in seen:
+                seen.add(symbol)
+                legs.append((symbol, direction))
+    return legs
+
+
+# ============================================================================
+# PRICE HISTORY
+# ============================================================================
+
+def _fetch_closes(symbol: str) -> List[Tuple[int, float]]:
+    """(day_epoch, close) pairs from the Yahoo chart endpoint."""
+    url = (f'{YAHOO_CHART_URL}{urllib.request.quote(symbol)}'
+           f'?range={PRICE_RANGE}&interval=1d')
+    req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        data = json.loads(resp.read())
+    result = data['chart']['result'][0]
+    closes = result['indicators']['quote'][0]['close']
+    return [(ts - ts % 86400, float(close))
+            for ts, close in zip(result.get('timestamp') or [], closes) if close]
+
+
+def refresh_prices(symbols: Iterable[str], db_path: str = DB_PATH, force: bool = False,
+                   now: Optional[int] = None) -> int:
+    """Fetch daily closes for symbols whose cached history is stale; returns symbols updated."""
+    now = int(now or time.time())
+    symbols = sorted(set(symbols))
+    if not symbols:
+        return 0
+    latest = {s: int(days[-1]) for s, (days, _) in zip(symbols, _load_closes(symbols, db_path))
+              if len(days)}
+    with connection(db_path) as conn:
+        fetched_at = {r['symbol']: r['fetched_epoch'] for r in conn.execute(
+            "SELECT symbol, fetched_epoch FROM price_fetches")}
+    today = now - now % 86400
+    # Weekends, holidays and the hours before a session's bar appears never
+    # produce today's close, so the last attempt (not the close) gates refetches
+    stale = [s for s in symbols if force or (
+        latest.get(s, 0) < today and now - fetched_at.get(s, 0) > STALE_AFTER_S)]
+    if not stale:
+        return 0
+
+    def fetch(symbol):
+        try:
+            return symbol, _fetch_closes(symbol)
+        except Exception:
+            return symbol, []     # unknown symbol or offline: sized with DEFAULT_DAILY_VOL
+
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(stale))) as pool:
+        fetched = list(pool.map(fetch, stale))
+    with transaction(db_path) as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO price_fetches (symbol, fetched_epoch, row_count) VALUES (?, ?, ?)",
+            [(symbol, now, len(rows)) for symbol, rows in fetched])
+        fetched = [(s, rows) for s, rows in fetched if rows]
+        for symbol, rows in fetched:
+            conn.executemany(
+                "INSERT OR REPLACE INTO price_history (symbol, day_epoch, close) VALUES (?, ?, ?)",
+                [(symbol, day, close) for day, close in rows])
+            _closes.pop((db_path, symbol), None)
+    return len(fetched)
+
+
+def _load_closes(symbols: List[str], db_path: str) -> List[Tuple['np.ndarray', 'np.ndarray']]:
+    """Cached (day_epochs, closes) per symbol, reading only symbols not cached yet."""
+    missing = [s for s in symbols if (db_path, s) not in _closes]
+    for i in range(0, len(missing), 500):
+        chunk = missing[i:i + 500]
+        with connection(db_path) as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None        # plain tuples: several times faster to fetch
+            rows = cursor.execute(
+                f"""SELECT symbol, day_epoch, close FROM price_history
+                    WHERE symbol IN ({','.join('?' * len(chunk))}) ORDER BY symbol, day_epoch""",
+                chunk).fetchall()
+        by_symbol: Dict[str, List[Tuple[int, float]]] = {s: [] for s in chunk}
+        for symbol, day, close in rows:
+            by_symbol[symbol].append((day, close))
+        for symbol, pairs in by_symbol.items():
+            days = np.array([d for d, _ in pairs], dtype=np.int64)
+            closes = np.array([c for _, c in pairs], dtype=np.float64)
+            _closes[(db_path, symbol)] = (days, closes)
+    return [_closes[(db_path, s)] for s in symbols]
+
+
+def returns_matrix(symbols: List[str], db_path: str = DB_PATH, now: Optional[int] = None,
+                   lookback_days: int = LOOKBACK_DAYS) -> 'np.ndarray':
+    """
+    (days - 1, len(symbols)) daily simple returns, oldest first.
+
+    Closes are aligned on the union of trading days and carried forward
+    over each symbol's gaps (weekends for equities, holidays), so missing
+    days read as a zero return. Columns without history are all zero.
+    """
+    now = int(now or time.time())
+    start = now - lookback_days * 86400
+    history = _load_closes(list(symbols), db_path)
+    recent = [days >= start for days, _ in history]
+    days = np.unique(np.concatenate([np.zeros(0, dtype=np.int64)]
+                                    + [d[keep] for (d, _), keep in zip(history, recent)]))
+    if len(days) == 0:
+        return np.zeros((0, len(symbols)))
+    closes = np.full((len(days), len(symbols)), np.nan)
+    for col, ((d, c), keep) in enumerate(zip(history, recent)):
+        closes[np.searchsorted(days, d[keep]), col] = c[keep]
+
+    # Forward-fill each column: index of the last seen price at or before each row
+    seen = np.where(np.isnan(closes), 0, np.arange(len(days))[:, None])
+    np.maximum.accumulate(seen, axis=0, out=seen)
+    closes = closes[seen, np.arange(len(symbols))]
+    returns = closes[1:] / closes[:-1] - 1.0
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def covariance(returns: 'np.ndarray') -> 'np.ndarray':
+    """Daily-return covariance; symbols without history get DEFAULT_DAILY_VOL and no correlation."""
+    n = returns.shape[1]
+    cov = np.cov(returns, rowvar=False).reshape(n, n) if len(returns) > 1 else np.zeros((n, n))
+    flat = np.diag(cov) <= 0
+    cov[flat, :] = 0.0
+    cov[:, flat] = 0.0
+    cov[flat, flat] = DEFAULT_DAILY_VOL ** 2
+    return cov
+
+
+# ============================================================================
+# BOOK
+# ============================================================================
+
+def book_risk(cov: 'np.ndarray', net: 'np.ndarray', equity: float) -> Dict[str, 'np.ndarray']:
+    """Exposure, gross and heat of net per-symbol dollar exposures, plus each symbol's correlation to the book."""
+    vol = np.sqrt(np.diag(cov))
+    marginal = cov @ net                           # d(variance)/d(n) / 2
+    exposure = float(math.sqrt(max(float(net @ marginal), 0.0)))
+    gross = float(np.abs(net) @ vol)
+    scale = HEAT_SIGMAS * math.sqrt(HOLD_DAYS) / equity * 100
+    return {
+        'exposure': exposure,
+        'gross': gross,
+        'heat': exposure * scale,
+        'gross_heat': gross * scale,
+        'vol': vol,
+        'marginal': marginal,
+        'correlation': marginal / np.maximum(vol * exposure, 1e-12),
+    }
+
+
+class RiskBook:
+    """Open hypothetical positions and the sizing of new narrative trades against them."""
+
+    def __init__(self, db_path: str = DB_PATH, equity: float = 100000.0, max_heat: float = 6.0):
+        self.db_path = db_path
+        self.equity = equity
+        self.max_heat = max_heat       # % of equity, on the heat scale above
+
+    def close_expired(self, now: Optional[int] = None) -> int:
+        now = int(now or time.time())
+        with transaction(self.db_path) as conn:
+            return conn.execute(
+                """UPDATE risk_positions SET closed_epoch = expires_epoch
+                   WHERE closed_epoch IS NULL AND expires_epoch <= ?""",
+                (now,)).rowcount
+
+    def open_positions(self) -> List[Dict]:
+        with connection(self.db_path) as conn:
+            return [dict(r) for r in conn.execute(
+                """SELECT id, narrative_id, thread_id, batch_id, symbol, direction, notional,
+                          entry_price, opened_epoch, expires_epoch
+                   FROM risk_positions WHERE closed_epoch IS NULL ORDER BY symbol, id""")]
+
+    def _risk(self, positions: List[Dict], extra_symbols: Iterable[str] = (),
+              now: Optional[int] = None, refresh: bool = True):
+        """(symbols, cov, net exposures, book_risk) for positions plus extra symbols."""
+        symbols = sorted({p['symbol'] for p in positions} | set(extra_symbols))
+        if refresh:
+            refresh_prices(symbols, self.db_path, now=now)
+        cov = covariance(returns_matrix(symbols, self.db_path, now))
+        col = {s: i for i, s in enumerate(symbols)}
+        net = np.zeros(len(symbols))
+        if positions:
+            np.add.at(net, [col[p['symbol']] for p in positions],
+                      [p['direction'] * p['notional'] for p in positions])
+        return symbols, cov, net, book_risk(cov, net, self.equity)
+
+    def size(self, legs_by_narrative: Dict[str, List[Tuple[str, int]]],
+             entropy: Dict[str, int], symbols: List[str], risk: Dict) -> Dict[str, List[Dict]]:
+        """Dollar notional per leg for each narrative, against the book described by risk."""
+        col = {s: i for i, s in enumerate(symbols)}
+        heat_factor = max(0.0, 1.0 - risk['heat'] / self.max_heat)
+        sized = {}
+        for narrative_id, legs in legs_by_narrative.items():
+            if not legs:
+                continue
+            idx = np.array([col[s] for s, _ in legs])
+            direction = np.array([d for _, d in legs], dtype=np.float64)
+            corr = np.clip(direction * risk['correlation'][idx], 0.0, 1.0)
+            budget = self.equity * BASE_SIZE_PCT * heat_factor * math.exp(
+                -(max(entropy.get(narrative_id, 5), 1) - 1) / ENTROPY_DECAY)
+            notional = budget / len(legs) * (1.0 - CORRELATION_PENALTY * corr)
+            notional *= min(1.0, self.equity * MAX_SIZE_PCT / max(notional.sum(), 1e-9))
+            sized[narrative_id] = [{'symbol': s, 'direction': d, 'notional': round(float(x), 2)}
+                                   for (s, d), x in zip(legs, notional)]
+        return sized
+
+    def update(self, narratives, batch_id: str = None, now: Optional[int] = None,
+               refresh: bool = True) -> Dict:
+        """
+        Close expired positions, size and open (or extend) each narrative's
+        legs, and return the book summary with the sizing per narrative.
+
+        Narratives need thread_id set (ThreadTracker.assign) so a thread
+        re-seen on the next run extends its legs rather than adding more.
+        Legs already opened or re-sized under batch_id by a sibling window
+        or shard are reported with their existing notional, not stacked.
+        """
+        now = int(now or time.time())
+        self.close_expired(now)
+        parsed = {n.id: parse_legs(n.hypothesis) for n in narratives}
+        entropy = {n.id: n.entropy_risk for n in narratives}
+        thread = {n.id: n.thread_id for n in narratives}
+
+        positions = self.open_positions()
+        batch = {(p['symbol'], p['direction']): p for p in positions
+                 if batch_id is not None and p['batch_id'] == batch_id}
+        legs = {k: [leg for leg in l if leg not in batch] for k, l in parsed.items()}
+        # A re-seen thread's own legs are re-sized, not counted against it
+        threads = {t for t in thread.values() if t is not None}
+        kept = {p['id'] for p in batch.values()}
+        held = [p for p in positions if p['thread_id'] not in threads or p['id'] in kept]
+        symbols, cov, net, risk = self._risk(
+            held, (s for l in legs.values() for s, _ in l), now, refresh)
+        sized = self.size(legs, entropy, symbols, risk)
+
+        replaced = {(p['thread_id'], p['symbol']): p for p in positions
+                    if p['thread_id'] in threads}
+        prices = self._last_closes(symbols)
+        with transaction(self.db_path) as conn:
+            for narrative_id, narrative_legs in sized.items():
+                for leg in narrative_legs:
+                    old = replaced.pop((thread[narrative_id], leg['symbol']), None)
+                    if old is not None and old['direction'] == leg['direction']:
+                        conn.execute(
+                            """UPDATE risk_positions SET narrative_id = ?, batch_id = ?, notional = ?,
+                                      expires_epoch = ? WHERE id = ?""",
+                            (narrative_id, batch_id, leg['notional'], now + HOLD_DAYS * 86400,
+                             old['id']))
+                        continue
+                    if old is not None:      # the thread flipped sides
+                        conn.execute("UPDATE risk_positions SET closed_epoch = ? WHERE id = ?",
+                                     (now, old['id']))
+                    conn.execute(
+                        """INSERT INTO risk_positions
+                           (narrative_id, thread_id, batch_id, symbol, direction, notional,
+                            entry_price, opened_epoch, expires_epoch)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        (narrative_id, thread[narrative_id], batch_id, leg['symbol'],
+                         leg['direction'], leg['notional'], prices.get(leg['symbol']), now,
+                         now + HOLD_DAYS * 86400))
+        # Legs a re-seen thread no longer suggests stay open until they expire
+
+        for narrative_id, narrative_legs in parsed.items():
+            if any(leg in batch for leg in narrative_legs):
+                opened = {(l['symbol'], l['direction']): l for l in sized.get(narrative_id, [])}
+                sized[narrative_id] = [
+                    opened.get((s, d)) or {'symbol': s, 'direction': d,
+                                           'notional': batch[(s, d)]['notional']}
+                    for s, d in narrative_legs]
+
+        summary = self.summary(now=now, refresh=False)
+        summary['heat_before'] = round(risk['heat'], 2)
+        summary['sizing'] = sized
+        return summary
+
+    def _last_closes(self, symbols: List[str]) -> Dict[str, float]:
+        return {s: float(closes[-1]) for s, (_, closes) in zip(symbols, _load_closes(symbols, self.db_path))
+                if len(closes)}
+
+    def summary(self, now: Optional[int] = None, refresh: bool = True) -> Dict:
+        """Heat, exposure and per-symbol/per-narrative contributions of the open book."""
+        positions = self.open_positions()
+        symbols, cov, net, risk = self._risk(positions, now=now, refresh=refresh)
+        exposure = risk['exposure'] or 1.0
+        # Euler allocation: contributions sum to the book's exposure
+        by_narrative: Dict[str, float] = {}
+        col = {s: i for i, s in enumerate(symbols)}
+        for p in positions:
+            share = p['direction'] * p['notional'] * risk['marginal'][col[p['symbol']]] / exposure
+            by_narrative[p['narrative_id']] = by_narrative.get(p['narrative_id'], 0.0) + share
+        return {
+            'equity': self.equity,
+            'positions': len(positions),
+            'heat': round(risk['heat'], 2),
+            'gross_heat': round(risk['gross_heat'], 2),
+            'max_heat': self.max_heat,
+            'heat_ratio': round(min(risk['heat'] / self.max_heat, 1.0), 4),
+            'exposure': round(risk['exposure'], 2),
+            'gross_exposure': round(float(np.abs(net).sum()), 2),
+            'symbols': {s: {'net': round(float(net[i]), 2),
+                            'daily_vol': round(float(risk['vol'][i]), 4),
+                            'contribution': round(float(net[i] * risk['marginal'][i] / exposure), 2)}
+                        for i, s in enumerate(symbols)},
+            'narratives': {k: round(v, 2) for k, v in by_narrative.items()},
+        }
+
+    def close_all(self, now: Optional[int] = None) -> int:
+        now = int(now or time.time())
+        with transaction(self.db_path) as conn:
+            return conn.execute("UPDATE risk_positions SET closed_epoch = ? WHERE closed_epoch IS NULL",
+                                (now,)).rowcount
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    from models import init_schema
+
+    parser = argparse.ArgumentParser(description='RedHood portfolio risk')
+    parser.add_argument('--positions', action='store_true', help='List every open leg')
+    parser.add_argument('--refresh-prices', action='store_true',
+                        help='Re-fetch price history for open symbols')
+    parser.add_argument('--close-all', action='store_true', help='Close every open position')
+    parser.add_argument('--equity', type=float,
+                        default=float(os.getenv('REDHOOD_RISK_EQUITY', '100000')))
+    parser.add_argument('--max-heat', type=float,
+                        default=float(os.getenv('REDHOOD_MAX_HEAT', '6')))
+    args = parser.parse_args()
+
+    if not available():
+        raise SystemExit("❌ NumPy is required: pip install numpy")
+    init_schema()
+    book = RiskBook(equity=args.equity, max_heat=args.max_heat)
+    if args.close_all:
+        print(f"🧹 Closed {book.close_all()} position(s)")
+    book.close_expired()
+    if args.refresh_prices:
+        symbols = {p['symbol'] for p in book.open_positions()}
+        print(f"📈 Refreshed {refresh_prices(symbols, force=True)} symbol(s)")
+
+    started = time.perf_counter()
+    s = book.summary()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"\n🎯 Heat {s['heat']:.2f}% of {s['max_heat']:g}% max "
+          f"(gross {s['gross_heat']:.2f}%) | {s['positions']} open leg(s) | "
+          f"exposure ${s['exposure']:,.0f}/day 1σ on ${s['gross_exposure']:,.0f} gross "
+          f"| {elapsed:.1f} ms\n")
+    print(f"{'Symbol':<10} {'Net $':>12} {'Daily σ':>8} {'Contrib $':>11}")
+    print("-" * 44)
+    for symbol, r in sorted(s['symbols'].items(), key=lambda kv: -abs(kv[1]['contribution'])):
+        print(f"{symbol:<10} {r['net']:>12,.0f} {r['daily_vol']:>8.2%} {r['contribution']:>11,.0f}")
+    if args.positions:
+        print(f"\n{'Symbol':<10} {'Side':<6} {'Notional':>10} {'Expires':<17} Narrative")
+        for p in book.open_positions():
+            expires = time.strftime('%Y-%m-%d %H:%M', time.gmtime(p['expires_epoch']))
+            print(f"{p['symbol']:<10} {'long' if p['direction'] > 0 else 'short':<6} "
+                  f"{p['notional']:>10,.0f} {expires:<17} {p['narrative_id']}")
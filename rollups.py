@@ -0,0 +1,284 @@
+"""
+RedHood Insights - Mention Rollups
+===================================
+Incrementally maintained mention counts per ticker and per account, so
+"how fast is chatter about $QQQ accelerating" reads a few dozen buckets
+instead of rescanning feed content.
+
+Every feed row a run inserts adds to ``mention_rollups`` in the same
+persist transaction: one count per cashtag (``symbol``) and per author
+(``account``) in 1-minute, 1-hour and 1-day buckets. Feeds that were
+already stored add nothing, so overlapping windows never double count.
+
+On top of the buckets, NumPy computes per entity, for all entities at once:
+
+    velocity      mentions in the last complete bucket minus the one before
+    acceleration  change in velocity over the same two steps
+    zscore        last complete bucket against the mean/std of the ones before it
+
+``window_heat`` scores the current window's in-memory counts against the
+stored baseline, which the prompt packer uses to rank feeds on spiking
+tickers higher; the report shows the top spike.
+
+Usage:
+    python rollups.py                           # top hourly symbol anomalies
+    python rollups.py --type account --resolution 1m --buckets 60
+    python rollups.py --rebuild                 # recount from the hot feeds table
+    python rollups.py --prune                   # drop expired 1m/1h buckets (retention.py does too)
+"""
+
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db import DB_PATH, connection, transaction
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RESOLUTIONS = {'1m': 60, '1h': 3600, '1d': 86400}   # bucket width in seconds
+KEEP_BUCKETS = {'1m': 2 * 1440, '1h': 90 * 24, '1d': None}   # pruned beyond this; None keeps all
+ENTITY_TYPES = ('symbol', 'account')
+BASELINE_BUCKETS = 24      # history the z-score compares against
+MIN_STD = 1.0              # floor so a quiet ticker's first mentions don't read as z=inf
+MIN_WINDOW_S = 900         # shortest span a window's counts are scaled over
+
+_CASHTAG_RE = re.compile(r"\$([A-Za-z]{1,6})\b")
+
+
+def available() -> bool:
+    return np is not None
+
+
+def symbols(text: str) -> set:
+    """Upper-cased cashtags mentioned in text ($qqq -> QQQ)."""
+    return {s.upper() for s in _CASHTAG_RE.findall(text or '')}
+
+
+def _mentions(items: Iterable[Tuple[str, str, int]]) -> Counter:
+    """(entity_type, entity, resolution, bucket_epoch) -> mentions for (author, text, epoch) items."""
+    counts: Counter = Counter()
+    for author, text, epoch in items:
+        if epoch is None:
+            continue
+        entities = [('symbol', s) for s in symbols(text)] + [('account', author)]
+        for resolution, width in RESOLUTIONS.items():
+            bucket = epoch - epoch % width
+            for entity_type, entity in entities:
+                counts[(entity_type, entity, resolution, bucket)] += 1
+    return counts
+
+
+def upsert(conn, items: Iterable[Tuple[str, str, int]]) -> int:
+    """
+    Add (author, text, published_epoch) items to the rollups on conn.
+
+    Call inside the transaction that inserts those feed rows, with only
+    the rows that were actually new. Returns the bucket rows touched.
+    """
+    counts = _mentions(items)
+    conn.executemany(
+        """INSERT INTO mention_rollups (entity_type, entity, resolution, bucket_epoch, mentions)
+           VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT (entity_type, entity, resolution, bucket_epoch)
+           DO UPDATE SET mentions = mentions + excluded.mentions""",
+        [key + (n,) for key, n in counts.items()]
+    )
+    return len(counts)
+
+
+def prune(db_path: str = DB_PATH, now: Optional[int] = None) -> int:
+    """Drop fine-grained buckets past KEEP_BUCKETS; returns rows deleted."""
+    now = int(now or time.time())
+    deleted = 0
+    with transaction(db_path) as conn:
+        for resolution, keep in KEEP_BUCKETS.items():
+            if keep is None:
+                continue
+            cutoff = now - keep * RESOLUTIONS[resolution]
+            deleted += conn.execute(
+                "DELETE FROM mention_rollups WHERE resolution = ? AND bucket_epoch < ?",
+                (resolution, cutoff)
+            ).rowcount
+    return deleted
+
+
+def matrix(entity_type: str = 'symbol', resolution: str = '1h',
+           buckets: int = BASELINE_BUCKETS + 1, now: Optional[int] = None,
+           db_path: str = DB_PATH) -> Tuple[List[str], 'np.ndarray', int]:
+    """
+    Dense (entities x buckets) counts of the last ``buckets`` complete buckets.
+
+    Oldest bucket first, zero-filled. Returns (entities, counts, end_epoch),
+    where end_epoch is the start of the current, still-filling bucket.
+    """
+    width = RESOLUTIONS[resolution]
+    now = int(now or time.time())
+    end = now - now % width
+    start = end - buckets * width
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            """SELECT entity, bucket_epoch, mentions FROM mention_rollups
+               WHERE resolution = ? AND bucket_epoch >= ? AND bucket_epoch < ?
+                 AND entity_type = ?""",
+            (resolution, start, end, entity_type)
+        ).fetchall()
+    entities = sorted({r['entity'] for r in rows})
+    counts = np.zeros((len(entities), buckets), dtype=np.float64)
+    if rows:
+        position = {e: i for i, e in enumerate(entities)}
+        rows_idx = np.fromiter((position[r['entity']] for r in rows), dtype=np.int64, count=len(rows))
+        cols_idx = np.fromiter(((r['bucket_epoch'] - start) // width for r in rows),
+                               dtype=np.int64, count=len(rows))
+        np.add.at(counts, (rows_idx, cols_idx), [r['mentions'] for r in rows])
+    return entities, counts, end
+
+
+def velocity_stats(counts: 'np.ndarray') -> Dict[str, 'np.ndarray']:
+    """Per-row velocity, acceleration and z-score of the last column (needs >= 3 columns)."""
+    last, prev, prev2 = counts[:, -1], counts[:, -2], counts[:, -3]
+    baseline = counts[:, :-1]
+    mean = baseline.mean(axis=1)
+    std = np.maximum(baseline.std(axis=1), MIN_STD)
+    return {
+        'mentions': last,
+        'mean': mean,
+        'velocity': last - prev,
+        'acceleration': (last - prev) - (prev - prev2),
+        'zscore': (last - mean) / std,
+    }
+
+
+def anomalies(entity_type: str = 'symbol', resolution: str = '1h',
+              buckets: int = BASELINE_BUCKETS, min_mentions: int = 3, limit: int = 10,
+              now: Optional[int] = None, db_path: str = DB_PATH) -> List[Dict]:
+    """Entities whose last complete bucket stands out most, highest z-score first."""
+    if buckets < 2:
+        raise ValueError(f"buckets must be >= 2 for velocity/acceleration, got {buckets}")
+    entities, counts, end = matrix(entity_type, resolution, buckets + 1, now, db_path)
+    if not entities:
+        return []
+    stats = velocity_stats(counts)
+    keep = np.nonzero(stats['mentions'] >= min_mentions)[0]
+    order = keep[np.argsort(-stats['zscore'][keep], kind='stable')][:limit]
+    return [{
+        'entity': entities[i],
+        'resolution': resolution,
+        'bucket_epoch': end - RESOLUTIONS[resolution],
+        **{name: round(float(values[i]), 2) for name, values in stats.items()},
+    } for i in order]
+
+
+def window_heat(items: Iterable[Tuple[str, int]], resolution: str = '1h',
+                buckets: int = BASELINE_BUCKETS, min_mentions: int = 2,
+                now: Optional[int] = None, db_path: str = DB_PATH) -> Dict[str, Dict]:
+    """
+    Score a not-yet-persisted window's symbols against the stored baseline.
+
+    ``items`` are (text, published_epoch). Window counts are scaled to a
+    per-bucket rate over the window's span before comparing them with the
+    mean/std of the last ``buckets`` complete buckets. Returns symbol ->
+    {mentions, rate, zscore} for symbols with at least min_mentions.
+    """
+    items = list(items)
+    window: Counter = Counter()
+    for text, _ in items:
+        window.update(symbols(text))
+    window = Counter({s: n for s, n in window.items() if n >= min_mentions})
+    if not window:
+        return {}
+    width = RESOLUTIONS[resolution]
+    epochs = [e for _, e in items if e is not None]
+    # A burst of posts in two minutes shouldn't extrapolate to 30x the rate
+    span = max(max(epochs) - min(epochs), MIN_WINDOW_S) if epochs else width
+
+    entities, counts, _ = matrix('symbol', resolution, buckets, now, db_path)
+    position = {e: i for i, e in enumerate(entities)}
+    names = list(window)
+    history = np.zeros((len(names), buckets))
+    for row, name in enumerate(names):
+        if name in position:
+            history[row] = counts[position[name]]
+    rate = np.array([window[n] for n in names], dtype=np.float64) * (width / span)
+    zscore = (rate - history.mean(axis=1)) / np.maximum(history.std(axis=1), MIN_STD)
+    return {name: {'mentions': window[name], 'rate': round(float(rate[i]), 2),
+                   'zscore': round(float(zscore[i]), 2)}
+            for i, name in enumerate(names)}
+
+
+def rebuild(db_path: str = DB_PATH, since: Optional[int] = None, batch: int = 5000):
+    """
+    Recount rollups from the hot feeds table, from ``since`` on.
+
+    Defaults to the day of the oldest hot feed; older buckets, which cover
+    months retention.py has archived, are kept as they are.
+    """
+    with transaction(db_path) as conn:
+        if since is None:
+            since = conn.execute("SELECT MIN(published_epoch) FROM feeds").fetchone()[0]
+            if since is None:
+                print("📈 No feeds to roll up")
+                return
+        since -= since % RESOLUTIONS['1d']     # whole buckets at every resolution
+        conn.execute("DELETE FROM mention_rollups WHERE bucket_epoch >= ?", (since,))
+        cursor = conn.execute(
+            """SELECT author, COALESCE(clean_text, content), published_epoch FROM feeds
+               WHERE published_epoch >= ?""",
+            (since,)
+        )
+        total = 0
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                break
+            upsert(conn, [tuple(r) for r in rows])
+            total += len(rows)
+    print(f"📈 Rolled up {total} feed(s)")
+
+
+if __name__ == '__main__':
+    import argparse
+    from datetime import datetime
+    from models import init_schema
+
+    def _baseline_buckets(value: str) -> int:
+        # anomalies() reads buckets + 1 columns and acceleration needs three
+        buckets = int(value)
+        if buckets < 2:
+            raise argparse.ArgumentTypeError(f"must be >= 2, got {buckets}")
+        return buckets
+
+    parser = argparse.ArgumentParser(description='RedHood mention rollups')
+    parser.add_argument('--type', choices=ENTITY_TYPES, default='symbol', help='Entity type')
+    parser.add_argument('--resolution', choices=list(RESOLUTIONS), default='1h')
+    parser.add_argument('--buckets', type=_baseline_buckets, default=BASELINE_BUCKETS,
+                        help='Baseline buckets for the z-score (>= 2)')
+    parser.add_argument('--min-mentions', type=int, default=3)
+    parser.add_argument('--limit', type=int, default=15)
+    parser.add_argument('--rebuild', action='store_true', help='Recount from the feeds table')
+    parser.add_argument('--prune', action='store_true', help='Drop expired 1m/1h buckets')
+    args = parser.parse_args()
+
+    init_schema()
+    if args.rebuild:
+        rebuild()
+    if args.prune:
+        print(f"🧹 Pruned {prune()} bucket row(s)")
+    if np is None:
+        raise SystemExit("❌ NumPy is required for velocity/z-scores: pip install numpy")
+
+    rows = anomalies(args.type, args.resolution, args.buckets, args.min_mentions, args.limit)
+    if rows:
+        ending = datetime.utcfromtimestamp(rows[0]['bucket_epoch']).strftime('%Y-%m-%d %H:%M')
+        print(f"\n{args.type} anomalies, {args.resolution} bucket starting {ending} UTC "
+              f"vs previous {args.buckets}\n")
+    print(f"{'Entity':<22} {'Now':>6} {'Mean':>7} {'Vel':>6} {'Accel':>6} {'z':>7}")
+    print("-" * 58)
+    for r in rows:
+        print(f"{r['entity']:<22} {r['mentions']:>6.0f} {r['mean']:>7.2f} {r['velocity']:>+6.0f} "
+              f"{r['acceleration']:>+6.0f} {r['zscore']:>+7.2f}")
+    if not rows:
+        print("No entities above --min-mentions in the last complete bucket.")
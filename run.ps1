@@ -126,6 +126,14 @@ function Calculate-PositionSize {
     return [Math]::Min([Math]::Max($calculated, 0), $equity * 0.02)
 }
 
+# Portfolio heat of the open narrative trades (risk.py), scaled to $MaxHeat
+function Get-PortfolioHeat {
+    $riskFile = Join-Path $ScriptDir "data\risk_latest.json"
+    if (-not (Test-Path $riskFile)) { return 0 }
+    try { return [double](Get-Content $riskFile -Raw | ConvertFrom-Json).heat_ratio * $MaxHeat }
+    catch { return 0 }
+}
+
 function Get-MarketRecommendation {
     param(
         [double]$temperature, [double]$entropy, [double]$baseTemp,
@@ -141,7 +149,7 @@ function Get-MarketRecommendation {
 function Analyze-Symbol {
     param(
         [string]$symbol, [double]$baseTemp,
-        [double]$maxHeat, [double]$initialEquity
+        [double]$maxHeat, [double]$initialEquity, [double]$heat = 0
     )
     Write-Host "`nAnalyzing $symbol..." -ForegroundColor Cyan
     $data = Get-MarketData -symbol $symbol
@@ -162,7 +170,7 @@ function Analyze-Symbol {
     $temperature   = Calculate-Temperature   -returns $returns
     $entropy       = Calculate-Entropy       -returns $returns
     $trendUp       = $mas.ShortMA -gt $mas.LongMA
-    $positionSize  = Calculate-PositionSize  -equity $initialEquity -temperature $temperature -entropy $entropy -heat 0 -momentum $momentum
+    $positionSize  = Calculate-PositionSize  -equity $initialEquity -temperature $temperature -entropy $entropy -heat $heat -momentum $momentum
     $recommendation = Get-MarketRecommendation -temperature $temperature -entropy $entropy -baseTemp $baseTemp -trendUp $trendUp -momentum $momentum -rsi $rsi
     return @{
         Symbol       = $symbol
@@ -189,11 +197,13 @@ if (-not $SkipTrading) {
     Write-Host "Symbols: $($Symbols -join ', ')"   -ForegroundColor Yellow
     Write-Host "Base Temperature: $BaseTemp"        -ForegroundColor Yellow
     Write-Host "Initial Equity: $($InitialEquity.ToString('C'))" -ForegroundColor Yellow
+    $portfolioHeat = Get-PortfolioHeat
+    Write-Host "Portfolio Heat: $([Math]::Round($portfolioHeat, 1)) / $MaxHeat" -ForegroundColor Yellow
     Write-Host ("=" * 50)                           -ForegroundColor Green
 
     $tradingResults = @()
     foreach ($symbol in $Symbols) {
-        $result = Analyze-Symbol -symbol $symbol -baseTemp $BaseTemp -maxHeat $MaxHeat -initialEquity $InitialEquity
+        $result = Analyze-Symbol -symbol $symbol -baseTemp $BaseTemp -maxHeat $MaxHeat -initialEquity $InitialEquity -heat $portfolioHeat
         if ($result) { $tradingResults += $result }
         Start-Sleep -Milliseconds 500
     }
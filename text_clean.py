@@ -0,0 +1,173 @@
+"""
+RedHood Insights - Feed Text Normalization
+===========================================
+Turns the raw HTML found in Nitter and Substack ``summary`` fields into
+compact plain text, computed once per feed item and stored in
+``feeds.clean_text``.
+
+Normalization steps:
+    - strip markup (script/style/figure/button blocks are dropped whole)
+    - expand links: truncated anchor text is replaced by the full URL and
+      Nitter host links are rewritten to x.com
+    - drop boilerplate lines (subscribe/share prompts, "Read more", etc.)
+    - unescape entities and collapse whitespace
+
+Usage:
+    python text_clean.py            # backfill clean_text for stored feeds
+"""
+
+import re
+from html import unescape
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# Tags whose entire contents are noise for narrative extraction
+_SKIP_TAGS = {'script', 'style', 'figure', 'figcaption', 'button', 'svg',
+              'noscript', 'iframe', 'form'}
+
+# Tags that imply a line break in the rendered text
+_BLOCK_TAGS = {'p', 'div', 'br', 'li', 'ul', 'ol', 'blockquote', 'h1', 'h2',
+               'h3', 'h4', 'h5', 'h6', 'tr', 'hr', 'section', 'article'}
+
+# Whole lines matching any of these are Substack/Nitter boilerplate
+_BOILERPLATE = re.compile(
+    r'^\s*('
+    r'subscribe( now| for free)?'
+    r'|share( this post)?'
+    r'|leave a comment'
+    r'|read more'
+    r'|continue reading.*'
+    r'|thanks for reading.*'
+    r'|upgrade to paid'
+    r'|this post is for paid subscribers.*'
+    r'|pic\.twitter\.com/\S+'
+    r')\s*[.!]?\s*$',
+    re.IGNORECASE,
+)
+
+_WS = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+
+class _TextExtractor(HTMLParser):
+    """Collect visible text from an HTML fragment, expanding anchors."""
+
+    def __init__(self, rewrite_host: Optional[str] = None):
+        super().__init__(convert_charrefs=True)
+        self.rewrite_host = rewrite_host
+        self.parts: List[str] = []
+        self._skip_depth = 0
+        self._href: Optional[str] = None
+        self._anchor_text: List[str] = []
+
+    def _expand(self, href: str) -> str:
+        if self.rewrite_host:
+            href = href.replace(f'https://{self.rewrite_host}', 'https://x.com')
+        return href
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+        if tag in _BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag == 'a':
+            self._href = dict(attrs).get('href')
+            self._anchor_text = []
+        elif tag == 'img':
+            alt = dict(attrs).get('alt')
+            if alt:
+                self.parts.append(f' {alt} ')
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing <a/> or <iframe/> carry no text worth keeping
+        if tag not in _SKIP_TAGS and tag != 'a':
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth:
+            return
+        if tag == 'a' and self._href is not None:
+            text = ''.join(self._anchor_text).strip()
+            bare = text.replace('https://', '').replace('http://', '')
+            href = self._expand(self._href)
+            # Nitter/Substack shorten displayed URLs ("example.com/very-lo…");
+            # prefer the real target so the model sees the full link.
+            if not text or text.endswith('…') or text.endswith('...') \
+                    or (bare and bare in self._href):
+                text = href if href.startswith('http') else text
+            self.parts.append(text)
+            self._href = None
+            self._anchor_text = []
+        elif tag in _BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._href is not None:
+            self._anchor_text.append(data)
+        else:
+            self.parts.append(data)
+
+
+def clean_html(raw: Optional[str], rewrite_host: Optional[str] = None) -> str:
+    """
+    Normalize an HTML feed summary to plain text.
+
+    Args:
+        raw: HTML (or plain text) from a feed entry
+        rewrite_host: Nitter instance whose links should point at x.com
+
+    Returns:
+        Whitespace-collapsed text with boilerplate lines removed
+    """
+    if not raw:
+        return ''
+
+    if '<' in raw:
+        parser = _TextExtractor(rewrite_host)
+        try:
+            parser.feed(raw)
+            parser.close()
+            text = ''.join(parser.parts)
+        except Exception:
+            # Malformed markup: fall back to a blunt tag strip
+            text = re.sub(r'<[^>]+>', ' ', raw)
+    else:
+        text = unescape(raw)
+
+    lines = []
+    for line in text.split('\n'):
+        line = _WS.sub(' ', line).strip()
+        if line and not _BOILERPLATE.match(line):
+            lines.append(line)
+    return _BLANK_LINES.sub('\n', '\n'.join(lines)).strip()
+
+
+def backfill(db_path: str = None) -> int:
+    """Compute clean_text for stored feeds that predate the column."""
+    from db import DB_PATH, transaction
+    from models import init_schema
+    db_path = db_path or DB_PATH
+    init_schema(db_path)
+
+    with transaction(db_path) as conn:
+        rows = conn.execute(
+            "SELECT id, content, nitter_instance FROM feeds WHERE clean_text IS NULL"
+        ).fetchall()
+        conn.executemany(
+            "UPDATE feeds SET clean_text = ? WHERE id = ?",
+            [(clean_html(content, instance), feed_id) for feed_id, content, instance in rows]
+        )
+    print(f"Backfilled clean_text for {len(rows)} feed(s)")
+    return len(rows)
+
+
+if __name__ == '__main__':
+    backfill()
@@ -0,0 +1,295 @@
+"""
+RedHood Insights - Vector Index
+================================
+Local similarity search over stored narratives and feeds, so extraction
+can tell a new story from one that has been running for a week.
+
+Embeddings are computed on-box with the hashing trick: lightly stemmed word
+unigrams and bigrams (``$XLE`` and ``XLE`` alike) are hashed into DIM signed
+buckets with sublinear term weights and L2-normalised. There is no model download and no
+API call, and the same text always maps to the same vector, so stored rows
+never need re-embedding.
+
+Vectors are appended to one float32 file per kind in ``vectors/`` next to
+the database and searched brute-force through a read-only NumPy memmap:
+one matrix-vector product over N x DIM, about 15 ms for 100k rows.
+Row metadata lives in the ``vector_rows`` table, keyed by (kind, row_num); a
+vector whose metadata insert rolled back is simply never returned.
+
+At prompt-build time the extractor embeds the packed window, retrieves the
+top-k historical narratives (one per narrative thread) and sends them as a
+compact HISTORY block ahead of the feeds.
+
+NumPy is optional; without it nothing is indexed or retrieved.
+
+Usage:
+    python vector_index.py --rebuild               # index stored narratives and feeds
+    python vector_index.py --search "OPEC+ cuts"   # nearest historical narratives
+    python vector_index.py --search "OPEC" --kind feed
+    python vector_index.py --stats
+"""
+
+import math
+import os
+import re
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from db import DB_PATH, connection, transaction
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DIM = 256                  # hashed feature buckets per vector
+ROW_BYTES = DIM * 4        # float32
+KINDS = ('narrative', 'feed')
+VECTORS_DIRNAME = 'vectors'          # next to the hot DB
+MAX_TEXT_CHARS = 2000      # feed text embedded per item
+MIN_SCORE = 0.1            # cosine below this is not "relevant" (a window vs one narrative)
+CANDIDATES = 8             # rows scored per wanted hit, before thread dedupe
+
+_WORD_RE = re.compile(r"[a-z][a-z0-9+&'-]*")
+_STOPWORDS = {
+    'a', 'an', 'and', 'the', 'of', 'to', 'in', 'on', 'for', 'with', 'as', 'at',
+    'by', 'is', 'are', 'be', 'from', 'into', 'it', 'its', 'this', 'that', 'or',
+    'was', 'were', 'will', 'has', 'have', 'but', 'not', 'rt', 'https', 'http',
+}
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _features(text: str) -> Counter:
+    words = []
+    for word in _WORD_RE.findall(text.lower()):
+        word = word.rstrip("'-")
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]  # cuts -> cut, so feeds and narratives share terms
+        words.append(word)
+    return Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def embed(texts: List[str]) -> 'np.ndarray':
+    """Unit-length (len(texts), DIM) float32 hashing-trick embeddings."""
+    out = np.zeros((len(texts), DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for feature, count in _features(text).items():
+            h = zlib.crc32(feature.encode('utf-8'))
+            # Low bits pick the bucket, the top bit the sign, so collisions cancel on average
+            out[i, h % DIM] += (1.0 + math.log(count)) * (1.0 if h >> 31 else -1.0)
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    return (out / np.where(norms == 0, 1.0, norms)).astype(np.float32, copy=False)
+
+
+def narrative_text(title: str, hypothesis: str, rationale: str = '') -> str:
+    return f"{title}. {hypothesis}. {rationale}"
+
+
+class VectorIndex:
+    """Append-only embedding files plus their vector_rows metadata."""
+
+    def __init__(self, db_path: str = DB_PATH, directory: str = None):
+        self.db_path = db_path
+        self.directory = directory or os.path.join(
+            os.path.dirname(os.path.abspath(db_path)), VECTORS_DIRNAME)
+        self._maps: Dict[str, Tuple[int, 'np.memmap']] = {}
+
+    def _path(self, kind: str) -> str:
+        return os.path.join(self.directory, f"{kind}s.f32")
+
+    def _matrix(self, kind: str) -> Optional['np.ndarray']:
+        """Read-only memmap of the kind's vectors, reopened when the file grows."""
+        path = self._path(kind)
+        rows = os.path.getsize(path) // ROW_BYTES if os.path.exists(path) else 0
+        if rows == 0:
+            return None
+        cached = self._maps.get(kind)
+        if cached is None or cached[0] != rows:
+            cached = (rows, np.memmap(path, dtype=np.float32, mode='r', shape=(rows, DIM)))
+            self._maps[kind] = cached
+        return cached[1]
+
+    def add(self, kind: str, items: List[Tuple[str, str, int]]) -> int:
+        """
+        Index (ref_id, text, created_epoch) items not already indexed.
+
+        Appends happen under the database write lock, so concurrent runs
+        never claim the same rows. Returns the number of rows added.
+        """
+        if not items or np is None:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        with transaction(self.db_path) as conn:
+            indexed = set()
+            ref_ids = [ref_id for ref_id, _, _ in items]
+            for i in range(0, len(ref_ids), 500):
+                chunk = ref_ids[i:i + 500]
+                indexed.update(r[0] for r in conn.execute(
+                    f"""SELECT ref_id FROM vector_rows
+                        WHERE kind = ? AND ref_id IN ({','.join('?' * len(chunk))})""",
+                    [kind] + chunk))
+            new, seen = [], set()
+            for ref_id, text, epoch in items:
+                if ref_id not in indexed and ref_id not in seen:
+                    seen.add(ref_id)
+                    new.append((ref_id, text[:MAX_TEXT_CHARS], epoch))
+            if not new:
+                return 0
+
+            vectors = embed([text for _, text, _ in new])
+            with open(self._path(kind), 'ab') as f:
+                start = f.tell() // ROW_BYTES
+                f.truncate(start * ROW_BYTES)    # drop a torn row from an interrupted append
+                f.write(vectors.tobytes())
+            conn.executemany(
+                "INSERT INTO vector_rows (kind, row_num, ref_id, created_epoch) VALUES (?, ?, ?, ?)",
+                [(kind, start + i, ref_id, epoch) for i, (ref_id, _, epoch) in enumerate(new)]
+            )
+        return len(new)
+
+    def search(self, kind: str, text: str, k: int = 5,
+               before_epoch: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Up to k (ref_id, cosine) pairs most similar to text, best first."""
+        if np is None:
+            return []
+        matrix = self._matrix(kind)
+        if matrix is None:
+            return []
+        scores = matrix @ embed([text])[0]
+        n = min(len(scores), max(k, 1))
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top])]
+        top = [int(row) for row in top if scores[row] >= MIN_SCORE]
+        if not top:
+            return []
+        with connection(self.db_path) as conn:
+            meta = {r['row_num']: (r['ref_id'], r['created_epoch']) for r in conn.execute(
+                f"""SELECT row_num, ref_id, created_epoch FROM vector_rows
+                    WHERE kind = ? AND row_num IN ({','.join('?' * len(top))})""",
+                [kind] + top)}
+        return [(meta[row][0], float(scores[row])) for row in top
+                if row in meta and (before_epoch is None or meta[row][1] < before_epoch)]
+
+    def related_narratives(self, text: str, k: int = 5,
+                           before_epoch: Optional[int] = None) -> List[Dict]:
+        """
+        The k historical narratives most similar to text, one per thread.
+
+        Each dict carries the narrative plus its thread's first sighting and
+        run count, so the prompt can say how long a story has been running.
+        """
+        hits = self.search('narrative', text, k * CANDIDATES, before_epoch)
+        if not hits:
+            return []
+        scores = dict(hits)
+        with connection(self.db_path) as conn:
+            rows = conn.execute(
+                f"""SELECT n.id, n.title, n.hypothesis, n.entropy_risk, n.created_epoch,
+                           n.thread_id, t.first_seen, t.narrative_count
+                    FROM narratives n LEFT JOIN narrative_threads t ON t.id = n.thread_id
+                    WHERE n.id IN ({','.join('?' * len(scores))})""",
+                list(scores)
+            ).fetchall()
+        related, threads = [], set()
+        for r in sorted(rows, key=lambda r: -scores[r['id']]):
+            if r['thread_id'] is not None:
+                if r['thread_id'] in threads:
+                    continue
+                threads.add(r['thread_id'])
+            related.append({**dict(r), 'score': round(scores[r['id']], 3)})
+            if len(related) == k:
+                break
+        return related
+
+    def stats(self) -> Dict[str, int]:
+        with connection(self.db_path) as conn:
+            counts = dict(conn.execute(
+                "SELECT kind, COUNT(*) FROM vector_rows GROUP BY kind").fetchall())
+        return {kind: counts.get(kind, 0) for kind in KINDS}
+
+
+def format_history(related: List[Dict]) -> str:
+    """Compact HISTORY lines for the extraction prompt."""
+    lines = []
+    for r in related:
+        last = datetime.utcfromtimestamp(r['created_epoch']).strftime('%Y-%m-%d')
+        first = (r['first_seen'] or '')[:10] or last
+        span = last if first == last else f"{first}→{last}"
+        runs = f" ×{r['narrative_count']}" if (r['narrative_count'] or 1) > 1 else ''
+        lines.append(f"- {span}{runs} | risk {r['entropy_risk']} | {r['title']} | {r['hypothesis']}")
+    return '\n'.join(lines)
+
+
+_indexes: Dict[str, VectorIndex] = {}
+
+
+def get_index(db_path: str = DB_PATH) -> VectorIndex:
+    """Process-wide index for db_path (keeps its memmaps open between runs)."""
+    if db_path not in _indexes:
+        _indexes[db_path] = VectorIndex(db_path)
+    return _indexes[db_path]
+
+
+def rebuild(db_path: str = DB_PATH, batch: int = 5000):
+    """Index every stored narrative and feed not yet in the index."""
+    index = get_index(db_path)
+    with connection(db_path) as conn:
+        narratives = [(r['id'], narrative_text(r['title'], r['hypothesis'], r['rationale']),
+                       r['created_epoch'])
+                      for r in conn.execute(
+                          "SELECT id, title, hypothesis, rationale, created_epoch FROM narratives")]
+    added = index.add('narrative', narratives)
+    print(f"🧭 Indexed {added} narrative(s)")
+
+    total, last_epoch, last_id = 0, -1, ''
+    while True:
+        # Keyset pages so the hot DB is never read in one go
+        with connection(db_path) as conn:
+            rows = conn.execute(
+                """SELECT id, COALESCE(clean_text, content) AS text, published_epoch FROM feeds
+                   WHERE (published_epoch, id) > (?, ?)
+                   ORDER BY published_epoch, id LIMIT ?""",
+                (last_epoch, last_id, batch)
+            ).fetchall()
+        if not rows:
+            break
+        total += index.add('feed', [(r['id'], r['text'] or '', r['published_epoch'])
+                                    for r in rows])
+        last_epoch, last_id = rows[-1]['published_epoch'], rows[-1]['id']
+    print(f"🧭 Indexed {total} feed(s)")
+
+
+if __name__ == '__main__':
+    import argparse
+    from models import init_schema
+
+    parser = argparse.ArgumentParser(description='RedHood vector index')
+    parser.add_argument('--rebuild', action='store_true', help='Index stored narratives and feeds')
+    parser.add_argument('--search', metavar='TEXT', help='Nearest neighbours of TEXT')
+    parser.add_argument('--kind', choices=KINDS, default='narrative', help='What --search looks in')
+    parser.add_argument('-k', type=int, default=5, help='Results for --search')
+    parser.add_argument('--stats', action='store_true', help='Rows indexed per kind')
+    args = parser.parse_args()
+
+    if not available():
+        raise SystemExit("❌ NumPy is required: pip install numpy")
+    init_schema()
+    if args.rebuild:
+        rebuild()
+    if args.search:
+        index = get_index()
+        if args.kind == 'narrative':
+            print(format_history(index.related_narratives(args.search, args.k)) or 'No matches.')
+        else:
+            for ref_id, score in index.search('feed', args.search, args.k):
+                print(f"{score:.3f}  {ref_id}")
+    if args.stats or not (args.rebuild or args.search):
+        for kind, count in get_index().stats().items():
+            print(f"{kind:<10} {count:>8} rows")
@@ -0,0 +1,359 @@
+"""
+RedHood Insights - Distributed Scrape Work Queue
+=================================================
+Moves feed fetching out of the aggregator process so scraping scales
+across worker processes (and, with a networked backend, across hosts and
+IPs facing the rate-limited Nitter mirrors).
+
+    coordinator (RedHoodAggregator --distributed)
+        enqueue one job per due Nitter account and RSS feed for the window
+        wait until every job is done/failed, or SCRAPE_WINDOW_TIMEOUT_S
+        read the FeedItems back and run analysis as usual
+    workers (python work_queue.py --workers N)
+        lease a batch of jobs, fetch, write FeedItems back, repeat
+
+A Nitter job fetches one account from one mirror per attempt; a failed
+attempt goes back to pending and the next lease tries the next mirror in
+the job's ``instances`` list (rotated per account so load spreads across
+mirrors). Leases expire, so a crashed worker's jobs are picked up again.
+
+The default backend is SqliteWorkQueue on the main redhood.db
+(``scrape_jobs`` / ``scrape_results``), which serves any number of worker
+processes on one host. SQLite WAL must not be shared over a network
+filesystem; for workers on other hosts, implement WorkQueue on a shared
+service and point REDHOOD_WORK_QUEUE at it as ``module:Class``.
+
+Usage:
+    python work_queue.py --workers 4         # run 4 worker processes
+    python work_queue.py --status            # job counts per window
+"""
+
+import importlib
+import json
+import os
+import socket
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from db import DB_PATH, connection, transaction
+
+LEASE_S = 300                   # a leased job is re-offered after this
+LEASE_BATCH = 4                 # jobs a worker takes per lease
+IDLE_POLL_S = 1.0               # worker sleep when the queue is empty
+RSS_MAX_ATTEMPTS = 2
+FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+
+
+class WorkQueue(ABC):
+    """
+    Backend interface for scrape jobs.
+
+    Jobs are dicts with at least id, kind, target, instance, hours_back and
+    attempts; results are FeedItem.to_dict() dicts. A backend missing any
+    method fails when it is instantiated, not mid-run.
+    """
+
+    @abstractmethod
+    def enqueue(self, window_id: str, jobs: List[Dict[str, Any]]) -> int:
+        """Add jobs ({kind, target, hours_back[, instances]}) to a window."""
+
+    @abstractmethod
+    def lease(self, worker_id: str, limit: int = LEASE_BATCH,
+              lease_s: int = LEASE_S) -> List[Dict[str, Any]]:
+        """Claim up to ``limit`` runnable jobs for ``lease_s`` seconds."""
+
+    @abstractmethod
+    def complete(self, job_id: int, items: List[Dict[str, Any]], duration_ms: float = None):
+        """Store a job's feed items and mark it done."""
+
+    @abstractmethod
+    def fail(self, job_id: int, error: str, duration_ms: float = None):
+        """Record a failed attempt; the job is retried while attempts remain."""
+
+    @abstractmethod
+    def window_status(self, window_id: str) -> Dict[str, int]:
+        """status -> job count for a window."""
+
+    @abstractmethod
+    def finished_jobs(self, window_id: str) -> List[Dict[str, Any]]:
+        """Final state of every finished job in a window."""
+
+    @abstractmethod
+    def results(self, window_id: str) -> List[Dict[str, Any]]:
+        """All feed items written back for a window."""
+
+    @abstractmethod
+    def cancel(self, window_id: str) -> int:
+        """Stop offering a window's unfinished jobs; returns how many."""
+
+    @abstractmethod
+    def purge(self, window_id: str):
+        """Drop a window's jobs and results once the coordinator has them."""
+
+
+class SqliteWorkQueue(WorkQueue):
+    """WorkQueue on the scrape_jobs / scrape_results tables."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+
+    def enqueue(self, window_id: str, jobs: List[Dict[str, Any]]) -> int:
+        now = int(time.time())
+        rows = []
+        for job in jobs:
+            instances = job.get('instances') or []
+            rows.append((window_id, job['kind'], job['target'],
+                         json.dumps(instances) if instances else None,
+                         job['hours_back'],
+                         len(instances) if job['kind'] == 'nitter' else RSS_MAX_ATTEMPTS,
+                         now))
+        with transaction(self.db_path) as conn:
+            conn.executemany(
+                """INSERT INTO scrape_jobs (window_id, kind, target, instances, hours_back,
+                                            max_attempts, created_epoch)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+        return len(rows)
+
+    def lease(self, worker_id: str, limit: int = LEASE_BATCH,
+              lease_s: int = LEASE_S) -> List[Dict[str, Any]]:
+        now = int(time.time())
+        with transaction(self.db_path) as conn:   # BEGIN IMMEDIATE: one leaser at a time
+            self._reap(conn, now)
+            rows = conn.execute(
+                """SELECT id, kind, target, instances, hours_back, attempts FROM scrape_jobs
+                   WHERE status = 'pending'
+                      OR (status = 'leased' AND lease_expires_epoch < ?)
+                   ORDER BY id LIMIT ?""",
+                (now, limit)
+            ).fetchall()
+            jobs = []
+            for r in rows:
+                instances = json.loads(r['instances']) if r['instances'] else []
+                instance = instances[r['attempts'] % len(instances)] if instances else None
+                jobs.append({'id': r['id'], 'kind': r['kind'], 'target': r['target'],
+                             'instance': instance, 'hours_back': r['hours_back'],
+                             'attempts': r['attempts'] + 1})
+            conn.executemany(
+                """UPDATE scrape_jobs
+                   SET status = 'leased', attempts = attempts + 1, instance = ?,
+                       lease_owner = ?, lease_expires_epoch = ?
+                   WHERE id = ?""",
+                [(j['instance'], worker_id, now + lease_s, j['id']) for j in jobs]
+            )
+        return jobs
+
+    @staticmethod
+    def _reap(conn, now: int):
+        """Fail expired leases that have no attempts left."""
+        conn.execute(
+            """UPDATE scrape_jobs
+               SET status = 'failed', finished_epoch = ?, error = 'lease expired'
+               WHERE status = 'leased' AND lease_expires_epoch < ?
+                 AND attempts >= max_attempts""",
+            (now, now)
+        )
+
+    def complete(self, job_id: int, items: List[Dict[str, Any]], duration_ms: float = None):
+        with transaction(self.db_path) as conn:
+            # A job whose lease expired may have been finished by another worker
+            updated = conn.execute(
+                """UPDATE scrape_jobs
+                   SET status = 'done', finished_epoch = ?, duration_ms = ?, error = NULL
+                   WHERE id = ? AND status = 'leased'""",
+                (int(time.time()), duration_ms, job_id)
+            ).rowcount
+            if updated:
+                conn.executemany(
+                    "INSERT INTO scrape_results (job_id, item) VALUES (?, ?)",
+                    [(job_id, json.dumps(item)) for item in items]
+                )
+
+    def fail(self, job_id: int, error: str, duration_ms: float = None):
+        with transaction(self.db_path) as conn:
+            conn.execute(
+                """UPDATE scrape_jobs
+                   SET status = CASE WHEN attempts >= max_attempts THEN 'failed'
+                                     ELSE 'pending' END,
+                       finished_epoch = CASE WHEN attempts >= max_attempts THEN ? END,
+                       lease_owner = NULL, lease_expires_epoch = NULL,
+                       duration_ms = ?, error = ?
+                   WHERE id = ? AND status = 'leased'""",
+                (int(time.time()), duration_ms, error[:500], job_id)
+            )
+
+    def window_status(self, window_id: str) -> Dict[str, int]:
+        with transaction(self.db_path) as conn:
+            self._reap(conn, int(time.time()))
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM scrape_jobs WHERE window_id = ? GROUP BY status",
+                (window_id,)
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def finished_jobs(self, window_id: str) -> List[Dict[str, Any]]:
+        with connection(self.db_path) as conn:
+            rows = conn.execute(
+                """SELECT id, kind, target, instance, status, attempts, duration_ms, error
+                   FROM scrape_jobs WHERE window_id = ? AND status IN (?, ?, ?)""",
+                (window_id,) + FINISHED_STATUSES
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def results(self, window_id: str) -> List[Dict[str, Any]]:
+        with connection(self.db_path) as conn:
+            rows = conn.execute(
+                """SELECT r.item FROM scrape_results r
+                   JOIN scrape_jobs j ON j.id = r.job_id
+                   WHERE j.window_id = ?""",
+                (window_id,)
+            ).fetchall()
+        return [json.loads(r['item']) for r in rows]
+
+    def cancel(self, window_id: str) -> int:
+        with transaction(self.db_path) as conn:
+            return conn.execute(
+                """UPDATE scrape_jobs SET status = 'cancelled', finished_epoch = ?
+                   WHERE window_id = ? AND status IN ('pending', 'leased')""",
+                (int(time.time()), window_id)
+            ).rowcount
+
+    def purge(self, window_id: str):
+        with transaction(self.db_path) as conn:
+            conn.execute(
+                """DELETE FROM scrape_results WHERE job_id IN
+                       (SELECT id FROM scrape_jobs WHERE window_id = ?)""",
+                (window_id,)
+            )
+            conn.execute("DELETE FROM scrape_jobs WHERE window_id = ?", (window_id,))
+
+
+def get_queue(spec: Optional[str] = None) -> WorkQueue:
+    """
+    Queue backend from ``spec`` or REDHOOD_WORK_QUEUE.
+
+    Empty means SqliteWorkQueue on DB_PATH; otherwise ``module:Class``,
+    instantiated without arguments.
+    """
+    spec = spec if spec is not None else os.getenv('REDHOOD_WORK_QUEUE', '')
+    if not spec:
+        return SqliteWorkQueue()
+    module_name, _, class_name = spec.partition(':')
+    queue = getattr(importlib.import_module(module_name), class_name)()
+    if not isinstance(queue, WorkQueue):
+        raise TypeError(f"REDHOOD_WORK_QUEUE={spec} is not a work_queue.WorkQueue")
+    return queue
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def process_job(job: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Fetch one job with the aggregator's own scrapers.
+
+    Raises RuntimeError when the Nitter mirror did not answer, so the job
+    fails over to the next mirror.
+    """
+    from redhood_aggregator import NitterScraper, RSSFeedScraper
+
+    if job['kind'] == 'rss':
+        return [f.to_dict() for f in RSSFeedScraper.fetch([job['target']], job['hours_back'])]
+    status: Dict[str, bool] = {}
+    items = NitterScraper([job['instance']]).fetch([job['target']], job['hours_back'],
+                                                    status=status)
+    if not status.get(job['target']):
+        raise RuntimeError(f"{job['instance']} did not answer for @{job['target']}")
+    return [f.to_dict() for f in items]
+
+
+def run_worker(queue: WorkQueue = None, max_idle_s: float = None):
+    """
+    Lease and process jobs until interrupted.
+
+    With ``max_idle_s`` the worker exits after the queue has been empty
+    that long (handy for one-shot local pools).
+    """
+    queue = queue or get_queue()
+    me = worker_id()
+    idle_since = time.monotonic()
+    print(f"👷 Scrape worker {me} started")
+    while True:
+        jobs = queue.lease(me)
+        if not jobs:
+            if max_idle_s is not None and time.monotonic() - idle_since > max_idle_s:
+                print(f"👷 Scrape worker {me} idle, exiting")
+                return
+            time.sleep(IDLE_POLL_S)
+            continue
+        idle_since = time.monotonic()
+        for job in jobs:
+            started = time.perf_counter()
+            try:
+                items = process_job(job)
+            except Exception as e:
+                queue.fail(job['id'], str(e), (time.perf_counter() - started) * 1000)
+                continue
+            queue.complete(job['id'], items, (time.perf_counter() - started) * 1000)
+
+
+def _worker_main(max_idle_s: Optional[float]):
+    try:
+        run_worker(max_idle_s=max_idle_s)
+    except KeyboardInterrupt:
+        pass
+
+
+def start_workers(count: int, max_idle_s: float = None) -> List:
+    """Spawn ``count`` worker processes; returns the Process objects."""
+    import multiprocessing
+    ctx = multiprocessing.get_context('spawn')   # no pooled SQLite handles across a fork
+    processes = [ctx.Process(target=_worker_main, args=(max_idle_s,), daemon=True)
+                 for _ in range(count)]
+    for p in processes:
+        p.start()
+    return processes
+
+
+def show_status(db_path: str = DB_PATH):
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            """SELECT window_id, status, COUNT(*) AS n FROM scrape_jobs
+               GROUP BY window_id, status ORDER BY window_id, status"""
+        ).fetchall()
+    print(f"\n{'Window':<28} {'Status':<10} {'Jobs':>6}")
+    print("-" * 46)
+    for r in rows:
+        print(f"{r['window_id']:<28} {r['status']:<10} {r['n']:>6}")
+    print()
+
+
+if __name__ == '__main__':
+    import argparse
+    from models import init_schema
+
+    parser = argparse.ArgumentParser(description='RedHood distributed scrape workers')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes to run')
+    parser.add_argument('--max-idle', type=float,
+                        help='Exit after the queue has been empty this many seconds')
+    parser.add_argument('--status', action='store_true', help='Show job counts per window')
+    args = parser.parse_args()
+
+    init_schema()
+    if args.status:
+        show_status()
+    elif args.workers == 1:
+        _worker_main(args.max_idle)
+    else:
+        for p in start_workers(args.workers, args.max_idle):
+            try:
+                p.join()
+            except KeyboardInterrupt:
+                pass